@@ -8,8 +8,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from openai import OpenAI
-from config import settings
+from llm import create_openai_client
 from database.models import ArticulationSuggestion, AnonymousUser
 from resilience.state_management import StateManager, CheckpointType
 
@@ -21,7 +20,7 @@ class ArticulationAssistant:
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = create_openai_client()
         self.state_manager = StateManager(db_session)
     
     def suggest_articulation(
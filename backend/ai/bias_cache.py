@@ -0,0 +1,129 @@
+"""
+Bias analysis result cache.
+Content-addressed by normalized text with a SimHash near-duplicate fallback,
+so reposts and minor edits reuse an existing analysis. Entries are keyed by
+model version; changing the model or prompt invalidates them.
+
+Lookups read through the caller's session; every write (hit stats, new
+entries, purges) runs in a short session of its own on the same engine, so
+the cache never commits or rolls back the caller's unit of work.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ai.content_fingerprint import ContentFingerprint, hamming_distance
+from database.models import BiasAnalysisCache
+
+logger = logging.getLogger(__name__)
+
+
+class BiasResultCache:
+    """DB-backed cache of bias analysis results."""
+
+    def __init__(self, db_session: Session, model_version: str, max_distance: int = 5):
+        """
+        Args:
+            db_session: Database session
+            model_version: Model/prompt version; part of every cache key
+            max_distance: Max SimHash Hamming distance for a near-duplicate hit.
+                Matches within 3 bits always share a 16-bit band; beyond that,
+                recall is probabilistic (~90% at 4 bits, ~75% at 5 bits).
+        """
+        self.db = db_session
+        self.model_version = model_version
+        self.max_distance = max_distance
+
+    def lookup(self, fp: ContentFingerprint, content_type: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result for identical or near-identical content."""
+        entry = self.db.query(BiasAnalysisCache).filter(
+            BiasAnalysisCache.model_version == self.model_version,
+            BiasAnalysisCache.content_type == content_type,
+            BiasAnalysisCache.content_hash == fp.content_hash
+        ).first()
+
+        if entry is None and self.max_distance > 0:
+            entry = self._lookup_near(fp, content_type)
+            if entry is not None:
+                logger.info(f"Bias cache near-duplicate hit (entry {entry.id})")
+
+        if entry is None:
+            return None
+
+        self._record_hit(entry.id)
+        return entry.result
+
+    def _own_session(self) -> Session:
+        """A separate session on the caller's engine, for the cache's own writes."""
+        return Session(bind=self.db.get_bind())
+
+    def _record_hit(self, entry_id: int) -> None:
+        """Bump hit stats in a transaction of its own, leaving the caller's session untouched."""
+        try:
+            with self._own_session() as session:
+                session.execute(
+                    update(BiasAnalysisCache)
+                    .where(BiasAnalysisCache.id == entry_id)
+                    .values(hit_count=BiasAnalysisCache.hit_count + 1, last_hit_at=datetime.utcnow())
+                )
+                session.commit()
+        except Exception as e:
+            # Hit stats are informational; never fail a lookup over them
+            logger.warning(f"Could not record bias cache hit for entry {entry_id}: {e}")
+
+    def _lookup_near(self, fp: ContentFingerprint, content_type: str) -> Optional[BiasAnalysisCache]:
+        bands = fp.bands
+        candidates = self.db.query(BiasAnalysisCache).filter(
+            BiasAnalysisCache.model_version == self.model_version,
+            BiasAnalysisCache.content_type == content_type,
+            or_(
+                BiasAnalysisCache.band0 == bands[0],
+                BiasAnalysisCache.band1 == bands[1],
+                BiasAnalysisCache.band2 == bands[2],
+                BiasAnalysisCache.band3 == bands[3],
+            )
+        ).order_by(BiasAnalysisCache.id.desc()).limit(50).all()  # Most recent entries first
+
+        best, best_distance = None, self.max_distance + 1
+        for candidate in candidates:
+            distance = hamming_distance(candidate.simhash, fp.simhash)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def store(self, fp: ContentFingerprint, content_type: str, result: Dict[str, Any]) -> None:
+        """Persist an analysis result (in its own transaction)."""
+        bands = fp.bands
+        with self._own_session() as session:
+            session.add(BiasAnalysisCache(
+                content_type=content_type,
+                model_version=self.model_version,
+                content_hash=fp.content_hash,
+                simhash=fp.signed_simhash,
+                band0=bands[0],
+                band1=bands[1],
+                band2=bands[2],
+                band3=bands[3],
+                result=result
+            ))
+            try:
+                session.commit()
+            except IntegrityError:
+                # Concurrent analysis of the same content stored it first
+                session.rollback()
+                logger.debug(f"Bias cache entry for {fp.content_hash[:12]} already exists")
+
+    def purge_stale_versions(self) -> int:
+        """Delete entries written by other model versions (in its own transaction)."""
+        with self._own_session() as session:
+            deleted = session.query(BiasAnalysisCache).filter(
+                BiasAnalysisCache.model_version != self.model_version
+            ).delete(synchronize_session=False)
+            session.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} stale bias cache entries")
+        return deleted
@@ -6,8 +6,9 @@ import logging
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
 
-from openai import OpenAI
-from config import settings
+from llm import create_openai_client
+from ai.bias_cache import BiasResultCache
+from ai.content_fingerprint import fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +16,18 @@ logger = logging.getLogger(__name__)
 class BiasDetector:
     """Detects bias in content."""
     
-    def __init__(self, db_session: Session):
+    MODEL = "gpt-4"
+    # Bump when the prompt or result parsing changes to invalidate cached results
+    PROMPT_VERSION = "1"
+    
+    def __init__(self, db_session: Session, use_cache: bool = True):
         self.db = db_session
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = create_openai_client()
+        self.cache = BiasResultCache(db_session, self.model_version) if use_cache else None
+    
+    @property
+    def model_version(self) -> str:
+        return f"{self.MODEL}:prompt-{self.PROMPT_VERSION}"
     
     def detect_bias(
         self,
@@ -42,43 +52,62 @@ class BiasDetector:
         content: str,
         content_type: str
     ) -> Dict[str, Any]:
-        """Use AI to analyze bias."""
+        """Use AI to analyze bias, reusing cached results for (near-)identical content."""
         if not self.openai_client:
             return self._fallback_bias_analysis(content)
         
+        fp = fingerprint(content) if self.cache else None
+        if fp:
+            cached = self.cache.lookup(fp, content_type)
+            if cached is not None:
+                return cached
+        
         try:
-            prompt = f"""
-            Analyze this {content_type} for bias:
-            1. Credentialism (requiring degrees over capabilities)
-            2. Classist assumptions
-            3. Bias against LLC/independent contractors
-            4. Ableist language
-            5. Racial bias
-            6. Gender discrimination
-            
-            Content: {content}
-            
-            Return JSON with bias_detected (boolean), bias_types (list), and details (object).
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You detect bias in job postings and content."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            
-            # Parse response (simplified)
-            return {
-                "bias_detected": "bias" in response.choices[0].message.content.lower(),
-                "bias_types": [],
-                "details": {}
-            }
+            result = self._analyze_with_ai(content, content_type)
         except Exception as e:
             logger.error(f"Bias detection failed: {e}")
             return self._fallback_bias_analysis(content)
+        
+        # Only AI results are cached; fallbacks are cheap and version-less
+        if fp:
+            self.cache.store(fp, content_type, result)
+        return result
+    
+    def _analyze_with_ai(
+        self,
+        content: str,
+        content_type: str
+    ) -> Dict[str, Any]:
+        """Single AI bias analysis call."""
+        prompt = f"""
+        Analyze this {content_type} for bias:
+        1. Credentialism (requiring degrees over capabilities)
+        2. Classist assumptions
+        3. Bias against LLC/independent contractors
+        4. Ableist language
+        5. Racial bias
+        6. Gender discrimination
+        
+        Content: {content}
+        
+        Return JSON with bias_detected (boolean), bias_types (list), and details (object).
+        """
+        
+        response = self.openai_client.chat.completions.create(
+            model=self.MODEL,
+            messages=[
+                {"role": "system", "content": "You detect bias in job postings and content."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3
+        )
+        
+        # Parse response (simplified)
+        return {
+            "bias_detected": "bias" in response.choices[0].message.content.lower(),
+            "bias_types": [],
+            "details": {}
+        }
     
     def _fallback_bias_analysis(self, content: str) -> Dict[str, Any]:
         """Fallback bias analysis."""
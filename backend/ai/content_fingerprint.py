@@ -0,0 +1,97 @@
+"""
+Content fingerprinting for result caches.
+Normalizes text (whitespace, casing, boilerplate) into an exact content hash
+and a 64-bit SimHash for near-duplicate lookup.
+"""
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # 4 x 16-bit bands: hashes within 3 bits always share a band
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+# Boilerplate lines that carry no signal for analysis (EEO statements,
+# application instructions, share links). Matched per line after lowercasing.
+BOILERPLATE_PATTERNS = [
+    r"^.*\bequal (?:opportunity|employment opportunity)\b.*$",
+    r"^.*\b(?:eoe|e\.o\.e\.)\b.*$",
+    r"^.*\breasonable accommodations?\b.*$",
+    r"^\s*(?:apply|click)\b.*\b(?:now|here|today|below)\b.*$",
+    r"^\s*(?:share|follow us|like us)\b.*$",
+    r"^\s*(?:job id|req(?:uisition)? (?:id|#)|posting id)\s*[:#].*$",
+]
+
+_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS), re.MULTILINE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+@dataclass(frozen=True)
+class ContentFingerprint:
+    """Exact and approximate identity of a piece of text."""
+    normalized: str
+    content_hash: str  # sha256 of normalized text
+    simhash: int       # unsigned 64-bit
+
+    @property
+    def bands(self) -> List[int]:
+        return simhash_bands(self.simhash)
+
+    @property
+    def signed_simhash(self) -> int:
+        """SimHash as a signed 64-bit int (fits a BIGINT column)."""
+        return self.simhash - (1 << SIMHASH_BITS) if self.simhash >= (1 << (SIMHASH_BITS - 1)) else self.simhash
+
+
+def normalize_content(text: str) -> str:
+    """Lowercase, strip boilerplate lines and collapse whitespace."""
+    text = (text or "").lower()
+    text = _BOILERPLATE_RE.sub("", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def simhash(normalized: str) -> int:
+    """64-bit SimHash over word unigrams and bigrams."""
+    tokens = _TOKEN_RE.findall(normalized)
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    weights = [0] * SIMHASH_BITS
+    for feature, weight in features.items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += weight if digest >> bit & 1 else -weight
+
+    value = 0
+    for bit in range(SIMHASH_BITS):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def simhash_bands(value: int) -> List[int]:
+    """Split a SimHash into equal bands for indexed candidate lookup."""
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (band * BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
+
+
+def unsigned_simhash(value: int) -> int:
+    """Inverse of ContentFingerprint.signed_simhash."""
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(unsigned_simhash(a) ^ unsigned_simhash(b)).count("1")
+
+
+def fingerprint(text: str) -> ContentFingerprint:
+    """Compute the exact and near-duplicate fingerprint of text."""
+    normalized = normalize_content(text)
+    return ContentFingerprint(
+        normalized=normalized,
+        content_hash=hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+        simhash=simhash(normalized),
+    )
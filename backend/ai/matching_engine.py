@@ -3,26 +3,36 @@ AI-Powered Matching Engine.
 Human-in-the-Loop Architecture: AI generates initial matches, human reviewers validate.
 """
 import logging
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from openai import OpenAI
-from config import settings
+from llm import create_openai_client
 from database.models import Match, JobPosting, AnonymousUser, CapabilityAssessment
 from resilience.state_management import StateManager, CheckpointType
 from infrastructure.scaling import scaling_manager
 from ai.longevity_predictor import create_longevity_predictor
+from ai.skill_index import get_job_skill_index
+from monitoring.metrics import MATCHES_GENERATED, MATCHING_STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# generate_matches stage timers, bound once
+_STAGE_LOAD_PROFILE = MATCHING_STAGE_SECONDS.labels("load_profile")
+_STAGE_SCORE = MATCHING_STAGE_SECONDS.labels("score")
+_STAGE_PERSIST = MATCHING_STAGE_SECONDS.labels("persist")
+_STAGE_CHECKPOINT = MATCHING_STAGE_SECONDS.labels("checkpoint")
+_STAGE_REFRESH = MATCHING_STAGE_SECONDS.labels("refresh")
+_STAGE_TOTAL = MATCHING_STAGE_SECONDS.labels("total")
+
 
 class MatchingEngine:
     """AI-powered matching engine with human review."""
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = create_openai_client()
         self.state_manager = StateManager(db_session)
         self.es_client = scaling_manager.get_elasticsearch_client()
         self.longevity_predictor = create_longevity_predictor()
@@ -36,6 +46,8 @@ class MatchingEngine:
         Generate matches for a user.
         Human-in-the-Loop: AI generates, humans validate.
         """
+        started = stage_started = time.perf_counter()
+        
         # Get user's latest assessment (prefer XDMIQ if available)
         xdmiq_assessment = self.db.query(CapabilityAssessment).filter(
             CapabilityAssessment.user_id == user_id,
@@ -58,9 +70,15 @@ class MatchingEngine:
         if not user:
             raise ValueError("User not found")
         
+        _STAGE_LOAD_PROFILE.observe_since(stage_started)
+        stage_started = time.perf_counter()
+        
         # AI generates initial matches
         ai_matches = self._generate_ai_matches(user_id, assessment, limit)
         
+        _STAGE_SCORE.observe_since(stage_started)
+        stage_started = time.perf_counter()
+        
         # Create match records with longevity predictions
         matches = []
         for match_data in ai_matches:
@@ -80,6 +98,9 @@ class MatchingEngine:
         
         self.db.commit()
         
+        _STAGE_PERSIST.observe_since(stage_started)
+        stage_started = time.perf_counter()
+        
         # Create checkpoints for each match
         for match in matches:
             checkpoint = self.state_manager.create_checkpoint(
@@ -98,10 +119,17 @@ class MatchingEngine:
         
         self.db.commit()
         
+        _STAGE_CHECKPOINT.observe_since(stage_started)
+        stage_started = time.perf_counter()
+        
         # Refresh matches
         for match in matches:
             self.db.refresh(match)
         
+        _STAGE_REFRESH.observe_since(stage_started)
+        _STAGE_TOTAL.observe_since(started)
+        MATCHES_GENERATED.inc(len(matches))
+        
         # Flag for human review if needed
         high_value_matches = [m for m in matches if m.match_score >= 80]
         if high_value_matches:
@@ -116,14 +144,6 @@ class MatchingEngine:
         limit: int
     ) -> List[Dict[str, Any]]:
         """Use AI to generate matches."""
-        # Get active job postings
-        job_postings = self.db.query(JobPosting).filter(
-            JobPosting.active == True
-        ).limit(limit * 3).all()  # Get more candidates for AI to evaluate
-        
-        if not job_postings:
-            return []
-        
         # Extract user capabilities from assessment
         # Check if XDMIQ assessment
         if assessment.assessment_type == "xdmiq":
@@ -134,6 +154,21 @@ class MatchingEngine:
             user_skills = assessment.results.get("strengths", [])
             proficiency_score = assessment.results.get("tool_proficiency_score", 50)
         
+        # Get active job postings sharing the user's skills
+        skill_index = get_job_skill_index()
+        candidate_ids = skill_index.candidates(self.db, user_skills, limit * 3)  # Get more candidates for AI to evaluate
+        if not candidate_ids:
+            return []
+        
+        job_postings = self.db.query(JobPosting).filter(
+            JobPosting.id.in_(candidate_ids),
+            JobPosting.active == True
+        ).all()
+        skill_index.discard(set(candidate_ids) - {job.id for job in job_postings})
+        
+        if not job_postings:
+            return []
+        
         matches = []
         
         # Build user profile for longevity prediction
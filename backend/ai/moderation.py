@@ -2,12 +2,12 @@
 AI Moderation & Facilitation.
 Human-in-the-Loop: AI flags, humans make final decisions.
 """
+import json
 import logging
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 
-from openai import OpenAI
-from config import settings
+from llm import create_openai_client
 from database.models import ForumPost
 from resilience.state_management import StateManager, CheckpointType
 
@@ -19,7 +19,7 @@ class ModerationEngine:
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = create_openai_client()
         self.state_manager = StateManager(db_session)
     
     def moderate_content(
@@ -51,6 +51,98 @@ class ModerationEngine:
             "checkpoint_id": checkpoint.id
         }
     
+    def moderate_batch(
+        self,
+        contents: List[str],
+        content_type: str = "forum_post"
+    ) -> List[Dict[str, Any]]:
+        """
+        Moderate several pieces of content with a single AI call.
+        Results are returned in the same order as contents.
+        """
+        if not contents:
+            return []
+        
+        analyses = self._analyze_batch_with_ai(contents)
+        
+        results = []
+        for content, moderation_result in zip(contents, analyses):
+            checkpoint = self.state_manager.create_checkpoint(
+                checkpoint_type=CheckpointType.MODERATION,
+                entity_id=f"{content_type}:{hash(content)}",
+                state_data={
+                    "content": content,
+                    "content_type": content_type,
+                    "moderation_result": moderation_result,
+                    "batch_size": len(contents)
+                }
+            )
+            results.append({
+                "flagged": moderation_result.get("flagged", False),
+                "reasons": moderation_result.get("reasons", []),
+                "needs_human_review": moderation_result.get("needs_human_review", False),
+                "checkpoint_id": checkpoint.id
+            })
+        return results
+    
+    def _analyze_batch_with_ai(self, contents: List[str]) -> List[Dict[str, Any]]:
+        """Analyze multiple items in one multi-item prompt, fanning results back out."""
+        if not self.openai_client:
+            return [self._fallback_analysis(content) for content in contents]
+        
+        try:
+            items = [{"id": index, "content": content} for index, content in enumerate(contents)]
+            prompt = f"""
+            Analyze each of the following items independently for:
+            1. Credentialism (requiring degrees over capabilities)
+            2. Gatekeeping language
+            3. Bias against LLC/independent contractors
+            4. Inappropriate content
+            
+            Items (JSON): {json.dumps(items)}
+            
+            Return only a JSON array with one object per item:
+            {{"id": <item id>, "flagged": <boolean>, "reasons": [<strings>], "needs_human_review": <boolean>}}
+            """
+            
+            response = self.openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": "You moderate content for bias and gatekeeping."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3
+            )
+            parsed = self._parse_batch_response(response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"AI batch moderation failed: {e}")
+            parsed = {}
+        
+        # Items missing from the response fall back to local analysis
+        return [
+            parsed.get(index) or self._fallback_analysis(content)
+            for index, content in enumerate(contents)
+        ]
+    
+    def _parse_batch_response(self, text: str) -> Dict[int, Dict[str, Any]]:
+        """Parse a JSON array of per-item verdicts keyed by item id."""
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            logger.warning("AI batch moderation returned no JSON array")
+            return {}
+        
+        results = {}
+        for entry in json.loads(text[start:end + 1]):
+            if not isinstance(entry, dict) or "id" not in entry:
+                continue
+            flagged = bool(entry.get("flagged", False))
+            results[int(entry["id"])] = {
+                "flagged": flagged,
+                "reasons": list(entry.get("reasons") or []),
+                "needs_human_review": bool(entry.get("needs_human_review", flagged))
+            }
+        return results
+    
     def _analyze_with_ai(self, content: str) -> Dict[str, Any]:
         """Use AI to analyze content."""
         if not self.openai_client:
@@ -0,0 +1,313 @@
+"""
+Asynchronous moderation pipeline.
+Cheap local pre-filter first; uncertain content is micro-batched into a
+single multi-item AI call off the request path. Posts publish optimistically
+and are hidden retroactively if flagged. Queued posts keep
+moderation_status="pending" in the database, so posts queued by a process
+that stopped are picked up again by resume_pending() at startup, and the
+posts of a failed batch are retried with backoff; a post only leaves
+"pending" once, so a post moderated twice is acted on once.
+Human-in-the-Loop: flagged content goes to the human review queue, in the
+same transaction that hides it.
+"""
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ai.moderation import ModerationEngine
+from ai.pii_scanner import PIIScanner
+from database.models import ForumPost
+from human_review.queue import HumanReviewQueue, ReviewPriority, ReviewType
+from monitoring.tracing import detached_context
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+
+# Unambiguous credentialism/gatekeeping phrases - flagged without an AI call
+BLOCK_PATTERNS = [
+    r"\bdegree required\b",
+    r"\bmust have (?:a |an )?(?:phd|ph\.d\.?|doctorate|master'?s|bachelor'?s)\b",
+    r"\bivy league\b",
+    r"\b(?:top|elite)[- ]tier (?:schools?|universit(?:y|ies))\b",
+    r"\bno (?:llcs?|contractors|freelancers)\b",
+]
+
+# Vocabulary that may indicate gatekeeping in context - routed to the AI.
+# Kept to specific terms and phrases: everyday words ("only", "must",
+# "required", "LLC") would send most posts on this platform to the AI.
+REVIEW_SIGNALS = [
+    r"\bdegrees?\b", r"\bdiplomas?\b", r"\bphd\b", r"\bmba\b", r"\bgraduates?\b",
+    r"\bcollege\b", r"\buniversit(?:y|ies)\b", r"\bcredentials?\b", r"\bcertifi(?:ed|cation)\b",
+    r"\bpedigree\b", r"\bnative speakers?\b", r"\byoung\b", r"\bculture fit\b",
+    r"\b(?:only|exclusively) (?:hir(?:e|es|ing)|accept(?:s|ing)?|consider(?:s|ing)?|work(?:s|ing)? with)\b",
+    r"\b(?:llcs?|contractors|freelancers) (?:need not|should not|cannot|can't) apply\b",
+]
+
+
+class PrefilterVerdict(str, Enum):
+    """Outcome of the local pre-filter."""
+    ALLOW = "allow"    # Clearly clean - no AI call
+    FLAG = "flag"      # Clearly violating - hide and send to human review
+    REVIEW = "review"  # Uncertain - send to the AI batch
+
+
+@dataclass
+class PrefilterResult:
+    """Pre-filter verdict with reasons."""
+    verdict: PrefilterVerdict
+    reasons: List[str] = field(default_factory=list)
+
+
+class ModerationPrefilter:
+    """Keyword/regex/PII scanner that short-circuits the obvious cases."""
+
+    def __init__(self, pii_scanner: Optional[PIIScanner] = None):
+        self.pii_scanner = pii_scanner or PIIScanner()
+        self.block_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in BLOCK_PATTERNS]
+        self.review_signal = re.compile("|".join(REVIEW_SIGNALS), re.IGNORECASE)
+
+    def screen(self, content: str) -> PrefilterResult:
+        """Classify content as allow, flag or review."""
+        reasons = []
+        if any(pattern.search(content) for pattern in self.block_patterns):
+            reasons.append("Credentialism detected")
+
+        pii = self.pii_scanner.scan(content)
+        if pii.risk_level in ["high", "critical"]:
+            reasons.append(f"Sensitive PII detected ({', '.join(sorted(pii.matches_by_type))})")
+
+        if reasons:
+            return PrefilterResult(PrefilterVerdict.FLAG, reasons)
+
+        if pii.has_pii or self.review_signal.search(content):
+            return PrefilterResult(PrefilterVerdict.REVIEW)
+
+        return PrefilterResult(PrefilterVerdict.ALLOW)
+
+
+@dataclass
+class _PendingItem:
+    post_id: int
+    content: str
+    attempts: int = 0
+
+
+class ModerationPipeline:
+    """
+    Micro-batching moderation worker for forum posts.
+
+    submit() never blocks on the AI: items are queued and a background task
+    sends up to max_batch_size items per AI call, waiting at most
+    max_wait_seconds for a batch to fill.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        prefilter: Optional[ModerationPrefilter] = None,
+        max_batch_size: int = 16,
+        max_wait_seconds: float = 0.5
+    ):
+        self._session_factory = session_factory
+        self.prefilter = prefilter or ModerationPrefilter()
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._retries: Set[asyncio.TimerHandle] = set()
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database.connection import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def screen(self, content: str) -> PrefilterResult:
+        """Run the local pre-filter (synchronous, no I/O)."""
+        return self.prefilter.screen(content)
+
+    async def submit(self, post_id: int, content: str) -> None:
+        """Queue a post for batched AI moderation."""
+        self._ensure_worker()
+        self._queue.put_nowait(_PendingItem(post_id=post_id, content=content))
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            # Started by whichever request submits first; keep its batches out of that trace
+            self._worker = asyncio.get_running_loop().create_task(self._run(), context=detached_context())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                # The AI client and ORM are synchronous - keep them off the event loop
+                await asyncio.to_thread(self._process_batch, batch)
+            except Exception as e:
+                logger.error(f"Moderation batch of {len(batch)} failed, retrying its posts: {e}")
+                for item in batch:
+                    self._retry_later(item)
+            else:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _retry_later(self, item: _PendingItem) -> None:
+        """Re-queue an item after exponential backoff; it counts as unfinished (for drain) meanwhile."""
+        item.attempts += 1
+        delay = min(RETRY_BASE_SECONDS * 2 ** (item.attempts - 1), RETRY_MAX_SECONDS)
+
+        def requeue() -> None:
+            self._retries.discard(handle)
+            self._queue.put_nowait(item)
+            self._queue.task_done()
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries.add(handle)
+
+    def _process_batch(self, batch: List[_PendingItem]) -> None:
+        db = self._new_session()
+        try:
+            engine = ModerationEngine(db)
+            results = engine.moderate_batch([item.content for item in batch])
+            for item, result in zip(batch, results):
+                # Only act if the post is still pending (it may have been queued twice)
+                if result["flagged"]:
+                    hide_post(db, item.post_id, result["reasons"], result["checkpoint_id"], expected="pending")
+                    continue
+                if not set_post_status(db, item.post_id, "approved", expected="pending"):
+                    continue
+                if result["needs_human_review"]:
+                    # Stays visible; a human confirms the AI's uncertain call
+                    HumanReviewQueue(db).add_to_queue(
+                        review_type=ReviewType.MODERATION,
+                        entity_id=f"forum_post:{item.post_id}",
+                        priority=ReviewPriority.MEDIUM,
+                        metadata={"reasons": result["reasons"], "checkpoint_id": result["checkpoint_id"]}
+                    )
+            logger.info(f"Moderated batch of {len(batch)} post(s) with one AI call")
+        finally:
+            db.close()
+
+    async def resume_pending(self, limit: int = 1000) -> int:
+        """Queue posts left pending by a previous run (oldest first); returns how many."""
+        def load():
+            db = self._new_session()
+            try:
+                return db.query(ForumPost.id, ForumPost.title, ForumPost.content).filter(
+                    ForumPost.moderation_status == "pending"
+                ).order_by(ForumPost.id).limit(limit).all()
+            finally:
+                db.close()
+
+        try:
+            posts = await asyncio.to_thread(load)
+        except Exception as e:
+            # Not fatal at startup; the posts stay pending for the next sweep
+            logger.error(f"Could not load pending posts for moderation: {e}")
+            return 0
+        for post_id, title, content in posts:
+            await self.submit(post_id, f"{title}\n{content}")
+        if posts:
+            logger.info(f"Resumed moderation of {len(posts)} pending post(s)")
+        return len(posts)
+
+    async def drain(self) -> None:
+        """Wait until every queued item has been moderated."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel the background worker and pending retries (those posts stay pending for the next start)."""
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+def set_post_status(
+    db: Session,
+    post_id: int,
+    status: str,
+    expected: Optional[str] = None,
+    commit: bool = True
+) -> bool:
+    """Update a post's moderation status (only from `expected`, if given); returns whether it changed."""
+    query = db.query(ForumPost).filter(ForumPost.id == post_id)
+    if expected is not None:
+        query = query.filter(ForumPost.moderation_status == expected)
+    updated = query.update({ForumPost.moderation_status: status}, synchronize_session=False)
+    if commit:
+        db.commit()
+    return bool(updated)
+
+
+def queue_hidden_post_review(
+    db: Session,
+    post_id: int,
+    reasons: List[str],
+    checkpoint_id: Optional[int] = None
+) -> None:
+    """Queue a hidden post for a human decision, committing it with whatever the session holds (the hide)."""
+    HumanReviewQueue(db).add_to_queue(
+        review_type=ReviewType.MODERATION,
+        entity_id=f"forum_post:{post_id}",
+        priority=ReviewPriority.HIGH,
+        metadata={"reasons": reasons, "checkpoint_id": checkpoint_id}
+    )
+    logger.info(f"Hid forum post {post_id} pending human review: {reasons}")
+
+
+def hide_post(
+    db: Session,
+    post_id: int,
+    reasons: List[str],
+    checkpoint_id: Optional[int] = None,
+    expected: Optional[str] = None
+) -> bool:
+    """
+    Hide a flagged post and queue it for a human decision in one
+    transaction; returns False if it was not in `expected` status.
+    """
+    if not set_post_status(db, post_id, "hidden", expected, commit=False):
+        db.rollback()
+        return False
+    queue_hidden_post_review(db, post_id, reasons, checkpoint_id)
+    return True
+
+
+# Global pipeline instance
+_pipeline: Optional[ModerationPipeline] = None
+
+
+def get_moderation_pipeline() -> ModerationPipeline:
+    """Get or create the global moderation pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ModerationPipeline()
+    return _pipeline
@@ -3,9 +3,12 @@ PII Scanner for User-Generated Content.
 Detects personally identifiable information in text to prevent accidental disclosure.
 """
 import re
+import time
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+from monitoring.metrics import PII_SCAN_SECONDS, PII_SCANS_WITH_PII
+
 
 # PII Detection Patterns
 PII_PATTERNS = {
@@ -74,6 +77,7 @@ class PIIScanner:
         Returns:
             PIIScanResult with findings
         """
+        started = time.perf_counter()
         if not text:
             return PIIScanResult(
                 has_pii=False,
@@ -114,6 +118,10 @@ class PIIScanner:
         has_pii = total_matches > 0
         risk_level = self._calculate_risk_level(matches_by_type)
         
+        PII_SCAN_SECONDS.observe_since(started)
+        if has_pii:
+            PII_SCANS_WITH_PII.inc()
+        
         return PIIScanResult(
             has_pii=has_pii,
             total_matches=total_matches,
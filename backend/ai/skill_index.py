@@ -0,0 +1,275 @@
+"""
+Job skill index.
+Inverted index from skill to the active job postings that require or
+prefer it, so matching scores the postings that share skills with the
+candidate instead of an arbitrary slice of the table. A posting whose
+required skills include none of the candidate's cannot reach the match
+threshold, so nothing matchable is left out; postings with no required
+skills are always candidates.
+
+Job postings are append-only (ingestion inserts them and nothing edits
+their skills), so the highest posting id seen is the high-water mark:
+catching up after a snapshot restore, or with postings ingested by other
+processes, only reads rows above it. Ids come from a sequence and are
+allocated before their transaction commits, so a batch can become
+visible after higher ids were already indexed. Replay therefore records
+the id ranges it skipped over (gaps) and re-checks just those ranges
+until they fill or age out (a rolled-back batch never fills). Postings
+found deactivated or missing when matching are dropped from the index.
+
+A background task catches up every refresh_seconds; matching only reads
+the index (it builds it itself only if nothing has loaded it yet).
+"""
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.connection import SessionLocal
+from database.models import JobPosting
+from infrastructure.snapshots import SnapshotSource
+
+logger = logging.getLogger(__name__)
+
+_REPLAY_BATCH = 5000
+_REQUIRED_WEIGHT = 2  # Required skills are worth twice the preferred ones in match scoring
+_MAX_GAPS = 64  # Most recent gaps kept; older ones come from long-finished rollbacks
+
+# (first id, last id, monotonic time first seen)
+Gap = Tuple[int, int, float]
+
+
+class JobSkillIndex(SnapshotSource):
+    """Skill -> active job posting ids, kept current by the posting id high-water mark."""
+
+    name = "job_skills"
+    version = 2
+
+    def __init__(self, refresh_seconds: float = 30.0, gap_seconds: float = 600.0):
+        self.refresh_seconds = refresh_seconds
+        self.gap_seconds = gap_seconds
+        self._lock = threading.Lock()
+        self._ids: Set[int] = set()
+        self._required: Dict[str, Set[int]] = defaultdict(set)
+        self._preferred: Dict[str, Set[int]] = defaultdict(set)
+        self._open: Set[int] = set()  # Postings without required skills
+        self._high_water: Optional[int] = None  # None until loaded
+        self._gaps: List[Gap] = []  # Unfilled id ranges below the mark
+        self._replay_lock = threading.Lock()  # One replay at a time
+        self._task: Optional[asyncio.Task] = None
+
+    def _add(self, posting_id: int, required: Optional[List[str]], preferred: Optional[List[str]]) -> None:
+        required, preferred = required or (), preferred or ()
+        self._ids.add(posting_id)
+        for skill in required:
+            self._required[skill].add(posting_id)
+        for skill in preferred:
+            self._preferred[skill].add(posting_id)
+        if not required:
+            self._open.add(posting_id)
+
+    def _clear(self) -> None:
+        self._ids.clear()
+        self._required.clear()
+        self._preferred.clear()
+        self._open.clear()
+
+    def add_postings(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Index freshly inserted postings (dicts with id, required_skills, preferred_skills, active) without waiting for a replay."""
+        with self._lock:
+            for row in rows:
+                if row.get("active", True):
+                    self._add(row["id"], row["required_skills"], row.get("preferred_skills"))
+
+    def discard(self, posting_ids: Iterable[int]) -> None:
+        """Drop postings that are no longer active (rare, so this scans every skill)."""
+        with self._lock:
+            posting_ids = self._ids.intersection(posting_ids)
+            if not posting_ids:
+                return
+            self._ids -= posting_ids
+            self._open -= posting_ids
+            for postings in (*self._required.values(), *self._preferred.values()):
+                postings -= posting_ids
+
+    def replay(self, db: Session) -> int:
+        """Index postings above the high-water mark and in open gaps; return how many were read."""
+        with self._replay_lock:
+            return self._replay(db)
+
+    def _replay(self, db: Session) -> int:
+        now = time.monotonic()
+        with self._lock:
+            mark = self._high_water or 0
+            gaps = sorted(gap for gap in self._gaps if now - gap[2] < self.gap_seconds)
+
+        ranges = [JobPosting.id.between(first, last) for first, last, _ in gaps]
+        query = db.query(
+            JobPosting.id, JobPosting.required_skills, JobPosting.preferred_skills, JobPosting.active
+        ).filter(or_(JobPosting.id > mark, *ranges)).order_by(JobPosting.id).yield_per(_REPLAY_BATCH)
+
+        # Walk the scanned regions (open gaps, then everything above the
+        # mark) alongside the rows, noting the ids still missing in each
+        regions = [*gaps, (mark + 1, None, now)]
+        region = 0
+        expected = regions[0][0]
+        missing: List[Gap] = []
+
+        def close_region() -> None:
+            first, last, seen = regions[region]
+            if last is not None and expected <= last:
+                missing.append((expected, last, seen))
+
+        # Index in batches so matching is not held up for the whole of a rebuild
+        replayed, high_water = 0, mark
+        rows = iter(query)
+        while True:
+            batch = list(islice(rows, _REPLAY_BATCH))
+            if not batch:
+                break
+            with self._lock:
+                for posting_id, required, preferred, active in batch:
+                    while regions[region][1] is not None and posting_id > regions[region][1]:
+                        close_region()
+                        region += 1
+                        expected = regions[region][0]
+                    if posting_id > expected:
+                        missing.append((expected, posting_id - 1, regions[region][2]))
+                    expected = posting_id + 1
+                    if active:
+                        self._add(posting_id, required, preferred)
+            high_water = max(high_water, batch[-1][0])
+            replayed += len(batch)
+        while regions[region][1] is not None:
+            close_region()
+            region += 1
+            expected = regions[region][0]
+
+        with self._lock:
+            self._high_water = high_water
+            self._gaps = missing[-_MAX_GAPS:]
+        return replayed
+
+    def candidates(self, db: Session, skills: Iterable[str], limit: int) -> List[int]:
+        """
+        Up to `limit` active posting ids for a candidate with these skills,
+        most shared skills first (required counting double), then postings
+        without required skills. Only builds the index if nothing has yet;
+        keeping it current is the background refresh's job.
+        """
+        if self._high_water is None:
+            self.replay(db)
+
+        with self._lock:
+            scores: Dict[int, int] = defaultdict(int)
+            for skill in set(skills):
+                for posting_id in self._required.get(skill, ()):
+                    scores[posting_id] += _REQUIRED_WEIGHT
+                for posting_id in self._preferred.get(skill, ()):
+                    scores[posting_id] += 1
+            ranked = [posting_id for posting_id, _ in heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))]
+            if len(ranked) < limit:
+                ranked += heapq.nsmallest(limit - len(ranked), self._open.difference(scores))
+        return ranked
+
+    def start(self) -> None:
+        """Catch up every refresh_seconds in the background."""
+        if self._task is None and self.refresh_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await asyncio.to_thread(self.catch_up)
+            except Exception as e:
+                logger.error(f"Job skill index refresh failed: {e}")
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # SnapshotSource
+
+    def identity(self, high_water: Optional[int]) -> str:
+        """
+        The database, its first posting, and whether the table still
+        reaches the mark. A reset, re-seed or other database changes at
+        least one of them.
+        """
+        with SessionLocal() as db:
+            first = db.query(JobPosting.id, JobPosting.created_at).order_by(JobPosting.id).first()
+            max_id = db.query(func.max(JobPosting.id)).scalar() or 0
+        first = f"{first[0]}@{first[1].isoformat()}" if first else "-"
+        reaches_mark = max_id >= (high_water or 0)
+        return f"{settings.DATABASE_URL}\n{first}\n{reaches_mark}"
+
+    def dump(self) -> Tuple[Any, Optional[int]]:
+        """The posting lists themselves, so loading is set construction rather than re-indexing."""
+        with self._lock:
+            payload = (
+                tuple(self._ids),
+                {skill: tuple(postings) for skill, postings in self._required.items() if postings},
+                {skill: tuple(postings) for skill, postings in self._preferred.items() if postings},
+                tuple(self._open),
+                tuple((first, last) for first, last, _ in self._gaps),
+            )
+            return payload, self._high_water
+
+    def load(self, payload: Any, high_water: Optional[int]) -> None:
+        ids, required, preferred, open_ids, gaps = payload
+        now = time.monotonic()
+        with self._lock:
+            self._ids = set(ids)
+            self._required = defaultdict(set, ((skill, set(postings)) for skill, postings in required.items()))
+            self._preferred = defaultdict(set, ((skill, set(postings)) for skill, postings in preferred.items()))
+            self._open = set(open_ids)
+            self._high_water = high_water or 0
+            # Gaps get a fresh window: their transactions may have committed while we were down
+            self._gaps = [(first, last, now) for first, last in gaps]
+
+    def catch_up(self) -> int:
+        with SessionLocal() as db:
+            return self.replay(db)
+
+    def rebuild(self) -> int:
+        with self._replay_lock:
+            with self._lock:
+                self._clear()
+                self._high_water = None
+                self._gaps = []
+            with SessionLocal() as db:
+                self._replay(db)
+        return self.count()
+
+    def count(self) -> int:
+        return len(self._ids)
+
+
+# Global index instance
+_job_skill_index: Optional[JobSkillIndex] = None
+
+
+def get_job_skill_index() -> JobSkillIndex:
+    """Get or create the process-wide job skill index."""
+    global _job_skill_index
+    if _job_skill_index is None:
+        _job_skill_index = JobSkillIndex(
+            refresh_seconds=settings.JOB_SKILL_INDEX_REFRESH_SECONDS,
+            gap_seconds=settings.JOB_SKILL_INDEX_GAP_SECONDS
+        )
+    return _job_skill_index
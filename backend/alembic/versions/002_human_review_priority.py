@@ -0,0 +1,32 @@
+"""Persist human review priority and claim leases
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('human_reviews', sa.Column('priority', sa.Integer, nullable=False, server_default='2'))
+    op.add_column('human_reviews', sa.Column('lease_expires_at', sa.DateTime, nullable=True))
+    op.create_index(
+        'idx_human_reviews_claim',
+        'human_reviews',
+        ['decision', 'review_type', 'priority', 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_human_reviews_claim', table_name='human_reviews')
+    op.drop_column('human_reviews', 'lease_expires_at')
+    op.drop_column('human_reviews', 'priority')
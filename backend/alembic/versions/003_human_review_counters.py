@@ -0,0 +1,54 @@
+"""Incremental human review queue counters and wait-time histogram
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'human_review_counters',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('review_type', sa.String(50), nullable=False),
+        sa.Column('priority', sa.Integer, nullable=False),
+        sa.Column('decision', sa.String(50), nullable=False),
+        sa.Column('count', sa.Integer, nullable=False, server_default='0'),
+        sa.UniqueConstraint('review_type', 'priority', 'decision', name='uq_human_review_counters_key'),
+    )
+    op.create_index('ix_human_review_counters_id', 'human_review_counters', ['id'])
+
+    op.create_table(
+        'human_review_wait_buckets',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('review_type', sa.String(50), nullable=False),
+        sa.Column('bucket', sa.Integer, nullable=False),
+        sa.Column('count', sa.Integer, nullable=False, server_default='0'),
+        sa.UniqueConstraint('review_type', 'bucket', name='uq_human_review_wait_buckets_key'),
+    )
+    op.create_index('ix_human_review_wait_buckets_id', 'human_review_wait_buckets', ['id'])
+
+    # Backfill counters from existing reviews (the last full scan)
+    op.execute(
+        """
+        INSERT INTO human_review_counters (review_type, priority, decision, count)
+        SELECT review_type, priority, decision, COUNT(*)
+        FROM human_reviews
+        GROUP BY review_type, priority, decision
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('human_review_wait_buckets')
+    op.drop_table('human_review_counters')
@@ -0,0 +1,30 @@
+"""Track asynchronous moderation status on forum posts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing posts predate the pipeline and are treated as approved
+    op.add_column(
+        'forum_posts',
+        sa.Column('moderation_status', sa.String(20), nullable=False, server_default='approved')
+    )
+    op.create_index('ix_forum_posts_moderation_status', 'forum_posts', ['moderation_status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_forum_posts_moderation_status', table_name='forum_posts')
+    op.drop_column('forum_posts', 'moderation_status')
@@ -0,0 +1,44 @@
+"""Content-addressed bias analysis cache
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'bias_analysis_cache',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('content_type', sa.String(50), nullable=False),
+        sa.Column('model_version', sa.String(100), nullable=False),
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('simhash', sa.BigInteger, nullable=False),
+        sa.Column('band0', sa.Integer, nullable=False),
+        sa.Column('band1', sa.Integer, nullable=False),
+        sa.Column('band2', sa.Integer, nullable=False),
+        sa.Column('band3', sa.Integer, nullable=False),
+        sa.Column('result', postgresql.JSON, nullable=False),
+        sa.Column('hit_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column('last_hit_at', sa.DateTime, nullable=True),
+        sa.UniqueConstraint('model_version', 'content_type', 'content_hash', name='uq_bias_cache_content'),
+    )
+    op.create_index('ix_bias_analysis_cache_id', 'bias_analysis_cache', ['id'])
+    for band in range(4):
+        op.create_index(f'idx_bias_cache_band{band}', 'bias_analysis_cache', ['model_version', f'band{band}'])
+
+
+def downgrade() -> None:
+    op.drop_table('bias_analysis_cache')
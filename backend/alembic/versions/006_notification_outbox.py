@@ -0,0 +1,45 @@
+"""Durable notification outbox
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('channel', sa.String(20), nullable=False, server_default='email'),
+        sa.Column('recipient', sa.String(255), nullable=False),
+        sa.Column('subject', sa.String(255), nullable=False),
+        sa.Column('html_body', sa.Text, nullable=False),
+        sa.Column('text_body', sa.Text, nullable=True),
+        sa.Column('template', sa.String(100), nullable=True),
+        sa.Column('template_data', postgresql.JSON, nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.Column('provider', sa.String(20), nullable=True),
+        sa.Column('provider_message_id', sa.String(255), nullable=True),
+        sa.Column('created_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column('sent_at', sa.DateTime, nullable=True),
+    )
+    op.create_index('ix_notification_outbox_id', 'notification_outbox', ['id'])
+    op.create_index('idx_notification_outbox_due', 'notification_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('notification_outbox')
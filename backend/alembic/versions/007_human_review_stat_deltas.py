@@ -0,0 +1,32 @@
+"""Append-only human review stat deltas
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'human_review_stat_deltas',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('review_type', sa.String(50), nullable=False),
+        sa.Column('priority', sa.Integer, nullable=True),
+        sa.Column('decision', sa.String(50), nullable=True),
+        sa.Column('bucket', sa.Integer, nullable=True),
+        sa.Column('delta', sa.Integer, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('human_review_stat_deltas')
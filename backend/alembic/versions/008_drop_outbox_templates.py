@@ -0,0 +1,27 @@
+"""Drop unused notification outbox template columns
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_column('notification_outbox', 'template_data')
+    op.drop_column('notification_outbox', 'template')
+
+
+def downgrade() -> None:
+    op.add_column('notification_outbox', sa.Column('template', sa.String(100), nullable=True))
+    op.add_column('notification_outbox', sa.Column('template_data', postgresql.JSON, nullable=True))
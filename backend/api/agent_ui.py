@@ -2,79 +2,79 @@
 API endpoints for agent UI schemas and real-time updates
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
 from fastapi.responses import StreamingResponse
-from typing import Dict, Any, Optional
-import json
-import asyncio
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 
+from infrastructure.agent_bus import get_agent_bus, AgentNotFound, AgentCallError
+
 router = APIRouter(prefix="/api/agents", tags=["agent-ui"])
 
-# Store agent instances (in production, use proper dependency injection)
+# Agents owned by this worker; other workers' agents are reached through the agent bus
 agent_registry: Dict[str, Any] = {}
 
 
+@router.get("")
+async def list_agents() -> Dict[str, Any]:
+    """List agents registered on any worker."""
+    return {"agents": await get_agent_bus().list_agents_async()}
+
+
 @router.get("/{agent_id}/ui-schema")
 async def get_ui_schema(agent_id: str) -> Dict[str, Any]:
-    """Get UI schema for an agent."""
-    agent = agent_registry.get(agent_id)
-    if not agent:
+    """Get UI schema for an agent (on any worker)."""
+    metadata = await get_agent_bus().get_agent_async(agent_id)
+    if not metadata:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
-    if not hasattr(agent, 'get_ui_schema'):
+    if not metadata.get("supports_ui_schema"):
         raise HTTPException(
             status_code=400,
             detail=f"Agent {agent_id} does not support UI schema"
         )
     
-    state = agent.get_state()
-    schema = agent.get_ui_schema(state)
-    return schema
+    try:
+        return await get_agent_bus().call(agent_id, "ui_schema")
+    except AgentNotFound:
+        raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
+    except AgentCallError as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
 
 @router.get("/{agent_id}/state")
 async def get_agent_state(agent_id: str) -> Dict[str, Any]:
-    """Get current state of an agent."""
-    agent = agent_registry.get(agent_id)
-    if not agent:
+    """Get current state of an agent (from this worker's replica)."""
+    state = get_agent_bus().get_state(agent_id)
+    if state is None:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
     return {
         "agentId": agent_id,
-        "state": agent.get_state(),
+        "state": state,
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
 @router.get("/{agent_id}/state/stream")
-async def stream_agent_state(agent_id: str):
-    """Stream agent state updates via Server-Sent Events."""
-    agent = agent_registry.get(agent_id)
-    if not agent:
-        raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
+async def stream_agent_state(
+    agent_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Stream agent state updates via Server-Sent Events.
     
-    async def event_generator():
-        last_state = None
-        
-        while True:
-            current_state = agent.get_state()
-            
-            # Only send if state changed
-            if current_state != last_state:
-                update = {
-                    "agentId": agent_id,
-                    "state": current_state,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                
-                yield f"data: {json.dumps(update)}\n\n"
-                last_state = current_state
-            
-            await asyncio.sleep(1)  # Check every second
+    The first frame is a full snapshot ({"type": "snapshot", "state"}); after
+    that only JSON Patch diffs ({"type": "patch", "patch"}) are sent when the
+    agent's state changes, with comment heartbeats while idle. Reconnecting
+    clients send Last-Event-ID and receive just the patches they missed.
+    """
+    broadcaster = get_agent_bus().broadcaster
+    if not broadcaster.has_agent(agent_id):
+        raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
     return StreamingResponse(
-        event_generator(),
+        broadcaster.subscribe(agent_id, last_event_id),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -90,14 +90,13 @@ async def execute_agent_action(
     action_id: str,
     payload: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    """Execute an action on an agent."""
-    agent = agent_registry.get(agent_id)
-    if not agent:
+    """Execute an action on an agent (routed to the worker that owns it)."""
+    if not await get_agent_bus().get_agent_async(agent_id):
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
     
     # Execute action (implementation depends on agent)
     try:
-        result = await agent.execute_action(action_id, payload or {})
+        result = await get_agent_bus().call(agent_id, "action", {"action_id": action_id, "payload": payload or {}})
         return {
             "success": True,
             "result": result,
@@ -132,12 +131,22 @@ async def register_agent_endpoint(agent_id: str) -> Dict[str, Any]:
             self.agent_id = agent_id
             self.name = name
             self.state: Dict[str, Any] = {}
+            self._state_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
         
         def get_state(self) -> Dict[str, Any]:
             return self.state.copy()
         
         def update_state(self, updates: Dict[str, Any]) -> None:
             self.state.update(updates)
+            for listener in list(self._state_listeners):
+                listener(self.agent_id, updates)
+        
+        def add_state_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+            self._state_listeners.append(listener)
+        
+        def remove_state_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+            if listener in self._state_listeners:
+                self._state_listeners.remove(listener)
     
     # Create and register test agent
     test_agent = SimpleAgent(agent_id=agent_id, name=f"Test Agent {agent_id}")
@@ -147,7 +156,7 @@ async def register_agent_endpoint(agent_id: str) -> Dict[str, Any]:
         "created_at": datetime.utcnow().isoformat()
     })
     
-    register_agent(agent_id, test_agent)
+    await register_agent_async(agent_id, test_agent)
     
     return {
         "success": True,
@@ -158,12 +167,20 @@ async def register_agent_endpoint(agent_id: str) -> Dict[str, Any]:
 
 
 def register_agent(agent_id: str, agent: Any):
-    """Register an agent instance."""
+    """Register an agent owned by this worker and publish it cluster-wide."""
+    agent_registry[agent_id] = agent
+    get_agent_bus().register(agent_id, agent)
+
+
+async def register_agent_async(agent_id: str, agent: Any):
+    """register_agent for async handlers (keeps the bus I/O off the event loop)."""
     agent_registry[agent_id] = agent
+    await get_agent_bus().register_async(agent_id, agent)
 
 
 def unregister_agent(agent_id: str):
     """Unregister an agent instance."""
     if agent_id in agent_registry:
         del agent_registry[agent_id]
+        get_agent_bus().unregister(agent_id)
 
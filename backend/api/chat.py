@@ -5,7 +5,7 @@ Integrates with conversations system and uses unified LLM client.
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import logging
 
 from database.connection import get_db
@@ -130,7 +130,7 @@ async def chat_status():
 class JobMatchChatRequest(BaseModel):
     """Job match chat request model."""
     message: str
-    context: Dict[str, any]
+    context: Dict[str, Any]
     conversationHistory: Optional[List[Dict[str, str]]] = None
 
 
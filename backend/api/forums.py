@@ -8,6 +8,7 @@ from typing import List, Optional
 
 from database.connection import get_db
 from database.models import ForumPost
+from ai.moderation_pipeline import PrefilterVerdict, get_moderation_pipeline, queue_hidden_post_review
 
 router = APIRouter(prefix="/api/forums", tags=["forums"])
 
@@ -29,6 +30,7 @@ class ForumPostResponse(BaseModel):
     title: str
     content: str
     parent_post_id: Optional[int]
+    moderation_status: str
     created_at: str
 
 
@@ -37,19 +39,43 @@ async def create_post(
     request: ForumPostRequest,
     db: Session = Depends(get_db)
 ):
-    """Create a new forum post."""
+    """
+    Create a new forum post.
+    
+    Published optimistically: obvious cases are settled by the local
+    pre-filter (clear violations are stored hidden, never visible), everything
+    else is moderated asynchronously in batches and hidden retroactively if
+    flagged.
+    """
+    pipeline = get_moderation_pipeline()
+    screening = pipeline.screen(f"{request.title}\n{request.content}")
+    status = {
+        PrefilterVerdict.ALLOW: "approved",
+        PrefilterVerdict.FLAG: "hidden",
+        PrefilterVerdict.REVIEW: "pending",
+    }[screening.verdict]
+    
     post = ForumPost(
         user_id=request.user_id,
         forum_topic=request.forum_topic,
         title=request.title,
         content=request.content,
-        parent_post_id=request.parent_post_id
+        parent_post_id=request.parent_post_id,
+        moderation_status=status
     )
     
     db.add(post)
-    db.commit()
+    if screening.verdict == PrefilterVerdict.FLAG:
+        # The post and its review entry commit together
+        db.flush()
+        queue_hidden_post_review(db, post.id, screening.reasons)
+    else:
+        db.commit()
     db.refresh(post)
     
+    if screening.verdict == PrefilterVerdict.REVIEW:
+        await pipeline.submit(post.id, f"{post.title}\n{post.content}")
+    
     return ForumPostResponse(
         id=post.id,
         user_id=post.user_id,
@@ -57,6 +83,7 @@ async def create_post(
         title=post.title,
         content=post.content,
         parent_post_id=post.parent_post_id,
+        moderation_status=post.moderation_status,
         created_at=post.created_at.isoformat()
     )
 
@@ -67,7 +94,10 @@ async def get_post(
     db: Session = Depends(get_db)
 ):
     """Get forum post by ID."""
-    post = db.query(ForumPost).filter(ForumPost.id == post_id).first()
+    post = db.query(ForumPost).filter(
+        ForumPost.id == post_id,
+        ForumPost.moderation_status != "hidden"
+    ).first()
     
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -79,6 +109,7 @@ async def get_post(
         title=post.title,
         content=post.content,
         parent_post_id=post.parent_post_id,
+        moderation_status=post.moderation_status,
         created_at=post.created_at.isoformat()
     )
 
@@ -92,7 +123,8 @@ async def list_topic_posts(
     """List posts in a forum topic."""
     posts = db.query(ForumPost).filter(
         ForumPost.forum_topic == topic,
-        ForumPost.parent_post_id == None  # Top-level posts only
+        ForumPost.parent_post_id == None,  # Top-level posts only
+        ForumPost.moderation_status != "hidden"
     ).order_by(ForumPost.created_at.desc()).limit(limit).all()
     
     return [
@@ -103,6 +135,7 @@ async def list_topic_posts(
             title=p.title,
             content=p.content,
             parent_post_id=p.parent_post_id,
+            moderation_status=p.moderation_status,
             created_at=p.created_at.isoformat()
         )
         for p in posts
@@ -116,7 +149,8 @@ async def get_replies(
 ):
     """Get replies to a post."""
     replies = db.query(ForumPost).filter(
-        ForumPost.parent_post_id == post_id
+        ForumPost.parent_post_id == post_id,
+        ForumPost.moderation_status != "hidden"
     ).order_by(ForumPost.created_at.asc()).all()
     
     return [
@@ -127,6 +161,7 @@ async def get_replies(
             title=r.title,
             content=r.content,
             parent_post_id=r.parent_post_id,
+            moderation_status=r.moderation_status,
             created_at=r.created_at.isoformat()
         )
         for r in replies
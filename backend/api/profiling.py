@@ -0,0 +1,148 @@
+"""
+Admin profiling endpoints.
+Sample CPU stacks and inspect event loop lag on the worker that serves the request.
+"""
+import asyncio
+import logging
+import os
+import secrets
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from monitoring.profiler import (
+    SamplingProfiler,
+    StackProfile,
+    describe_tasks,
+    get_continuous_profiler,
+    get_loop_lag_monitor,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 300
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Only callers presenting ADMIN_API_TOKEN; the routes do not exist without one configured."""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/api/admin/profiling", tags=["admin"], dependencies=[Depends(require_admin)])
+
+# The on-demand session of this worker (either kind), and the one /start opened for /stop
+_session: Optional[SamplingProfiler] = None
+_open_session: Optional[SamplingProfiler] = None
+
+
+def _profile_response(profile: StackProfile, output: str, name: str):
+    """Collapsed stacks as a downloadable file (flamegraph.pl / speedscope), or a JSON summary."""
+    if output == "json":
+        return {"pid": os.getpid(), **profile.summary()}
+    filename = f"{name}-{os.getpid()}-{int(time.time())}.collapsed"
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/cpu")
+async def profile_cpu(
+    seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    output: str = Query("collapsed", pattern="^(collapsed|json)$")
+):
+    """
+    Sample every thread of this worker for `seconds`, then return the profile.
+    
+    Idle threads (parked on locks, queues or select) are left out unless
+    include_idle is set.
+    """
+    global _session
+    if _session is not None and _session.running:
+        raise HTTPException(status_code=409, detail="A profiling session is already running on this worker")
+    
+    profiler = SamplingProfiler(interval=interval_ms / 1000, include_idle=include_idle)
+    _session = profiler
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = profiler.stop()
+    logger.info(f"CPU profile taken: {profile.samples} samples over {profile.duration:.1f}s")
+    return _profile_response(profile, output, "cpu")
+
+
+@router.post("/start")
+async def start_profile(
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    max_seconds: float = Query(MAX_PROFILE_SECONDS, gt=0, le=MAX_PROFILE_SECONDS)
+):
+    """Start an open-ended session; POST /stop returns the profile. Stops itself after max_seconds."""
+    global _session, _open_session
+    if _session is not None and _session.running:
+        raise HTTPException(status_code=409, detail="A profiling session is already running on this worker")
+    
+    profiler = SamplingProfiler(interval=interval_ms / 1000, include_idle=include_idle)
+    _session = _open_session = profiler
+    profiler.start()
+    
+    def expire():
+        if _open_session is profiler and profiler.running:
+            profiler.stop()
+            logger.warning(f"Profiling session stopped after {max_seconds:g}s without /stop")
+    
+    asyncio.get_running_loop().call_later(max_seconds, expire)
+    return {"pid": os.getpid(), "running": True, "interval_ms": interval_ms, "max_seconds": max_seconds}
+
+
+@router.post("/stop")
+async def stop_profile(output: str = Query("collapsed", pattern="^(collapsed|json)$")):
+    """Stop the session /start opened and return its profile; a /cpu session is left to finish."""
+    global _session, _open_session
+    if _open_session is None:
+        raise HTTPException(status_code=409, detail="No session started by /start on this worker")
+    profiler, _open_session = _open_session, None
+    if _session is profiler:
+        _session = None
+    return _profile_response(profiler.stop(), output, "cpu")
+
+
+@router.post("/continuous/start")
+async def start_continuous():
+    """Start the low-rate rolling profiler (PROFILER_CONTINUOUS_HZ, default 5 Hz)."""
+    profiler = get_continuous_profiler()
+    profiler.start()
+    return {"pid": os.getpid(), "running": True, "hz": 1 / profiler.interval, "window_seconds": profiler.window_seconds}
+
+
+@router.post("/continuous/stop")
+async def stop_continuous():
+    get_continuous_profiler().stop()
+    return {"pid": os.getpid(), "running": False}
+
+
+@router.get("/continuous")
+async def continuous_profile(
+    seconds: Optional[int] = Query(None, gt=0),
+    output: str = Query("collapsed", pattern="^(collapsed|json)$")
+):
+    """The rolling profile over the last `seconds` (default: the whole window)."""
+    return _profile_response(get_continuous_profiler().profile(seconds), output, "continuous")
+
+
+@router.get("/loop")
+async def loop_status(events: int = Query(20, ge=0, le=100), tasks: bool = True):
+    """Event loop lag percentiles, recent blocking events with the blocking stack, and running tasks."""
+    status = {"pid": os.getpid(), **get_loop_lag_monitor().snapshot(events)}
+    if tasks:
+        status["tasks"] = describe_tasks()
+    return status
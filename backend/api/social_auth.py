@@ -12,6 +12,7 @@ from typing import Optional, Dict, Any
 from database.connection import get_db
 from database.models import AnonymousUser
 from auth.social_auth import create_social_auth_manager
+from auth.token_store import TokenIssueLimitExceeded
 from auth.session_manager import create_session_manager
 
 logger = logging.getLogger(__name__)
@@ -214,6 +215,12 @@ async def send_email_verification(
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except TokenIssueLimitExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         error_msg = str(e)
         logger.error(f"Failed to send email verification to {redact_email(request.email)}: {error_msg}", exc_info=True)
@@ -330,6 +337,12 @@ async def send_magic_link(
             logger.info(f"Magic link returned in response: {result.get('magic_link')}")
         
         return response
+    except TokenIssueLimitExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Failed to send magic link: {e}", exc_info=True)
         raise HTTPException(
@@ -457,37 +470,33 @@ async def debug_email_code(
     if getattr(settings, 'ENVIRONMENT', 'production') != 'development' and not getattr(settings, 'DEV_MODE', False):
         raise HTTPException(status_code=403, detail="Debug endpoint only available in development mode")
     
-    manager = create_social_auth_manager(db)
-    # Access the codes dict through the manager's module
-    import backend.auth.social_auth as social_auth_module
+    from auth.social_auth import EMAIL_CODE_NAMESPACE, _email_key
+    from auth.token_store import get_token_store
     email_lower = email.lower()
-    stored_data = social_auth_module._email_verification_codes.get(email_lower)
+    stored_data = get_token_store().get(EMAIL_CODE_NAMESPACE, _email_key(email_lower))
     
     if not stored_data:
         return {
             "email": email,
             "email_lower": email_lower,
             "status": "no_code",
-            "message": "No verification code found for this email",
-            "available_emails": list(social_auth_module._email_verification_codes.keys())
+            "message": "No verification code found for this email (missing or expired)"
         }
     
-    from datetime import datetime
     now = datetime.utcnow()
-    expires_at = stored_data["expires_at"]
-    is_expired = now > expires_at
-    time_remaining = (expires_at - now).total_seconds() if not is_expired else 0
+    expires_at = datetime.fromisoformat(stored_data["expires_at"])
+    time_remaining = max(0.0, (expires_at - now).total_seconds())
     
     return {
         "email": email,
         "email_lower": email_lower,
-        "status": "expired" if is_expired else "active",
+        "status": "active",
         "code": stored_data["code"],
-        "created_at": stored_data["created_at"].isoformat(),
-        "expires_at": expires_at.isoformat(),
-        "is_expired": is_expired,
+        "created_at": stored_data["created_at"],
+        "expires_at": stored_data["expires_at"],
+        "is_expired": False,
         "time_remaining_seconds": int(time_remaining),
-        "time_remaining_minutes": round(time_remaining / 60, 1) if time_remaining > 0 else 0
+        "time_remaining_minutes": round(time_remaining / 60, 1)
     }
 
 
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, Request, Header, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-import stripe
 import os
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -15,16 +14,10 @@ from sqlalchemy.orm import Session
 from database.connection import get_db
 from database.models import AnonymousUser, Subscription, CreditRequest
 from auth.session_manager import create_session_manager
-from auth.email_provider import create_email_manager
+from notifications.dispatcher import get_notification_dispatcher
 
 router = APIRouter(prefix="/api/subscription", tags=["subscription"])
 
-# Initialize Stripe - reload from env on each module load
-import sys
-if 'stripe' in sys.modules:
-    import importlib
-    importlib.reload(stripe)
-
 # CRITICAL: Stripe secret key must be set via environment variable
 # No default value - fail fast if not configured
 stripe_secret_key = os.getenv("STRIPE_SECRET_KEY")
@@ -41,7 +34,18 @@ if not stripe_secret_key:
         sys.exit(1)
     stripe_secret_key = "sk_test_your-stripe-secret-key"  # Only for dev/test
 
-stripe.api_key = stripe_secret_key
+
+def get_stripe():
+    """
+    The Stripe SDK, imported on first use and keyed with stripe_secret_key.
+    Importing stripe takes ~250ms, so keeping it out of module load keeps
+    app startup (and Cloud Run scale-out) fast.
+    """
+    import stripe
+    if stripe.api_key is None:
+        stripe.api_key = stripe_secret_key
+    return stripe
+
 
 # Pricing configuration - $1/month accessible tier
 MONTHLY_PRICE = 100  # $1.00 in cents
@@ -90,6 +94,7 @@ async def create_checkout_session(
     Works with anonymous_id (preferred) or email (legacy).
     Price: $1/month accessible tier
     """
+    stripe = get_stripe()
     try:
         # Get anonymous_id from request or session
         anonymous_id = request.anonymous_id
@@ -174,6 +179,7 @@ async def create_checkout_session(
 @router.get("/status/{customer_id}")
 async def get_subscription_status(customer_id: str):
     """Get subscription status for a customer."""
+    stripe = get_stripe()
     try:
         subscriptions = stripe.Subscription.list(
             customer=customer_id, status="all", limit=100
@@ -208,6 +214,7 @@ async def get_subscription_status_by_anonymous_id(
     Get subscription status by anonymous_id.
     Maintains zero-knowledge - only returns subscription status, not identity.
     """
+    stripe = get_stripe()
     try:
         # Find user by anonymous_id
         user = db.query(AnonymousUser).filter(AnonymousUser.id == anonymous_id).first()
@@ -273,6 +280,7 @@ async def get_subscription_status_by_anonymous_id(
 @router.post("/cancel")
 async def cancel_subscription(request: CancelSubscriptionRequest):
     """Cancel an active subscription."""
+    stripe = get_stripe()
     try:
         subscription = stripe.Subscription.cancel(request.subscription_id)
         return {
@@ -290,6 +298,7 @@ async def request_refund(request: RefundRequest):
     Request a refund within 14 days of subscription.
     After 14 days, user must request credits instead.
     """
+    stripe = get_stripe()
     try:
         subscription = stripe.Subscription.retrieve(request.subscription_id)
         subscription_start = datetime.fromtimestamp(subscription.created)
@@ -343,6 +352,7 @@ async def request_credits(request: CreditRequest, db: Session = Depends(get_db))
     Request credits within 60 days (requires written correspondence).
     Credits must be manually reviewed by support team.
     """
+    stripe = get_stripe()
     try:
         subscription = stripe.Subscription.retrieve(request.subscription_id)
         subscription_start = datetime.fromtimestamp(subscription.created)
@@ -381,20 +391,16 @@ async def request_credits(request: CreditRequest, db: Session = Depends(get_db))
             
             # Send email to support team
             try:
-                email_manager = create_email_manager()
                 support_email = os.getenv("SUPPORT_EMAIL", "support@jobmatch.zip")
                 
                 subject = f"Credit Request - Subscription {request.subscription_id[:8]}..."
                 html_body = generate_credit_request_email_html(credit_request, request)
                 text_body = generate_credit_request_email_text(credit_request, request)
                 
-                result = await email_manager.send_email(support_email, subject, html_body, text_body)
-                if result.get("success"):
-                    print(f"Credit request notification sent to support team: {support_email}")
-                else:
-                    print(f"Failed to send credit request email: {result.get('error')}")
+                get_notification_dispatcher().enqueue_email(db, support_email, subject, html_body, text_body)
+                print(f"Credit request notification queued for support team: {support_email}")
             except Exception as e:
-                print(f"Error sending credit request email: {e}")
+                print(f"Error queueing credit request email: {e}")
                 # Don't fail the request if email fails
             
             print(f"Credit request created: ID {credit_request.id}, Subscription: {request.subscription_id}")
@@ -438,6 +444,7 @@ async def stripe_webhook(
     Stripe webhook handler for subscription events.
     Configure this URL in your Stripe Dashboard: https://jobmatch.zip/api/subscription/webhook
     """
+    stripe = get_stripe()
     webhook_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
     if not webhook_secret:
         raise HTTPException(status_code=500, detail={"error": "Webhook secret not configured"})
@@ -596,8 +603,6 @@ async def stripe_webhook(
             
             if customer_email:
                 try:
-                    email_manager = create_email_manager()
-                    
                     # Get subscription details for email
                     subscription_info = None
                     if subscription_id:
@@ -614,13 +619,10 @@ async def stripe_webhook(
                     html_body = generate_receipt_email_html(amount_paid, invoice_url, subscription_info)
                     text_body = generate_receipt_email_text(amount_paid, invoice_url, subscription_info)
                     
-                    result = await email_manager.send_email(customer_email, subject, html_body, text_body)
-                    if result.get("success"):
-                        print(f"Receipt email sent to {customer_email}")
-                    else:
-                        print(f"Failed to send receipt email: {result.get('error')}")
+                    get_notification_dispatcher().enqueue_email(db, customer_email, subject, html_body, text_body)
+                    print(f"Receipt email queued for {customer_email}")
                 except Exception as e:
-                    print(f"Error sending receipt email: {e}")
+                    print(f"Error queueing receipt email: {e}")
 
         elif event_type == "invoice.payment_failed":
             print(f"Payment failed: {data['id']}")
@@ -632,19 +634,14 @@ async def stripe_webhook(
             
             if customer_email:
                 try:
-                    email_manager = create_email_manager()
-                    
                     subject = f"Payment Failed - Action Required - JobMatch.zip"
                     html_body = generate_payment_failed_email_html(amount_due, invoice_url, attempt_count)
                     text_body = generate_payment_failed_email_text(amount_due, invoice_url, attempt_count)
                     
-                    result = await email_manager.send_email(customer_email, subject, html_body, text_body)
-                    if result.get("success"):
-                        print(f"Payment failure notification sent to {customer_email}")
-                    else:
-                        print(f"Failed to send payment failure email: {result.get('error')}")
+                    get_notification_dispatcher().enqueue_email(db, customer_email, subject, html_body, text_body)
+                    print(f"Payment failure notification queued for {customer_email}")
                 except Exception as e:
-                    print(f"Error sending payment failure email: {e}")
+                    print(f"Error queueing payment failure email: {e}")
 
         else:
             print(f"Unhandled event type: {event_type}")
@@ -891,6 +888,7 @@ JobMatch.zip Support Team
 # Helper functions
 async def get_or_create_customer(email: str, anonymous_id: Optional[str] = None):
     """Get existing customer or create new one."""
+    stripe = get_stripe()
     customers = stripe.Customer.list(email=email, limit=1)
     
     if customers.data:
@@ -910,6 +908,7 @@ async def get_or_create_customer(email: str, anonymous_id: Optional[str] = None)
 
 async def get_customer_subscription_count(customer_id: str) -> int:
     """Count total subscriptions for a customer."""
+    stripe = get_stripe()
     subscriptions = stripe.Subscription.list(
         customer=customer_id, status="all", limit=100
     )
@@ -7,8 +7,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from openai import OpenAI
-from config import settings
+from llm import create_openai_client
 from database.models import CapabilityAssessment, AnonymousUser
 from resilience.state_management import StateManager, CheckpointType
 
@@ -20,7 +19,7 @@ class XDMIQAssessmentEngine:
     
     def __init__(self, db_session: Session):
         self.db = db_session
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        self.openai_client = create_openai_client()
         self.state_manager = StateManager(db_session)
     
     def start_xdmiq_assessment(
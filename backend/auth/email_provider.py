@@ -2,24 +2,70 @@
 Email Provider Integration.
 Supports SMTP and Amazon SES email service providers.
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-import smtplib
+import threading
+from typing import Dict, Any, Optional, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import boto3
-from botocore.exceptions import ClientError
 
 from config import settings
 from security.pii_redaction import redact_email
+from notifications.transports import SMTPConnectionPool, get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
+# boto3 clients are thread-safe and expensive to build; share one per config
+_ses_clients: Dict[Tuple[str, str], Any] = {}
+_ses_clients_lock = threading.Lock()
+
+
+def _get_ses_client(access_key_id: str, secret_access_key: str, region: str):
+    """Get the shared SES client, creating (and quota-checking) it once."""
+    key = (access_key_id, region)
+    with _ses_clients_lock:
+        client = _ses_clients.get(key)
+        if client is not None:
+            return client
+        
+        import boto3  # deferred: ~150ms to import, only needed once SES is used
+        client = boto3.client(
+            'ses',
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region
+        )
+        # Test connection by getting send quota (doesn't require verified email)
+        try:
+            quota = client.get_send_quota()
+            logger.info(f"Amazon SES client initialized for region: {region} (Max 24h Send: {quota.get('Max24HourSend', 'N/A')})")
+        except Exception as quota_error:
+            logger.warning(f"SES client created but quota check failed: {quota_error}. Email sending may still work.")
+        _ses_clients[key] = client
+        return client
+
+
+def build_verification_email(code: str) -> Tuple[str, str, str]:
+    """Render the verification code email (subject, html, text)."""
+    subject = "Your XDMIQ Verification Code"
+    html_body = f"""
+    <html>
+    <body>
+        <h2>XDMIQ Verification Code</h2>
+        <p>Your verification code is: <strong>{code}</strong></p>
+        <p>This code is valid for 10 minutes.</p>
+        <p>If you didn't request this code, please ignore this email.</p>
+    </body>
+    </html>
+    """
+    text_body = f"Your XDMIQ verification code is: {code}. Valid for 10 minutes."
+    return subject, html_body, text_body
+
 
 class EmailProviderManager:
     """Manages email provider integrations."""
     
-    def __init__(self):
+    def __init__(self, smtp_pool: Optional[SMTPConnectionPool] = None):
         self.provider_mode = getattr(settings, "EMAIL_PROVIDER_MODE", "smtp").lower()
         
         # SMTP settings
@@ -28,6 +74,19 @@ class EmailProviderManager:
         self.smtp_user = getattr(settings, "SMTP_USER", "")
         self.smtp_password = getattr(settings, "SMTP_PASSWORD", "")
         
+        # Persistent pooled SMTP connections (an injected pool, e.g. pointing
+        # at notifications.local_smtp.LocalSMTPServer, is always used)
+        self.smtp_pool = smtp_pool
+        if self.smtp_pool is None and self.smtp_user:
+            self.smtp_pool = get_smtp_pool(
+                self.smtp_host,
+                self.smtp_port,
+                self.smtp_user,
+                self.smtp_password,
+                use_tls=settings.SMTP_USE_TLS,
+                max_connections=settings.SMTP_POOL_SIZE
+            )
+        
         # Amazon SES settings
         self.aws_access_key_id = getattr(settings, "AWS_ACCESS_KEY_ID", "")
         self.aws_secret_access_key = getattr(settings, "AWS_SECRET_ACCESS_KEY", "")
@@ -42,18 +101,11 @@ class EmailProviderManager:
         self.ses_client = None
         if self.provider_mode == "ses" and self.aws_access_key_id and self.aws_secret_access_key:
             try:
-                self.ses_client = boto3.client(
-                    'ses',
-                    aws_access_key_id=self.aws_access_key_id,
-                    aws_secret_access_key=self.aws_secret_access_key,
-                    region_name=self.ses_region
+                self.ses_client = _get_ses_client(
+                    self.aws_access_key_id,
+                    self.aws_secret_access_key,
+                    self.ses_region
                 )
-                # Test connection by getting send quota (doesn't require verified email)
-                try:
-                    quota = self.ses_client.get_send_quota()
-                    logger.info(f"Amazon SES client initialized for region: {self.ses_region} (Max 24h Send: {quota.get('Max24HourSend', 'N/A')})")
-                except Exception as quota_error:
-                    logger.warning(f"SES client created but quota check failed: {quota_error}. Email sending may still work.")
             except Exception as e:
                 logger.error(f"Failed to initialize SES client: {e}", exc_info=True)
                 self.ses_client = None
@@ -86,6 +138,7 @@ class EmailProviderManager:
             logger.warning("SES client not initialized, falling back to SMTP")
             return await self._send_email_smtp(to_email, subject, html_body, text_body)
         
+        from botocore.exceptions import ClientError
         try:
             # Prepare message
             message = {
@@ -99,13 +152,15 @@ class EmailProviderManager:
             if text_body:
                 message['Body']['Text'] = {'Data': text_body, 'Charset': 'UTF-8'}
             
-            # Send email via SES
+            # Send email via SES (blocking boto3 call - keep it off the event loop)
             # Ensure from_email is set correctly
             source_email = self.from_email or self.ses_from_email or "info@jobmatch.zip"
-            response = self.ses_client.send_email(
-                Source=source_email,
-                Destination={'ToAddresses': [to_email]},
-                Message=message
+            response = await asyncio.to_thread(
+                lambda: self.ses_client.send_email(
+                    Source=source_email,
+                    Destination={'ToAddresses': [to_email]},
+                    Message=message
+                )
             )
             
             message_id = response.get('MessageId', '')
@@ -153,8 +208,8 @@ class EmailProviderManager:
         html_body: str,
         text_body: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Send email using SMTP."""
-        if not self.smtp_user:
+        """Send email using SMTP over a pooled connection."""
+        if self.smtp_pool is None:
             logger.warning("SMTP not configured, simulating email send")
             return {
                 "success": True,
@@ -172,11 +227,8 @@ class EmailProviderManager:
                 msg.attach(MIMEText(text_body, 'plain'))
             msg.attach(MIMEText(html_body, 'html'))
             
-            # Send via SMTP
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            # Send via a persistent pooled connection (blocking - run in executor)
+            await asyncio.to_thread(self.smtp_pool.send, msg)
             
             logger.info(f"SMTP email sent to {redact_email(to_email)}: {subject}")
             
@@ -199,19 +251,7 @@ class EmailProviderManager:
         code: str
     ) -> Dict[str, Any]:
         """Send verification code email."""
-        subject = "Your XDMIQ Verification Code"
-        html_body = f"""
-        <html>
-        <body>
-            <h2>XDMIQ Verification Code</h2>
-            <p>Your verification code is: <strong>{code}</strong></p>
-            <p>This code is valid for 10 minutes.</p>
-            <p>If you didn't request this code, please ignore this email.</p>
-        </body>
-        </html>
-        """
-        text_body = f"Your XDMIQ verification code is: {code}. Valid for 10 minutes."
-        
+        subject, html_body, text_body = build_verification_email(code)
         return await self.send_email(email, subject, html_body, text_body)
     
     def validate_email(self, email: str) -> bool:
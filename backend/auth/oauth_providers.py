@@ -4,7 +4,6 @@ Handles OAuth flows for Facebook, LinkedIn, Google, Microsoft, Apple.
 """
 import logging
 from typing import Dict, Any, Optional
-import httpx
 
 from config import settings
 
@@ -100,6 +99,7 @@ class OAuthProviderManager:
             client_id = getattr(settings, f"{provider.upper()}_CLIENT_ID", "")
             client_secret = getattr(settings, f"{provider.upper()}_CLIENT_SECRET", "")
         
+        import httpx
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 provider_config["token_url"],
@@ -133,6 +133,7 @@ class OAuthProviderManager:
             # Apple provides user info in token response
             return {}
         
+        import httpx
         async with httpx.AsyncClient() as client:
             headers = {"Authorization": f"Bearer {access_token}"}
             response = await client.get(
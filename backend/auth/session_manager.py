@@ -4,29 +4,86 @@ Implements secure, HIPAA-compliant token-based sessions.
 """
 import logging
 import secrets
+import threading
+import time
 import redis
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from fastapi import Request, Response
 
 from config import settings
+from infrastructure.redis_pool import get_redis
 
 logger = logging.getLogger(__name__)
 
-# Redis connection
-_redis_client: Optional[redis.Redis] = None
-
 
 def get_redis_client() -> redis.Redis:
-    """Get or create Redis client."""
-    global _redis_client
-    if _redis_client is None:
-        _redis_client = redis.from_url(
-            settings.REDIS_URL,
-            decode_responses=True
-        )
-        logger.info(f"Redis client connected to {settings.REDIS_URL}")
-    return _redis_client
+    """Get the shared pooled Redis client."""
+    return get_redis()
+
+
+# Read a session and slide its expiry in one round trip. The touch is
+# skipped while the key's remaining TTL shows it was refreshed less than
+# ARGV[3] seconds ago, so hot sessions don't write on every request.
+# When touched, the new last_active is appended so it wins in dict().
+_GET_AND_TOUCH_SCRIPT = """
+local data = redis.call('HGETALL', KEYS[1])
+if #data == 0 then
+    return data
+end
+local ttl = redis.call('TTL', KEYS[1])
+if ttl < 0 or tonumber(ARGV[2]) - ttl >= tonumber(ARGV[3]) then
+    redis.call('HSET', KEYS[1], 'last_active', ARGV[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    table.insert(data, 'last_active')
+    table.insert(data, ARGV[1])
+end
+return data
+"""
+
+
+class _SessionCache:
+    """
+    Per-process micro-cache of recently read sessions.
+
+    Shared by every SessionManager in the process (managers are created per
+    request). Entries live for a few seconds, so a session destroyed on
+    another worker can still be served here until its entry lapses.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[token]
+                return None
+            return dict(entry[1])
+
+    def put(self, token: str, data: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl_seconds, dict(data))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_session_cache = _SessionCache()
 
 
 class SessionManager:
@@ -36,9 +93,26 @@ class SessionManager:
     SESSION_COOKIE_NAME = "jobmatch_session"
     SESSION_DURATION = timedelta(days=30)  # Rolling 30-day sessions
     
-    def __init__(self, redis_client: Optional[redis.Redis] = None):
-        """Initialize session manager with Redis client."""
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        cache_seconds: Optional[float] = None,
+        touch_interval_seconds: Optional[int] = None
+    ):
+        """
+        Initialize session manager with Redis client.
+        
+        Args:
+            redis_client: Redis client (defaults to the shared client)
+            cache_seconds: How long a read session is served from process memory (0 disables)
+            touch_interval_seconds: Minimum gap between last_active/expiry writes for a session
+        """
         self.redis = redis_client or get_redis_client()
+        self.cache_seconds = settings.SESSION_CACHE_SECONDS if cache_seconds is None else cache_seconds
+        self.touch_interval_seconds = (
+            settings.SESSION_TOUCH_INTERVAL_SECONDS if touch_interval_seconds is None else touch_interval_seconds
+        )
+        self._get_and_touch = self.redis.register_script(_GET_AND_TOUCH_SCRIPT)
     
     def create_session(
         self,
@@ -74,9 +148,11 @@ class SessionManager:
         session_key = f"session:{token}"
         expiration_seconds = int(self.SESSION_DURATION.total_seconds())
         
-        # Store each field separately for easier updates
-        self.redis.hset(session_key, mapping=session_data)
-        self.redis.expire(session_key, expiration_seconds)
+        # Store each field separately for easier updates (one round trip)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(session_key, mapping=session_data)
+        pipe.expire(session_key, expiration_seconds)
+        pipe.execute()
         
         logger.info(f"Created session for user {anonymous_id[:8]}... (expires in {expiration_seconds}s)")
         
@@ -100,20 +176,40 @@ class SessionManager:
         if not token:
             return None
         
-        # Retrieve from Redis
-        session_key = f"session:{token}"
-        session_data = self.redis.hgetall(session_key)
+        return self.get_session_by_token(token)
+    
+    def get_session_by_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Get session data by token, sliding its expiry.
+        
+        Served from the process micro-cache when fresh; otherwise read and
+        touched (rolling session, throttled) in a single Redis round trip.
+        """
+        if self.cache_seconds > 0:
+            cached = _session_cache.get(token)
+            if cached is not None:
+                return cached
         
+        session_data = self._read_and_touch(token, self.touch_interval_seconds)
         if not session_data:
             logger.debug("Session not found or expired")
             return None
         
-        # Update last active timestamp (rolling session)
-        self.redis.hset(session_key, "last_active", datetime.utcnow().isoformat())
-        self.redis.expire(session_key, int(self.SESSION_DURATION.total_seconds()))
-        
+        if self.cache_seconds > 0:
+            _session_cache.put(token, session_data, self.cache_seconds)
         return session_data
     
+    def _read_and_touch(self, token: str, touch_interval_seconds: int) -> Dict[str, Any]:
+        raw = self._get_and_touch(
+            keys=[f"session:{token}"],
+            args=[
+                datetime.utcnow().isoformat(),
+                int(self.SESSION_DURATION.total_seconds()),
+                touch_interval_seconds
+            ]
+        )
+        return dict(zip(raw[::2], raw[1::2]))
+    
     def get_anonymous_id(self, request: Request) -> Optional[str]:
         """
         Get anonymous ID from session cookie.
@@ -144,16 +240,13 @@ class SessionManager:
         if not token:
             return False
         
-        session_key = f"session:{token}"
-        
-        # Check if session exists
-        if not self.redis.exists(session_key):
+        # Check existence and refresh expiration unconditionally (one round trip)
+        session_data = self._read_and_touch(token, 0)
+        if not session_data:
+            _session_cache.invalidate(token)
             return False
-        
-        # Refresh expiration
-        expiration_seconds = int(self.SESSION_DURATION.total_seconds())
-        self.redis.expire(session_key, expiration_seconds)
-        self.redis.hset(session_key, "last_active", datetime.utcnow().isoformat())
+        if self.cache_seconds > 0:
+            _session_cache.put(token, session_data, self.cache_seconds)
         
         # Refresh cookie
         self._set_session_cookie(response, token)
@@ -178,6 +271,7 @@ class SessionManager:
         # Delete from Redis
         session_key = f"session:{token}"
         deleted = self.redis.delete(session_key)
+        _session_cache.invalidate(token)
         
         # Clear cookie
         response.delete_cookie(
@@ -226,3 +320,8 @@ class SessionManager:
 def create_session_manager(redis_client: Optional[redis.Redis] = None) -> SessionManager:
     """Create session manager instance."""
     return SessionManager(redis_client)
+
+
+def get_session_from_request(request: Request) -> Optional[Dict[str, Any]]:
+    """Get session data for the request's session cookie, if any."""
+    return create_session_manager().get_session(request)
@@ -5,7 +5,6 @@ Maintains anonymous identity while allowing social login.
 """
 import logging
 import secrets
-import asyncio
 import hashlib
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
@@ -13,17 +12,37 @@ from sqlalchemy.orm import Session
 
 from database.models import AnonymousUser
 from auth.anonymous_identity import AnonymousIdentityManager
-from auth.email_provider import create_email_manager
+from auth.email_provider import build_verification_email
+from auth.token_store import get_token_store, TokenIssueLimitExceeded
+from notifications.dispatcher import get_notification_dispatcher
 from security.pii_redaction import redact_email, redact_phone
 
 logger = logging.getLogger(__name__)
 
-# In-memory storage for verification codes (use Redis in production)
-_email_verification_codes: Dict[str, Dict[str, Any]] = {}
+# Token store namespaces (see auth/token_store.py)
+# Verification codes - Key: email hash, Value: {code, created_at, expires_at}
+EMAIL_CODE_NAMESPACE = "email_code"
+EMAIL_CODE_TTL_SECONDS = 600  # 10 minutes
+# Magic links - Key: token, Value: {email, created_at, ip_hash}
+MAGIC_LINK_NAMESPACE = "magic_link"
+MAGIC_LINK_TTL_SECONDS = 86400  # 24 hours
+ISSUANCE_WINDOW_SECONDS = 3600
 
-# In-memory storage for magic links (use Redis in production)
-# Key: token, Value: {email, expires_at, created_at, ip_hash}
-_magic_links: Dict[str, Dict[str, Any]] = {}
+
+def _email_key(email: str) -> str:
+    """Store codes under a hash so shared stores never hold raw addresses as keys."""
+    return hashlib.sha256(email.lower().encode('utf-8')).hexdigest()
+
+
+def _check_issuance(namespace: str, email: str) -> None:
+    """Count a token issued to email, raising once the hourly cap is reached."""
+    from config import settings
+    count, retry_after = get_token_store().increment(
+        f"issued:{namespace}", _email_key(email), ISSUANCE_WINDOW_SECONDS
+    )
+    if count > settings.AUTH_TOKEN_MAX_ISSUES_PER_HOUR:
+        logger.warning(f"Issuance limit reached for {redact_email(email)} ({namespace}, {count} this hour)")
+        raise TokenIssueLimitExceeded(retry_after)
 
 
 def _hash_ip(ip: Optional[str]) -> Optional[str]:
@@ -284,48 +303,25 @@ class SocialAuthManager:
         email: str
     ) -> Dict[str, Any]:
         """Send email verification code via email."""
+        _check_issuance(EMAIL_CODE_NAMESPACE, email)
         code = str(secrets.randbelow(1000000)).zfill(6)
-        expires_at = datetime.utcnow() + timedelta(minutes=10)
         
-        # Store code for verification
-        _email_verification_codes[email.lower()] = {
+        # Store code for verification (a new code replaces any earlier one)
+        store = get_token_store()
+        now = datetime.utcnow()
+        store.put(EMAIL_CODE_NAMESPACE, _email_key(email), {
             "code": code,
-            "expires_at": expires_at,
-            "created_at": datetime.utcnow()
-        }
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=EMAIL_CODE_TTL_SECONDS)).isoformat()
+        }, EMAIL_CODE_TTL_SECONDS)
         
-        # Send email using EmailProviderManager
+        # Queue email in the notification outbox (sent in the background)
         try:
-            email_manager = create_email_manager()
-            # Handle async function call - check if event loop exists
-            try:
-                # Try to get the current event loop
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # Event loop is already running, use create_task or run in executor
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(
-                            lambda: asyncio.run(email_manager.send_verification_email(email, code))
-                        )
-                        result = future.result(timeout=30)
-                else:
-                    # Event loop exists but not running, use run_until_complete
-                    result = loop.run_until_complete(email_manager.send_verification_email(email, code))
-            except RuntimeError:
-                # No event loop exists, create a new one
-                result = asyncio.run(email_manager.send_verification_email(email, code))
-            
-            if not result.get("success", False):
-                error_msg = result.get("error", "Unknown error")
-                logger.error(f"Failed to send email to {redact_email(email)}: {error_msg}")
-                # Remove stored code if email failed
-                _email_verification_codes.pop(email.lower(), None)
-                # Raise with the actual error message, not wrapped
-                raise Exception(error_msg)
-            
-            provider = result.get('provider', 'unknown')
-            logger.info(f"Email verification code sent to {redact_email(email)} (provider: {provider})")
+            subject, html_body, text_body = build_verification_email(code)
+            notification = get_notification_dispatcher().enqueue_email(
+                self.db, email, subject, html_body, text_body
+            )
+            logger.info(f"Email verification code queued for {redact_email(email)} (notification: {notification.id})")
             
             # In development mode, log the code for testing
             from config import settings
@@ -333,15 +329,15 @@ class SocialAuthManager:
                 logger.info(f"🔐 DEV MODE: Verification code for {redact_email(email)} is: {code}")
                 print(f"\n🔐 DEV MODE: Email verification code for {redact_email(email)}: {code}\n")
         except Exception as e:
-            logger.error(f"Error sending email verification to {redact_email(email)}: {e}", exc_info=True)
-            # Remove stored code if email failed
-            _email_verification_codes.pop(email.lower(), None)
+            logger.error(f"Error queueing email verification to {redact_email(email)}: {e}", exc_info=True)
+            # Remove stored code if email could not be queued
+            store.delete(EMAIL_CODE_NAMESPACE, _email_key(email))
             raise
         
         return {
             "verification_code": code,  # For development/testing - remove in production
             "email": email,
-            "expires_in": 600
+            "expires_in": EMAIL_CODE_TTL_SECONDS
         }
     
     def verify_email_code(
@@ -355,20 +351,11 @@ class SocialAuthManager:
         # Normalize code (strip whitespace, ensure string)
         code = str(code).strip()
         
-        # Check if code exists and is valid
-        stored_data = _email_verification_codes.get(email_lower)
+        # Check if code exists and is valid (expired codes are gone from the store)
+        store = get_token_store()
+        stored_data = store.get(EMAIL_CODE_NAMESPACE, _email_key(email_lower))
         if not stored_data:
-            logger.warning(f"No verification code found for {redact_email(email)} (email_lower: redacted)")
-            logger.debug(f"Available codes: {len(_email_verification_codes.keys())} codes in storage")
-            return None
-        
-        # Check if code expired
-        expires_at = stored_data["expires_at"]
-        now = datetime.utcnow()
-        if now > expires_at:
-            time_expired = (now - expires_at).total_seconds()
-            logger.warning(f"Verification code expired for {redact_email(email)} ({time_expired:.0f} seconds ago)")
-            _email_verification_codes.pop(email_lower, None)
+            logger.warning(f"No verification code found for {redact_email(email)} (missing or expired)")
             return None
         
         # Verify code matches (compare as strings, case-insensitive)
@@ -378,8 +365,11 @@ class SocialAuthManager:
             logger.debug(f"Code comparison: '{stored_code}' == '{code}' -> {stored_code == code}")
             return None
         
-        # Code is valid - remove it
-        _email_verification_codes.pop(email_lower, None)
+        # Code is valid - consume it; a concurrent request may have beaten us to it
+        consumed = store.take(EMAIL_CODE_NAMESPACE, _email_key(email_lower))
+        if not consumed or str(consumed.get("code")).strip() != code:
+            logger.warning(f"Verification code for {redact_email(email)} was already used or replaced")
+            return None
         
         # Check if email already linked (use lowercase for consistency)
         existing_user = self._find_user_by_email(email_lower)
@@ -410,27 +400,26 @@ class SocialAuthManager:
         """
         import base64
         
+        _check_issuance(MAGIC_LINK_NAMESPACE, email)
+        
         # Generate secure token
         token_bytes = secrets.token_bytes(32)
         token = base64.urlsafe_b64encode(token_bytes).decode('utf-8').rstrip('=')
         
         # Store magic link (24 hour expiration)
-        expires_at = datetime.utcnow() + timedelta(hours=24)
-        _magic_links[token] = {
+        store = get_token_store()
+        store.put(MAGIC_LINK_NAMESPACE, token, {
             "email": email.lower(),
-            "expires_at": expires_at,
-            "created_at": datetime.utcnow(),
+            "created_at": datetime.utcnow().isoformat(),
             "ip_hash": _hash_ip(request_ip) if request_ip else None  # Store hashed IP for privacy-preserving validation
-        }
+        }, MAGIC_LINK_TTL_SECONDS)
         
         # Create magic link URL
         # Use dedicated route to avoid any caching/interception on /auth
         magic_link = f"{base_url}/auth/magic-link?token={token}"
         
-        # Send email using EmailProviderManager
+        # Queue email in the notification outbox (sent in the background)
         try:
-            email_manager = create_email_manager()
-            
             # Prepare email content
             html_body = f"""
             <html>
@@ -466,47 +455,14 @@ class SocialAuthManager:
             If you didn't request this authentication link, please ignore this email.
             """
             
-            # Handle async function call
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(
-                            lambda: asyncio.run(email_manager.send_email(
-                                email,
-                                "Authenticate with JobMatch - Magic Link",
-                                html_body,
-                                text_body
-                            ))
-                        )
-                        result = future.result(timeout=30)
-                else:
-                    result = loop.run_until_complete(email_manager.send_email(
-                        email,
-                        "Authenticate with JobMatch - Magic Link",
-                        html_body,
-                        text_body
-                    ))
-            except RuntimeError:
-                result = asyncio.run(email_manager.send_email(
-                    email,
-                    "Authenticate with JobMatch - Magic Link",
-                    html_body,
-                    text_body
-                ))
-            
-            if not result.get("success", False):
-                error_msg = result.get("error", "Unknown error")
-                logger.error(f"Failed to send magic link email to {redact_email(email)}: {error_msg}")
-                logger.error(f"Email result: {result}")
-                # Remove stored link if email failed
-                _magic_links.pop(token, None)
-                raise Exception(f"Email send failed: {error_msg}")
-            
-            provider = result.get('provider', 'unknown')
-            message_id = result.get('message_id', 'N/A')
-            logger.info(f"Magic link email sent to {redact_email(email)} (provider: {provider}, message_id: {message_id})")
+            notification = get_notification_dispatcher().enqueue_email(
+                self.db,
+                email,
+                "Authenticate with JobMatch - Magic Link",
+                html_body,
+                text_body
+            )
+            logger.info(f"Magic link email queued for {redact_email(email)} (notification: {notification.id})")
             
             # Always log the link in development mode
             from config import settings
@@ -516,20 +472,17 @@ class SocialAuthManager:
                 print(f"🔗 DEV MODE: Magic link sent to {redact_email(email)}")
                 print(f"   Link: {magic_link}")
                 print(f"   Expires: 24 hours")
-                print(f"   Message ID: {message_id}")
                 print(f"{'='*80}\n")
         except Exception as e:
-            logger.error(f"Error sending magic link to {redact_email(email)}: {e}", exc_info=True)
-            logger.error(f"Exception type: {type(e).__name__}")
-            logger.error(f"Exception args: {e.args}")
-            # Remove stored link if email failed
-            _magic_links.pop(token, None)
+            logger.error(f"Error queueing magic link to {redact_email(email)}: {e}", exc_info=True)
+            # Remove stored link if email could not be queued
+            store.delete(MAGIC_LINK_NAMESPACE, token)
             # Re-raise with more context
-            raise Exception(f"Failed to send magic link email to {redact_email(email)}: {str(e)}") from e
+            raise Exception(f"Failed to queue magic link email to {redact_email(email)}: {str(e)}") from e
         
         return {
             "email": email,
-            "expires_in": 86400,  # 24 hours in seconds
+            "expires_in": MAGIC_LINK_TTL_SECONDS,
             "magic_link": magic_link  # For development/testing
         }
     
@@ -549,19 +502,11 @@ class SocialAuthManager:
         Returns:
             Anonymous ID if verification succeeds, None otherwise
         """
-        # Check if token exists
-        stored_data = _magic_links.get(token)
+        # Consume token atomically (one-time use, even across workers);
+        # expired tokens are already gone from the store
+        stored_data = get_token_store().take(MAGIC_LINK_NAMESPACE, token)
         if not stored_data:
-            logger.warning(f"No magic link found for token")
-            return None
-        
-        # Check if token expired
-        expires_at = stored_data["expires_at"]
-        now = datetime.utcnow()
-        if now > expires_at:
-            time_expired = (now - expires_at).total_seconds()
-            logger.warning(f"Magic link expired ({time_expired:.0f} seconds ago)")
-            _magic_links.pop(token, None)
+            logger.warning(f"No magic link found for token (missing, expired or already used)")
             return None
         
         # IP address validation (privacy-preserving security feature)
@@ -579,9 +524,7 @@ class SocialAuthManager:
                 # In production, you might want to require additional verification here
                 # Note: We don't log raw IPs to maintain zero-knowledge principles
         
-        # Token is valid - get email and remove token (one-time use)
         email = stored_data["email"]
-        _magic_links.pop(token, None)
         
         # Check if email already linked
         existing_user = self._find_user_by_email(email)
@@ -0,0 +1,272 @@
+"""
+Short-lived token storage for magic links and verification codes.
+
+Two backends share one interface:
+- MemoryTokenStore: single-process, expiry swept by a hashed timer wheel so
+  abandoned tokens are reclaimed without scanning every entry
+- RedisTokenStore: shared across workers, native key TTLs and atomic
+  GETDEL for single-use consumption
+
+Both also keep fixed-window issuance counters used to cap how many tokens a
+single address can request.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "authtok"
+
+
+class TokenIssueLimitExceeded(Exception):
+    """Raised when an address has requested too many tokens in the current window."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many requests for this address. Please try again later.")
+        self.retry_after = retry_after
+
+
+class TokenStore(ABC):
+    """Namespaced key/value store whose entries expire after a TTL."""
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        """Store value, replacing any existing entry, for ttl_seconds."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return the live value without consuming it."""
+
+    @abstractmethod
+    def take(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Atomically return and delete the value; only one caller can win."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove an entry if present."""
+
+    @abstractmethod
+    def increment(self, namespace: str, key: str, window_seconds: int) -> Tuple[int, int]:
+        """
+        Count an event in a fixed window starting at the first event.
+
+        Returns:
+            (count including this event, seconds until the window resets)
+        """
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{KEY_PREFIX}:{namespace}:{key}"
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    In-process store with timer-wheel expiry.
+
+    Each entry is filed in the wheel slot for its expiry tick. Any operation
+    first advances the wheel to the current time and expires only the
+    entries in the slots it passes over, so cleanup cost is proportional to
+    what actually expires. TTLs longer than one wheel revolution simply stay
+    in their slot until the matching round comes around.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        wheel_size: int = 512,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, expiry_tick)
+        self._entries: Dict[str, Tuple[Any, float, int]] = {}
+        self._wheel: List[Set[str]] = [set() for _ in range(wheel_size)]
+        self._current_tick = self._tick_for(clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._advance(self._clock())
+            return len(self._entries)
+
+    def _tick_for(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def _advance(self, now: float) -> None:
+        target = self._tick_for(now)
+        if target <= self._current_tick:
+            return
+
+        # Past a full revolution every slot is due, so visit each once
+        ticks = range(self._current_tick + 1, target + 1)
+        if len(ticks) > self.wheel_size:
+            ticks = range(target - self.wheel_size + 1, target + 1)
+
+        for tick in ticks:
+            slot = self._wheel[tick % self.wheel_size]
+            for key in list(slot):
+                entry = self._entries.get(key)
+                if entry is None:
+                    slot.discard(key)
+                elif entry[1] <= now:
+                    del self._entries[key]
+                    slot.discard(key)
+        self._current_tick = target
+
+    def _set(self, key: str, value: Any, expires_at: float) -> None:
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._wheel[previous[2] % self.wheel_size].discard(key)
+        # File under the tick at which the entry is certainly expired
+        expiry_tick = math.ceil(expires_at / self.tick_seconds)
+        self._entries[key] = (value, expires_at, expiry_tick)
+        self._wheel[expiry_tick % self.wheel_size].add(key)
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[Any, float, int]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry
+
+    def _pop(self, key: str) -> Optional[Tuple[Any, float, int]]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._wheel[entry[2] % self.wheel_size].discard(key)
+        return entry
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            self._set(self._key(namespace, key), dict(value), now + ttl_seconds)
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            entry = self._live(self._key(namespace, key), now)
+            return dict(entry[0]) if entry else None
+
+    def take(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            full_key = self._key(namespace, key)
+            entry = self._live(full_key, now)
+            self._pop(full_key)
+            return entry[0] if entry else None
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._pop(self._key(namespace, key))
+
+    def increment(self, namespace: str, key: str, window_seconds: int) -> Tuple[int, int]:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            full_key = self._key(namespace, key)
+            entry = self._live(full_key, now)
+            if entry is None:
+                count, expires_at = 1, now + window_seconds
+            else:
+                count, expires_at = entry[0] + 1, entry[1]
+            self._set(full_key, count, expires_at)
+            return count, max(1, math.ceil(expires_at - now))
+
+
+# INCR and start the window on the first hit, atomically
+_INCREMENT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return {count, redis.call('TTL', KEYS[1])}
+"""
+
+
+class RedisTokenStore(TokenStore):
+    """Redis-backed store shared by all workers."""
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._increment = redis_client.register_script(_INCREMENT_SCRIPT)
+        self._getdel_supported = True
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        self.redis.set(self._key(namespace, key), json.dumps(value), ex=int(ttl_seconds))
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis.get(self._key(namespace, key))
+        return json.loads(raw) if raw else None
+
+    def take(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        full_key = self._key(namespace, key)
+        raw = None
+        if self._getdel_supported:
+            try:
+                raw = self.redis.getdel(full_key)
+            except Exception as e:
+                # GETDEL needs Redis 6.2+; fall back to a MULTI/EXEC pair
+                if "unknown command" not in str(e).lower():
+                    raise
+                logger.warning("Redis server lacks GETDEL, using MULTI GET/DEL for token consumption")
+                self._getdel_supported = False
+        if not self._getdel_supported:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.get(full_key)
+            pipe.delete(full_key)
+            raw, _ = pipe.execute()
+        return json.loads(raw) if raw else None
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.redis.delete(self._key(namespace, key))
+
+    def increment(self, namespace: str, key: str, window_seconds: int) -> Tuple[int, int]:
+        count, ttl = self._increment(keys=[self._key(namespace, key)], args=[int(window_seconds)])
+        return int(count), max(1, int(ttl))
+
+
+def create_token_store(backend: Optional[str] = None) -> TokenStore:
+    """
+    Create a token store for the configured backend.
+
+    "redis" requires Redis; "memory" is single-process only; "auto" uses
+    Redis when it answers a ping and falls back to memory otherwise.
+    """
+    backend = (backend or settings.AUTH_TOKEN_STORE).lower()
+    if backend == "memory":
+        return MemoryTokenStore()
+
+    from auth.session_manager import get_redis_client
+    try:
+        client = get_redis_client()
+        client.ping()
+        logger.info("Auth tokens stored in Redis")
+        return RedisTokenStore(client)
+    except Exception as e:
+        if backend == "redis":
+            raise
+        logger.warning(
+            f"Redis unavailable for auth tokens ({e}); using in-memory store. "
+            "Tokens will not be shared across workers."
+        )
+        return MemoryTokenStore()
+
+
+# Global token store instance
+_token_store: Optional[TokenStore] = None
+
+
+def get_token_store() -> TokenStore:
+    """Get or create the global token store."""
+    global _token_store
+    if _token_store is None:
+        _token_store = create_token_store()
+    return _token_store
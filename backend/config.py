@@ -24,6 +24,10 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_MAX_CONNECTIONS: int = 50  # Per pool (one pool per URL per process)
+    REDIS_POOL_TIMEOUT: float = 5.0  # Seconds to wait for a free pooled connection
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # PING idle connections before reuse after this many seconds
+    REDIS_SOCKET_TIMEOUT: float = 5.0
     
     # Elasticsearch
     ELASTICSEARCH_URL: str = "http://localhost:9200"
@@ -65,6 +69,47 @@ class Settings(BaseSettings):
                 sys.exit(1)
         return self
     
+    # Agent UI
+    AGENT_BUS_BACKEND: str = "auto"  # "redis" (cluster-wide), "memory" (single worker), or "auto"
+
+    # Sessions
+    SESSION_CACHE_SECONDS: float = 2.0  # Serve recently read sessions from process memory (0 disables)
+    SESSION_TOUCH_INTERVAL_SECONDS: int = 60  # Write last_active/expiry at most this often per session
+
+    # Human review queue
+    HUMAN_REVIEW_LEASE_SECONDS: int = 900  # Claimed reviews return to the queue after this long
+    HUMAN_REVIEW_STATS_REDIS_MIRROR: bool = False  # Serve queue stats from Redis counters
+    HUMAN_REVIEW_STATS_MIRROR_RECONCILE_SECONDS: int = 300  # Rebuild the Redis mirror from the database at least this often
+    
+    # Tracing
+    TRACING_EXPORTER: str = "none"  # "otlp", "console", "file", or "none"
+    TRACING_SAMPLE_RATIO: float = 0.1  # Share of new traces recorded; continued traces keep the caller's decision
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP (JSON) collector
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SERVICE_NAME: str = "jobmatch-backend"
+    
+    # Profiling (admin endpoints need ADMIN_API_TOKEN in the X-Admin-Token header; unset disables them)
+    ADMIN_API_TOKEN: str = ""
+    PROFILER_CONTINUOUS_HZ: float = 0.0  # Rolling low-rate CPU profile; 0 disables
+    PROFILER_WINDOW_SECONDS: int = 600
+    LOOP_LAG_THRESHOLD_MS: float = 100.0  # Report event loop stalls longer than this; 0 disables
+    LOOP_BLOCKING_DEBUG: bool = False  # Dev/test: time every loop callback and log blocking ones with route and stack
+    LOOP_BLOCKING_THRESHOLD_MS: float = 50.0
+    
+    # Warmup (/ready reports 503 until the required warmup hooks have run)
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 30.0  # Per hook attempt
+    WARMUP_RETRY_MAX_SECONDS: float = 30.0  # Backoff cap between attempts of a failed required hook
+    WARMUP_DB_CONNECTIONS: int = 5  # Pooled connections to open before taking traffic
+    WARMUP_REDIS_CONNECTIONS: int = 5
+    
+    # Snapshots of in-memory indexes (restored at startup, then only the delta is replayed)
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_DIR: str = ".cache/snapshots"
+    SNAPSHOT_INTERVAL_SECONDS: float = 300.0  # Background snapshot period; 0 = only at shutdown
+    JOB_SKILL_INDEX_REFRESH_SECONDS: float = 30.0  # Background catch-up period for the job skill index; 0 = only at startup
+    JOB_SKILL_INDEX_GAP_SECONDS: float = 600.0  # How long skipped posting ids are re-checked for a late commit before they count as rolled back
+    
     # Development mode - log verification codes to console
     DEV_MODE: bool = True
     
@@ -102,7 +147,11 @@ class Settings(BaseSettings):
     MICROSOFT_CLIENT_SECRET: str = ""
     APPLE_CLIENT_ID: str = ""
     APPLE_CLIENT_SECRET: str = ""
-    
+
+    # Magic links / verification codes
+    AUTH_TOKEN_STORE: str = "auto"  # "redis", "memory", or "auto" (Redis if reachable)
+    AUTH_TOKEN_MAX_ISSUES_PER_HOUR: int = 10  # Per email address, per token type
+
     # SMS/VoIP (Twilio)
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
@@ -122,6 +171,14 @@ class Settings(BaseSettings):
     SES_REGION: str = "us-west-2"
     SES_FROM_EMAIL: str = ""
     EMAIL_PROVIDER_MODE: str = "smtp"  # "smtp" or "ses"
+    SMTP_USE_TLS: bool = True
+    SMTP_POOL_SIZE: int = 4  # Persistent SMTP connections per worker
+    
+    # Notification outbox
+    NOTIFICATION_BATCH_SIZE: int = 50
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: int = 30  # Doubles per attempt
+    NOTIFICATION_POLL_SECONDS: float = 5.0
     
     # GCP CLI Backdoor (Documented Feature)
     GCP_CLI_ENABLED: bool = True
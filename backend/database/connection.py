@@ -1,12 +1,13 @@
 """
 Database connection and session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
 
 from config import settings
 from database.models import Base
+from monitoring.tracing import instrument_sqlalchemy
 
 # Create engine with connection pooling
 engine = create_engine(
@@ -16,6 +17,7 @@ engine = create_engine(
     max_overflow=20,
     echo=False
 )
+instrument_sqlalchemy(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -30,6 +32,20 @@ def get_db() -> Session:
         db.close()
 
 
+def warm_pool(connections: int) -> int:
+    """Open up to `connections` pooled connections (SELECT 1 on each) so first requests skip connecting."""
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
 def init_db():
     """Initialize database tables."""
     Base.meta_data.create_all(bind=engine)
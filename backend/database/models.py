@@ -3,7 +3,7 @@ SQLAlchemy database models.
 """
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, String, DateTime, Text, Integer, Boolean, JSON, ForeignKey, Index, Numeric
+from sqlalchemy import Column, String, DateTime, Text, Integer, BigInteger, Boolean, JSON, ForeignKey, Index, Numeric, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -110,10 +110,113 @@ class HumanReview(Base):
     review_type = Column(String(50), nullable=False)  # matching, assessment, moderation
     entity_id = Column(String(255), nullable=False, index=True)
     reviewer_id = Column(String(255), nullable=False)
-    decision = Column(String(50), nullable=False)  # approved, rejected, needs_revision
+    decision = Column(String(50), nullable=False)  # pending, in_review, approved, rejected, needs_revision
+    priority = Column(Integer, default=2, nullable=False)  # Rank: 0 = urgent ... 3 = low (lower is claimed first)
     feedback = Column(Text, nullable=True)
     meta_data = Column("metadata", JSON, nullable=True)  # Database column name stays 'metadata', but Python attribute is 'meta_data' to avoid SQLAlchemy reserved name conflict
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_expires_at = Column(DateTime, nullable=True)  # Claim lease; expired in_review items are requeued
+    
+    __table_args__ = (
+        Index('idx_human_reviews_claim', 'decision', 'review_type', 'priority', 'created_at'),
+    )
+
+
+class HumanReviewCounter(Base):
+    """Incrementally maintained review counts per type, priority and decision."""
+    __tablename__ = "human_review_counters"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    review_type = Column(String(50), nullable=False)
+    priority = Column(Integer, nullable=False)
+    decision = Column(String(50), nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('review_type', 'priority', 'decision', name='uq_human_review_counters_key'),
+    )
+
+
+class HumanReviewWaitBucket(Base):
+    """Streaming histogram of queue wait time (enqueue to claim) per review type."""
+    __tablename__ = "human_review_wait_buckets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    review_type = Column(String(50), nullable=False)
+    bucket = Column(Integer, nullable=False)  # Index into human_review.stats.WAIT_BUCKETS
+    count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('review_type', 'bucket', name='uq_human_review_wait_buckets_key'),
+    )
+
+
+class HumanReviewStatDelta(Base):
+    """
+    Append-only counter and wait-bucket deltas, folded into the counter
+    tables by human_review.stats.fold_deltas. Queue transitions insert
+    here instead of updating the shared counter rows, so concurrent
+    claims never wait on each other's counter updates.
+    """
+    __tablename__ = "human_review_stat_deltas"
+    
+    id = Column(Integer, primary_key=True)
+    review_type = Column(String(50), nullable=False)
+    priority = Column(Integer, nullable=True)  # Set with decision for counter deltas
+    decision = Column(String(50), nullable=True)
+    bucket = Column(Integer, nullable=True)  # Set for wait-bucket deltas
+    delta = Column(Integer, nullable=False)
+
+
+class BiasAnalysisCache(Base):
+    """Cached bias analysis keyed by normalized content and model version."""
+    __tablename__ = "bias_analysis_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_type = Column(String(50), nullable=False)
+    model_version = Column(String(100), nullable=False)
+    content_hash = Column(String(64), nullable=False)  # sha256 of normalized content
+    simhash = Column(BigInteger, nullable=False)  # Signed 64-bit SimHash for near-duplicate lookup
+    band0 = Column(Integer, nullable=False)  # 16-bit SimHash bands (indexed candidate lookup)
+    band1 = Column(Integer, nullable=False)
+    band2 = Column(Integer, nullable=False)
+    band3 = Column(Integer, nullable=False)
+    result = Column(JSON, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_hit_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint('model_version', 'content_type', 'content_hash', name='uq_bias_cache_content'),
+        Index('idx_bias_cache_band0', 'model_version', 'band0'),
+        Index('idx_bias_cache_band1', 'model_version', 'band1'),
+        Index('idx_bias_cache_band2', 'model_version', 'band2'),
+        Index('idx_bias_cache_band3', 'model_version', 'band3'),
+    )
+
+
+class NotificationOutbox(Base):
+    """Durable outbox for outbound notifications (sent asynchronously)."""
+    __tablename__ = "notification_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String(20), nullable=False, default="email")
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    provider = Column(String(20), nullable=True)
+    provider_message_id = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_notification_outbox_due', 'status', 'next_attempt_at'),
+    )
 
 
 class ArticulationSuggestion(Base):
@@ -140,6 +243,7 @@ class ForumPost(Base):
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     parent_post_id = Column(Integer, ForeignKey("forum_posts.id"), nullable=True)
+    moderation_status = Column(String(20), nullable=False, default="pending", index=True)  # pending, approved, hidden
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
@@ -5,11 +5,13 @@ Scales human oversight as system grows.
 """
 import logging
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from sqlalchemy.orm import Session
 
+from config import settings
 from database.models import HumanReview
+from human_review.stats import QueueStatsRecorder, WaitTimeHistogram, load_counters
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +32,41 @@ class ReviewType(str, Enum):
     ARTICULATION = "articulation"
 
 
+# Stored priority rank - lower ranks are claimed first so the claim index
+# (decision, review_type, priority, created_at) can be scanned in order.
+PRIORITY_RANK = {
+    ReviewPriority.URGENT: 0,
+    ReviewPriority.HIGH: 1,
+    ReviewPriority.MEDIUM: 2,
+    ReviewPriority.LOW: 3,
+}
+
+PENDING = "pending"
+IN_REVIEW = "in_review"
+
+
 class HumanReviewQueue:
     """Manages human review queue."""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, lease_seconds: Optional[int] = None, redis_client=None):
         self.db = db_session
+        self.lease_seconds = lease_seconds or settings.HUMAN_REVIEW_LEASE_SECONDS
+        
+        if redis_client is None and settings.HUMAN_REVIEW_STATS_REDIS_MIRROR:
+            from infrastructure.scaling import scaling_manager
+            redis_client = scaling_manager.get_redis_client()
+        self.redis = redis_client
+        self.stats = QueueStatsRecorder(db_session, redis_client)
+    
+    def _commit(self) -> None:
+        """Commit queue changes together with their stats deltas."""
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.stats.discard()
+            raise
+        self.stats.flush_mirror()
     
     def add_to_queue(
         self,
@@ -48,13 +80,15 @@ class HumanReviewQueue:
             review_type=review_type.value,
             entity_id=entity_id,
             reviewer_id="",  # Will be assigned when picked up
-            decision="pending",
-            metadata=metadata or {},
+            decision=PENDING,
+            priority=PRIORITY_RANK[priority],
+            meta_data=metadata or {},
             created_at=datetime.utcnow()
         )
         
         self.db.add(review)
-        self.db.commit()
+        self.stats.transition(review, None, PENDING)
+        self._commit()
         self.db.refresh(review)
         
         logger.info(f"Added {review_type.value}:{entity_id} to review queue (priority: {priority.value})")
@@ -66,27 +100,107 @@ class HumanReviewQueue:
         review_type: Optional[ReviewType] = None,
         limit: int = 10
     ) -> List[HumanReview]:
-        """Get next items from queue for a reviewer."""
+        """
+        Claim the next batch of reviews for a reviewer.
+        
+        Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent reviewers
+        each claim a disjoint batch instead of blocking on (or double-claiming)
+        the same items. Claimed items hold a lease; see requeue_expired().
+        """
+        self.requeue_expired()
+        
         query = self.db.query(HumanReview).filter(
-            HumanReview.decision == "pending"
+            HumanReview.decision == PENDING
         )
         
         if review_type:
             query = query.filter(HumanReview.review_type == review_type.value)
         
-        # Prioritize by creation time (FIFO with priority consideration)
-        reviews = query.order_by(HumanReview.created_at.asc()).limit(limit).all()
+        reviews = (
+            query.order_by(HumanReview.priority.asc(), HumanReview.created_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
         
-        # Assign to reviewer
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
         for review in reviews:
-            if not review.reviewer_id:
-                review.reviewer_id = reviewer_id
-                review.meta_data = (review.meta_data or {})
-                review.meta_data["assigned_at"] = datetime.utcnow().isoformat()
+            self.stats.transition(review, PENDING, IN_REVIEW)
+            self.stats.record_wait(review.review_type, (now - review.created_at).total_seconds())
+            review.reviewer_id = reviewer_id
+            review.decision = IN_REVIEW
+            review.lease_expires_at = lease_expires_at
+            review.meta_data = {**(review.meta_data or {}), "assigned_at": now.isoformat()}
         
-        self.db.commit()
+        self._commit()
+        
+        if reviews:
+            logger.info(f"Reviewer {reviewer_id} claimed {len(reviews)} review(s)")
         return reviews
     
+    def renew_lease(self, review_id: int, reviewer_id: str) -> HumanReview:
+        """Extend the lease on a claimed review (reviewer heartbeat)."""
+        review = self.db.query(HumanReview).filter(
+            HumanReview.id == review_id
+        ).with_for_update().first()
+        
+        if not review:
+            raise ValueError(f"Review {review_id} not found")
+        
+        if review.decision != IN_REVIEW or review.reviewer_id != reviewer_id:
+            raise ValueError("Review is not claimed by this reviewer")
+        
+        review.lease_expires_at = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+        self.db.commit()
+        self.db.refresh(review)
+        return review
+    
+    def release_review(self, review_id: int, reviewer_id: str) -> HumanReview:
+        """Return a claimed review to the queue without a decision."""
+        review = self.db.query(HumanReview).filter(
+            HumanReview.id == review_id
+        ).with_for_update().first()
+        
+        if not review:
+            raise ValueError(f"Review {review_id} not found")
+        
+        if review.decision != IN_REVIEW or review.reviewer_id != reviewer_id:
+            raise ValueError("Review is not claimed by this reviewer")
+        
+        self._requeue(review)
+        self._commit()
+        self.db.refresh(review)
+        
+        logger.info(f"Review {review_id} released by {reviewer_id}")
+        return review
+    
+    def requeue_expired(self) -> int:
+        """Return claimed reviews whose lease has expired to the pending queue."""
+        expired = self.db.query(HumanReview).filter(
+            HumanReview.decision == IN_REVIEW,
+            HumanReview.lease_expires_at < datetime.utcnow()
+        ).with_for_update(skip_locked=True).all()
+        
+        for review in expired:
+            self._requeue(review)
+        
+        if expired:
+            self._commit()
+            logger.warning(f"Requeued {len(expired)} review(s) with expired leases")
+        return len(expired)
+    
+    def _requeue(self, review: HumanReview) -> None:
+        """Reset a claimed review back to pending."""
+        self.stats.transition(review, IN_REVIEW, PENDING)
+        review.reviewer_id = ""
+        review.decision = PENDING
+        review.lease_expires_at = None
+        review.meta_data = {
+            **(review.meta_data or {}),
+            "requeue_count": (review.meta_data or {}).get("requeue_count", 0) + 1,
+        }
+    
     def complete_review(
         self,
         review_id: int,
@@ -97,7 +211,7 @@ class HumanReviewQueue:
         """Complete a review."""
         review = self.db.query(HumanReview).filter(
             HumanReview.id == review_id
-        ).first()
+        ).with_for_update().first()
         
         if not review:
             raise ValueError(f"Review {review_id} not found")
@@ -105,34 +219,64 @@ class HumanReviewQueue:
         if review.reviewer_id != reviewer_id:
             raise ValueError("Review assigned to different reviewer")
         
+        if review.decision != IN_REVIEW:
+            raise ValueError(f"Review {review_id} is not in review (decision: {review.decision})")
+        
+        self.stats.transition(review, IN_REVIEW, decision)
         review.decision = decision
         review.feedback = feedback
-        review.meta_data = (review.meta_data or {})
-        review.meta_data["completed_at"] = datetime.utcnow().isoformat()
+        review.lease_expires_at = None
+        review.meta_data = {**(review.meta_data or {}), "completed_at": datetime.utcnow().isoformat()}
         
-        self.db.commit()
+        self._commit()
         self.db.refresh(review)
         
         logger.info(f"Review {review_id} completed: {decision}")
         return review
     
     def get_queue_stats(self) -> Dict[str, Any]:
-        """Get queue statistics."""
-        total_pending = self.db.query(HumanReview).filter(
-            HumanReview.decision == "pending"
-        ).count()
-        
-        by_type = {}
-        for review_type in ReviewType:
-            count = self.db.query(HumanReview).filter(
-                HumanReview.review_type == review_type.value,
-                HumanReview.decision == "pending"
-            ).count()
-            by_type[review_type.value] = count
+        """
+        Get queue statistics.
+        
+        Served from incrementally maintained counters (Redis mirror when
+        enabled, otherwise the small counter tables) - never scans
+        human_reviews.
+        """
+        counters, buckets = load_counters(self.db, self.redis)
+        rank_names = {rank: priority.value for priority, rank in PRIORITY_RANK.items()}
+        
+        by_type = {review_type.value: 0 for review_type in ReviewType}
+        by_priority = {priority.value: 0 for priority in ReviewPriority}
+        by_decision: Dict[str, int] = {}
+        total_pending = 0
+        total_in_review = 0
+        
+        for (review_type, priority, decision), count in counters.items():
+            by_decision[decision] = by_decision.get(decision, 0) + count
+            if decision == PENDING:
+                total_pending += count
+                by_type[review_type] = by_type.get(review_type, 0) + count
+                priority_name = rank_names.get(priority, str(priority))
+                by_priority[priority_name] = by_priority.get(priority_name, 0) + count
+            elif decision == IN_REVIEW:
+                total_in_review += count
+        
+        overall = WaitTimeHistogram()
+        per_type: Dict[str, WaitTimeHistogram] = {}
+        for (review_type, bucket), count in buckets.items():
+            overall.add(bucket, count)
+            per_type.setdefault(review_type, WaitTimeHistogram()).add(bucket, count)
         
         return {
             "total_pending": total_pending,
-            "by_type": by_type
+            "total_in_review": total_in_review,
+            "by_type": by_type,
+            "by_priority": by_priority,
+            "by_decision": by_decision,
+            "wait_time": {
+                **overall.summary(),
+                "by_type": {review_type: hist.summary() for review_type, hist in per_type.items()},
+            },
         }
 
 
@@ -0,0 +1,339 @@
+"""
+Incremental statistics for the human review queue.
+Each queue transition appends counter and wait-time deltas in its own
+transaction (inserts only, so concurrent claims never queue behind a
+shared counter row); fold_deltas() periodically sums them into the
+counter tables. Reading stats never scans human_reviews. An optional
+Redis mirror serves dashboard polls without touching the database; it is
+rebuilt from the database when a mirror update fails and at least every
+HUMAN_REVIEW_STATS_MIRROR_RECONCILE_SECONDS.
+"""
+import bisect
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.models import HumanReview, HumanReviewCounter, HumanReviewStatDelta, HumanReviewWaitBucket
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the wait-time histogram buckets; the last bucket
+# is open-ended. Roughly log-spaced from one second to one week.
+WAIT_BUCKETS: List[float] = [
+    1, 5, 15, 30, 60, 120, 300, 600, 900, 1800, 3600,
+    7200, 14400, 28800, 43200, 86400, 172800, 345600, 604800,
+]
+
+REDIS_COUNTERS_KEY = "human_review:counters"
+REDIS_WAIT_KEY = "human_review:wait_buckets"
+REDIS_SYNCED_KEY = "human_review:mirror_synced"  # Present (with a TTL) while the mirror is known to match the DB
+
+FOLD_BATCH = 10000
+
+# Set when this process failed to update the mirror and could not clear REDIS_SYNCED_KEY either
+_mirror_dirty = False
+
+CounterKey = Tuple[str, int, str]
+
+
+class WaitTimeHistogram:
+    """Fixed-bucket streaming histogram with interpolated percentiles."""
+
+    def __init__(self, counts: Optional[List[int]] = None):
+        self.counts = list(counts) if counts else [0] * (len(WAIT_BUCKETS) + 1)
+
+    @staticmethod
+    def bucket_for(seconds: float) -> int:
+        """Index of the bucket a wait time falls into."""
+        return bisect.bisect_left(WAIT_BUCKETS, max(seconds, 0.0))
+
+    def add(self, bucket: int, count: int = 1) -> None:
+        self.counts[bucket] += count
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the q-th percentile (0-100) in seconds."""
+        total = self.total
+        if total == 0:
+            return None
+
+        target = total * q / 100.0
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                lower = WAIT_BUCKETS[index - 1] if index > 0 else 0.0
+                if index >= len(WAIT_BUCKETS):
+                    # Open-ended overflow bucket - report its lower bound
+                    return float(lower)
+                upper = WAIT_BUCKETS[index]
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return float(WAIT_BUCKETS[-1])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "samples": self.total,
+            "p50_seconds": self.percentile(50),
+            "p90_seconds": self.percentile(90),
+            "p99_seconds": self.percentile(99),
+        }
+
+
+class QueueStatsRecorder:
+    """
+    Records counter deltas for queue transitions.
+
+    Deltas are appended through the caller's session (no commit here) and
+    buffered for the Redis mirror, which is flushed only after the caller
+    commits successfully.
+    """
+
+    def __init__(self, db_session: Session, redis_client=None):
+        self.db = db_session
+        self.redis = redis_client
+        self._pending_counters: Dict[CounterKey, int] = {}
+        self._pending_buckets: Dict[Tuple[str, int], int] = {}
+
+    def transition(
+        self,
+        review: HumanReview,
+        from_decision: Optional[str],
+        to_decision: str
+    ) -> None:
+        """Move one review between decision counters."""
+        if from_decision:
+            self._bump_counter((review.review_type, review.priority, from_decision), -1)
+        self._bump_counter((review.review_type, review.priority, to_decision), 1)
+
+    def record_wait(self, review_type: str, wait_seconds: float) -> None:
+        """Record an enqueue-to-claim wait time."""
+        bucket = WaitTimeHistogram.bucket_for(wait_seconds)
+        self.db.add(HumanReviewStatDelta(review_type=review_type, bucket=bucket, delta=1))
+        key = (review_type, bucket)
+        self._pending_buckets[key] = self._pending_buckets.get(key, 0) + 1
+
+    def _bump_counter(self, key: CounterKey, delta: int) -> None:
+        review_type, priority, decision = key
+        self.db.add(HumanReviewStatDelta(review_type=review_type, priority=priority, decision=decision, delta=delta))
+        self._pending_counters[key] = self._pending_counters.get(key, 0) + delta
+
+    def flush_mirror(self) -> None:
+        """Apply buffered deltas to Redis. Call after the DB commit."""
+        counters, buckets = self._pending_counters, self._pending_buckets
+        self._pending_counters, self._pending_buckets = {}, {}
+
+        if self.redis is None or not (counters or buckets):
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for (review_type, priority, decision), delta in counters.items():
+                if delta:
+                    pipe.hincrby(REDIS_COUNTERS_KEY, f"{review_type}:{priority}:{decision}", delta)
+            for (review_type, bucket), delta in buckets.items():
+                pipe.hincrby(REDIS_WAIT_KEY, f"{review_type}:{bucket}", delta)
+            pipe.execute()
+        except Exception as e:
+            # The DB counters remain authoritative; the next read rebuilds the mirror
+            logger.error(f"Review stats Redis mirror update failed, marking it for rebuild: {e}")
+            _mark_mirror_dirty(self.redis)
+
+    def discard(self) -> None:
+        """Drop buffered deltas after a rollback."""
+        self._pending_counters.clear()
+        self._pending_buckets.clear()
+
+
+def _mark_mirror_dirty(redis_client) -> None:
+    global _mirror_dirty
+    _mirror_dirty = True
+    try:
+        redis_client.delete(REDIS_SYNCED_KEY)
+    except Exception as e:
+        # Other processes rebuild once the marker's TTL runs out
+        logger.error(f"Could not clear the review stats mirror marker: {e}")
+
+
+def load_counters(db_session: Session, redis_client=None) -> Tuple[Dict[CounterKey, int], Dict[Tuple[str, int], int]]:
+    """Read counters and histogram buckets, preferring the Redis mirror while it is in sync."""
+    global _mirror_dirty
+    if redis_client is not None:
+        try:
+            if not _mirror_dirty:
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.exists(REDIS_SYNCED_KEY)
+                pipe.hgetall(REDIS_COUNTERS_KEY)
+                pipe.hgetall(REDIS_WAIT_KEY)
+                synced, raw_counters, raw_buckets = pipe.execute()
+                if synced:
+                    return _parse_mirror(raw_counters, raw_buckets)
+            # Fresh, failed or due for reconcile - rebuild it from the database
+            counters, buckets = _read_database(db_session)
+            _write_mirror(redis_client, counters, buckets)
+            _mirror_dirty = False
+            return counters, buckets
+        except Exception as e:
+            logger.error(f"Review stats Redis read failed, using database: {e}")
+
+    return _read_database(db_session)
+
+
+def _read_database(db_session: Session) -> Tuple[Dict[CounterKey, int], Dict[Tuple[str, int], int]]:
+    """Folded counters plus any deltas not folded yet."""
+    fold_deltas(db_session)
+
+    counters: Dict[CounterKey, int] = {
+        (row.review_type, row.priority, row.decision): row.count
+        for row in db_session.query(HumanReviewCounter).all()
+    }
+    buckets: Dict[Tuple[str, int], int] = {
+        (row.review_type, row.bucket): row.count
+        for row in db_session.query(HumanReviewWaitBucket).all()
+    }
+    pending = db_session.query(
+        HumanReviewStatDelta.review_type,
+        HumanReviewStatDelta.priority,
+        HumanReviewStatDelta.decision,
+        HumanReviewStatDelta.bucket,
+        func.sum(HumanReviewStatDelta.delta)
+    ).group_by(
+        HumanReviewStatDelta.review_type,
+        HumanReviewStatDelta.priority,
+        HumanReviewStatDelta.decision,
+        HumanReviewStatDelta.bucket
+    ).all()
+    for review_type, priority, decision, bucket, delta in pending:
+        if bucket is not None:
+            buckets[(review_type, bucket)] = buckets.get((review_type, bucket), 0) + delta
+        else:
+            counters[(review_type, priority, decision)] = counters.get((review_type, priority, decision), 0) + delta
+    return counters, buckets
+
+
+def fold_deltas(db_session: Session, limit: int = FOLD_BATCH) -> int:
+    """
+    Sum up to `limit` appended deltas into the counter tables and delete
+    them, in a transaction of its own (the caller's session is untouched).
+    Delta rows are claimed with SKIP LOCKED, so concurrent folds split the
+    work instead of double-counting it. Returns the number of deltas folded.
+    """
+    with Session(bind=db_session.get_bind()) as fold:
+        rows = fold.query(HumanReviewStatDelta).order_by(HumanReviewStatDelta.id).limit(limit).with_for_update(skip_locked=True).all()
+        if not rows:
+            return 0
+
+        counters: Dict[CounterKey, int] = {}
+        buckets: Dict[Tuple[str, int], int] = {}
+        for row in rows:
+            if row.bucket is not None:
+                key = (row.review_type, row.bucket)
+                buckets[key] = buckets.get(key, 0) + row.delta
+            else:
+                key = (row.review_type, row.priority, row.decision)
+                counters[key] = counters.get(key, 0) + row.delta
+
+        # Sorted, so concurrent folds lock counter rows in the same order
+        for (review_type, priority, decision), delta in sorted(counters.items()):
+            if delta:
+                _increment(fold, HumanReviewCounter, {"review_type": review_type, "priority": priority, "decision": decision}, delta)
+        for (review_type, bucket), delta in sorted(buckets.items()):
+            if delta:
+                _increment(fold, HumanReviewWaitBucket, {"review_type": review_type, "bucket": bucket}, delta)
+        fold.query(HumanReviewStatDelta).filter(
+            HumanReviewStatDelta.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        fold.commit()
+    return len(rows)
+
+
+def _increment(db_session: Session, model, keys: Dict[str, Any], delta: int) -> None:
+    """Increment a counter row, creating it on first use."""
+    updated = db_session.query(model).filter_by(**keys).update(
+        {model.count: model.count + delta}, synchronize_session=False
+    )
+    if updated:
+        return
+    try:
+        with db_session.begin_nested():
+            db_session.add(model(count=delta, **keys))
+    except IntegrityError:
+        # Another transaction created the row first
+        db_session.query(model).filter_by(**keys).update(
+            {model.count: model.count + delta}, synchronize_session=False
+        )
+
+
+def _parse_mirror(raw_counters: Dict, raw_buckets: Dict) -> Tuple[Dict[CounterKey, int], Dict[Tuple[str, int], int]]:
+    counters = {}
+    for field, value in raw_counters.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        review_type, priority, decision = field.split(":", 2)
+        counters[(review_type, int(priority), decision)] = int(value)
+    buckets = {}
+    for field, value in (raw_buckets or {}).items():
+        field = field.decode() if isinstance(field, bytes) else field
+        review_type, bucket = field.rsplit(":", 1)
+        buckets[(review_type, int(bucket))] = int(value)
+    return counters, buckets
+
+
+def rebuild_counters(db_session: Session) -> None:
+    """
+    Recompute decision counters from human_reviews (one full scan).
+    For backfills and repair only; the wait histogram is not rebuildable
+    since claim times of completed reviews are not retained, so pending
+    wait deltas are folded first.
+    """
+    while fold_deltas(db_session):
+        pass
+    db_session.query(HumanReviewStatDelta).filter(
+        HumanReviewStatDelta.bucket.is_(None)
+    ).delete(synchronize_session=False)
+    db_session.query(HumanReviewCounter).delete(synchronize_session=False)
+    rows = db_session.query(
+        HumanReview.review_type,
+        HumanReview.priority,
+        HumanReview.decision,
+        func.count(HumanReview.id)
+    ).group_by(HumanReview.review_type, HumanReview.priority, HumanReview.decision).all()
+
+    for review_type, priority, decision, count in rows:
+        db_session.add(HumanReviewCounter(
+            review_type=review_type,
+            priority=priority,
+            decision=decision,
+            count=count
+        ))
+    db_session.commit()
+    logger.info(f"Rebuilt human review counters ({len(rows)} keys)")
+
+
+def rebuild_mirror(db_session: Session, redis_client) -> None:
+    """Replace the Redis mirror with the current database counters."""
+    global _mirror_dirty
+    counters, buckets = _read_database(db_session)
+    _write_mirror(redis_client, counters, buckets)
+    _mirror_dirty = False
+
+
+def _write_mirror(redis_client, counters: Dict[CounterKey, int], buckets: Dict[Tuple[str, int], int]) -> None:
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(REDIS_COUNTERS_KEY, REDIS_WAIT_KEY)
+    if counters:
+        pipe.hset(REDIS_COUNTERS_KEY, mapping={
+            f"{review_type}:{priority}:{decision}": count
+            for (review_type, priority, decision), count in counters.items()
+        })
+    if buckets:
+        pipe.hset(REDIS_WAIT_KEY, mapping={
+            f"{review_type}:{bucket}": count for (review_type, bucket), count in buckets.items()
+        })
+    pipe.set(REDIS_SYNCED_KEY, 1, ex=max(1, settings.HUMAN_REVIEW_STATS_MIRROR_RECONCILE_SECONDS))
+    pipe.execute()
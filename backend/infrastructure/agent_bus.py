@@ -0,0 +1,637 @@
+"""
+Cluster-wide agent registry and state bus.
+
+Agents are registered on the worker that owns them, but their state,
+actions and UI schemas are reachable from every worker:
+
+- RedisAgentBus: registry in a hash, per-agent state in hashes, and one
+  Redis Stream of register/state/unregister events that each worker tails
+  into its local StateBroadcaster replica (so SSE subscribers only ever
+  read local memory). Actions and UI schema requests for agents owned by
+  another worker travel over that worker's RPC stream. State changes are
+  queued and published by a background task, so an agent's update_state
+  never waits on Redis. Each worker refreshes a heartbeat key and removes
+  the agents of workers whose heartbeat has expired.
+- InMemoryAgentBus: single-process implementation with the same
+  interface, for tests and single-worker development.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from infrastructure.state_broadcaster import StateBroadcaster, get_state_broadcaster
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_KEY = "agents:registry"
+EVENTS_STREAM = "agents:events"
+EVENTS_MAXLEN = 10000
+STATE_KEY = "agents:state:{agent_id}"
+RPC_STREAM = "agents:rpc:{node}"
+REPLY_KEY = "agents:reply:{request_id}"
+REPLY_TTL_SECONDS = 60
+# Blocking reads (XREAD BLOCK, BLPOP) share the pooled clients' socket
+# timeout, so each wait stays well under it and long waits are sliced
+BLOCK_SECONDS = max(0.1, min(2.0, settings.REDIS_SOCKET_TIMEOUT / 2))
+NODE_KEY = "agents:node:{node}"
+HEARTBEAT_SECONDS = 10
+NODE_TTL_SECONDS = 30  # A worker missing three heartbeats is presumed dead and its agents removed
+POLL_SECONDS = 1.0
+
+
+class AgentNotFound(Exception):
+    """Raised when an agent is not registered anywhere in the cluster."""
+
+
+class AgentCallError(Exception):
+    """Raised when a remote agent call fails or times out."""
+
+
+def _node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _agent_metadata(agent_id: str, agent: Any, node: str) -> Dict[str, Any]:
+    return {
+        "agent_id": agent_id,
+        "name": getattr(agent, "name", agent_id),
+        "node": node,
+        "supports_ui_schema": hasattr(agent, "get_ui_schema"),
+        "registered_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def _invoke_local(agent: Any, method: str, payload: Dict[str, Any]) -> Any:
+    """Run a bus call against an agent object on this worker."""
+    if method == "ui_schema":
+        if not hasattr(agent, "get_ui_schema"):
+            raise AgentCallError("Agent does not support UI schema")
+        return agent.get_ui_schema(agent.get_state())
+    if method == "action":
+        result = agent.execute_action(payload["action_id"], payload.get("payload") or {})
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    raise AgentCallError(f"Unknown agent call: {method}")
+
+
+class AgentBus(ABC):
+    """Registry plus state fan-out shared by all workers."""
+
+    def __init__(self, broadcaster: Optional[StateBroadcaster] = None):
+        self.broadcaster = broadcaster or get_state_broadcaster()
+        self.node = _node_id()
+        self.local_agents: Dict[str, Any] = {}
+
+    @abstractmethod
+    def register(self, agent_id: str, agent: Any) -> None:
+        """Register an agent owned by this worker."""
+
+    @abstractmethod
+    def unregister(self, agent_id: str) -> None:
+        """Remove an agent owned by this worker."""
+
+    @abstractmethod
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Registry metadata for an agent on any worker."""
+
+    @abstractmethod
+    def list_agents(self) -> List[Dict[str, Any]]:
+        """Registry metadata for every agent in the cluster."""
+
+    @abstractmethod
+    async def call(self, agent_id: str, method: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        """Run "action" or "ui_schema" on the worker that owns the agent."""
+
+    async def register_async(self, agent_id: str, agent: Any) -> None:
+        """register() for use on the event loop."""
+        self.register(agent_id, agent)
+
+    async def get_agent_async(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """get_agent() for use on the event loop."""
+        return self.get_agent(agent_id)
+
+    async def list_agents_async(self) -> List[Dict[str, Any]]:
+        """list_agents() for use on the event loop."""
+        return self.list_agents()
+
+    def get_state(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Agent state from the local replica."""
+        return self.broadcaster.get_snapshot(agent_id)
+
+    async def start(self) -> None:
+        """Start background replication (no-op for single-process buses)."""
+
+    async def stop(self) -> None:
+        """Stop background replication."""
+
+
+class InMemoryAgentBus(AgentBus):
+    """Single-process bus: the registry is a dict and calls are direct."""
+
+    def __init__(self, broadcaster: Optional[StateBroadcaster] = None):
+        super().__init__(broadcaster)
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, agent_id: str, agent: Any) -> None:
+        if agent_id in self.local_agents:
+            self.broadcaster.detach(agent_id)
+        self.local_agents[agent_id] = agent
+        self._metadata[agent_id] = _agent_metadata(agent_id, agent, self.node)
+        self.broadcaster.attach(agent_id, agent)
+
+    def unregister(self, agent_id: str) -> None:
+        if self.local_agents.pop(agent_id, None) is not None:
+            self._metadata.pop(agent_id, None)
+            self.broadcaster.detach(agent_id)
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        return self._metadata.get(agent_id)
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        return list(self._metadata.values())
+
+    async def call(self, agent_id: str, method: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        agent = self.local_agents.get(agent_id)
+        if agent is None:
+            raise AgentNotFound(agent_id)
+        return await _invoke_local(agent, method, payload or {})
+
+
+class RedisAgentBus(AgentBus):
+    """Redis Streams bus replicated into each worker's StateBroadcaster."""
+
+    def __init__(
+        self,
+        redis_client,
+        async_redis_factory=None,
+        broadcaster: Optional[StateBroadcaster] = None,
+        call_timeout: float = 10.0
+    ):
+        super().__init__(broadcaster)
+        self.redis = redis_client
+        self._async_redis_factory = async_redis_factory
+        self.call_timeout = call_timeout
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._last_snapshots: Dict[str, Dict[str, Any]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._calls: Set[asyncio.Task] = set()
+        # agent_id -> {key: encoded value} waiting to be published; update_state
+        # may run on executor threads, so guarded by a lock rather than the loop
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._pending_lock = threading.Lock()
+        self._publish_wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _async_redis(self):
+        if self._async_redis_factory is None:
+            from infrastructure.redis_pool import get_async_redis
+            self._async_redis_factory = get_async_redis
+        return self._async_redis_factory()
+
+    # ------------------------------------------------------------------
+    # Writes (owning worker)
+    # ------------------------------------------------------------------
+
+    def register(self, agent_id: str, agent: Any) -> None:
+        metadata, state = self._prepare_registration(agent_id, agent)
+        self._write_registration(agent_id, metadata, state)
+        self._finish_registration(agent_id, agent, metadata, state)
+
+    async def register_async(self, agent_id: str, agent: Any) -> None:
+        """Register with the Redis writes in a worker thread (the broadcaster is only touched on the loop)."""
+        metadata, state = self._prepare_registration(agent_id, agent)
+        await asyncio.to_thread(self._write_registration, agent_id, metadata, state)
+        self._finish_registration(agent_id, agent, metadata, state)
+
+    def _prepare_registration(self, agent_id: str, agent: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        previous = self.local_agents.get(agent_id)
+        if previous is not None and hasattr(previous, "remove_state_listener"):
+            previous.remove_state_listener(self.publish_state)
+        self.local_agents[agent_id] = agent
+        return _agent_metadata(agent_id, agent, self.node), agent.get_state()
+
+    def _write_registration(self, agent_id: str, metadata: Dict[str, Any], state: Dict[str, Any]) -> None:
+        state_key = STATE_KEY.format(agent_id=agent_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(NODE_KEY.format(node=self.node), datetime.utcnow().isoformat(), ex=NODE_TTL_SECONDS)
+        pipe.hset(REGISTRY_KEY, agent_id, json.dumps(metadata))
+        pipe.delete(state_key)
+        if state:
+            pipe.hset(state_key, mapping={key: json.dumps(value, default=str) for key, value in state.items()})
+        pipe.xadd(EVENTS_STREAM, {
+            "type": "register",
+            "agent_id": agent_id,
+            "metadata": json.dumps(metadata),
+            "state": json.dumps(state, default=str),
+        }, maxlen=EVENTS_MAXLEN, approximate=True)
+        pipe.execute()
+
+    def _finish_registration(self, agent_id: str, agent: Any, metadata: Dict[str, Any], state: Dict[str, Any]) -> None:
+        # Serve our own agent immediately; later changes reach the replica via the stream
+        self._metadata[agent_id] = metadata
+        self.broadcaster.track(agent_id, state)
+
+        if hasattr(agent, "add_state_listener"):
+            agent.add_state_listener(self.publish_state)
+        else:
+            self._last_snapshots[agent_id] = dict(state)
+            logger.info(f"Agent {agent_id} has no state listener support; polling it for changes")
+
+    def unregister(self, agent_id: str) -> None:
+        agent = self.local_agents.pop(agent_id, None)
+        if agent is None:
+            return
+        if hasattr(agent, "remove_state_listener"):
+            agent.remove_state_listener(self.publish_state)
+        self._last_snapshots.pop(agent_id, None)
+        self._metadata.pop(agent_id, None)
+        self.broadcaster.detach(agent_id)
+        with self._pending_lock:
+            self._pending.pop(agent_id, None)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hdel(REGISTRY_KEY, agent_id)
+        pipe.delete(STATE_KEY.format(agent_id=agent_id))
+        pipe.xadd(EVENTS_STREAM, {"type": "unregister", "agent_id": agent_id},
+                  maxlen=EVENTS_MAXLEN, approximate=True)
+        pipe.execute()
+
+    def publish_state(self, agent_id: str, updates: Dict[str, Any]) -> None:
+        """
+        State listener: queue changed keys for the background publisher.
+
+        Never touches Redis, so it is safe on the event loop and cannot fail
+        the agent's update_state. Updates queued before the publisher drains
+        them are merged per agent (last write per key wins).
+        """
+        if not updates:
+            return
+        encoded = {key: json.dumps(value, default=str) for key, value in updates.items()}
+        with self._pending_lock:
+            self._pending.setdefault(agent_id, {}).update(encoded)
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._publish_wake.set)
+            except RuntimeError:
+                pass  # Loop closed during shutdown; stop() flushes what is left
+
+    def _requeue(self, pending: Dict[str, Dict[str, str]]) -> None:
+        """Put back updates that failed to publish, under any newer ones."""
+        with self._pending_lock:
+            for agent_id, encoded in pending.items():
+                merged = dict(encoded)
+                merged.update(self._pending.get(agent_id, {}))
+                self._pending[agent_id] = merged
+
+    async def _flush_pending(self, client) -> int:
+        """Publish queued state changes in one transaction; return how many agents changed."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        pending = {agent_id: encoded for agent_id, encoded in pending.items() if agent_id in self.local_agents}
+        if not pending:
+            return 0
+        try:
+            pipe = client.pipeline(transaction=True)
+            for agent_id, encoded in pending.items():
+                pipe.hset(STATE_KEY.format(agent_id=agent_id), mapping=encoded)
+                pipe.xadd(EVENTS_STREAM, {
+                    "type": "state",
+                    "agent_id": agent_id,
+                    "updates": "{" + ", ".join(f"{json.dumps(key)}: {value}" for key, value in encoded.items()) + "}",
+                }, maxlen=EVENTS_MAXLEN, approximate=True)
+            await pipe.execute()
+        except BaseException:
+            self._requeue(pending)
+            raise
+        return len(pending)
+
+    # ------------------------------------------------------------------
+    # Reads (any worker)
+    # ------------------------------------------------------------------
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self._metadata.get(agent_id)
+        if metadata is None:
+            raw = self.redis.hget(REGISTRY_KEY, agent_id)
+            metadata = json.loads(raw) if raw else None
+        return metadata
+
+    def list_agents(self) -> List[Dict[str, Any]]:
+        return [json.loads(raw) for raw in self.redis.hvals(REGISTRY_KEY)]
+
+    async def get_agent_async(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self._metadata.get(agent_id)
+        if metadata is None:
+            raw = await self._async_redis().hget(REGISTRY_KEY, agent_id)
+            metadata = json.loads(raw) if raw else None
+        return metadata
+
+    async def list_agents_async(self) -> List[Dict[str, Any]]:
+        return [json.loads(raw) for raw in await self._async_redis().hvals(REGISTRY_KEY)]
+
+    async def call(self, agent_id: str, method: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        payload = payload or {}
+        agent = self.local_agents.get(agent_id)
+        if agent is not None:
+            return await _invoke_local(agent, method, payload)
+
+        from redis.exceptions import RedisError
+
+        metadata = await self.get_agent_async(agent_id)
+        if metadata is None:
+            raise AgentNotFound(agent_id)
+
+        client = self._async_redis()
+        try:
+            # Fail fast for a dead worker instead of waiting out the reply timeout
+            if not await client.exists(NODE_KEY.format(node=metadata["node"])):
+                raise AgentNotFound(agent_id)
+            request_id = uuid.uuid4().hex
+            await client.xadd(RPC_STREAM.format(node=metadata["node"]), {
+                "request_id": request_id,
+                "agent_id": agent_id,
+                "method": method,
+                "payload": json.dumps(payload, default=str),
+            }, maxlen=1000, approximate=True)
+
+            reply_key = REPLY_KEY.format(request_id=request_id)
+            deadline = asyncio.get_running_loop().time() + self.call_timeout
+            reply = None
+            while reply is None:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    raise AgentCallError(f"Agent {agent_id} on {metadata['node']} did not answer within {self.call_timeout}s")
+                reply = await client.blpop(reply_key, timeout=min(BLOCK_SECONDS, remaining))
+        except RedisError as e:
+            raise AgentCallError(f"Agent bus error calling {agent_id}: {e}") from e
+        result = json.loads(reply[1])
+        if not result.get("ok"):
+            raise AgentCallError(result.get("error", "Agent call failed"))
+        return result.get("result")
+
+    # ------------------------------------------------------------------
+    # Background tasks
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        last_id = await self._bootstrap()
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._publish_wake = asyncio.Event()
+        self._publish_wake.set()  # Publish anything queued before start
+        self._tasks = [
+            loop.create_task(self._replicate(last_id)),
+            loop.create_task(self._serve_calls()),
+            loop.create_task(self._publish_states()),
+            loop.create_task(self._heartbeat()),
+            loop.create_task(self._poll_unobservable()),
+        ]
+
+    async def stop(self) -> None:
+        tasks = self._tasks + list(self._calls)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._loop = None
+
+        # Publish the last state changes, then withdraw this worker's agents
+        # now rather than when its heartbeat expires
+        client = self._async_redis()
+        try:
+            await self._flush_pending(client)
+            await client.delete(NODE_KEY.format(node=self.node))
+            await self._prune_dead_nodes(client)
+        except Exception as e:
+            logger.warning(f"Agent bus shutdown cleanup failed: {e}")
+
+    async def _bootstrap(self) -> str:
+        """Load the current registry and states, returning the stream position they reflect."""
+        client = self._async_redis()
+        # Read the position first: replaying events after it onto newer state is harmless
+        latest = await client.xrevrange(EVENTS_STREAM, count=1)
+        last_id = latest[0][0] if latest else "0-0"
+
+        registry = await client.hgetall(REGISTRY_KEY)
+        for agent_id, raw in registry.items():
+            self._metadata[agent_id] = json.loads(raw)
+            fields = await client.hgetall(STATE_KEY.format(agent_id=agent_id))
+            self.broadcaster.track(agent_id, {key: json.loads(value) for key, value in fields.items()})
+        logger.info(f"Agent bus replica loaded {len(registry)} agents (node {self.node})")
+        return last_id
+
+    def _apply_event(self, fields: Dict[str, str]) -> None:
+        agent_id = fields["agent_id"]
+        event_type = fields["type"]
+        # Local agents' changes also arrive here, so every worker (including
+        # the owner) applies the same events in the same order
+        if event_type == "state":
+            if self.broadcaster.has_agent(agent_id):
+                self.broadcaster.publish(agent_id, json.loads(fields["updates"]))
+        elif event_type == "register":
+            self._metadata[agent_id] = json.loads(fields["metadata"])
+            if agent_id not in self.local_agents:
+                self.broadcaster.track(agent_id, json.loads(fields["state"]))
+        elif event_type == "unregister":
+            self._metadata.pop(agent_id, None)
+            if agent_id not in self.local_agents:
+                self.broadcaster.detach(agent_id)
+
+    async def _replicate(self, last_id: str) -> None:
+        client = self._async_redis()
+        while True:
+            try:
+                response = await client.xread({EVENTS_STREAM: last_id}, count=500, block=int(BLOCK_SECONDS * 1000))
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        self._apply_event(fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Agent bus replication error: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def _serve_calls(self) -> None:
+        client = self._async_redis()
+        stream = RPC_STREAM.format(node=self.node)
+        # The stream belongs to this worker alone and answered calls are
+        # deleted from it, so reading from the start picks up calls sent
+        # before this task began without answering any twice
+        last_id = "0-0"
+        while True:
+            try:
+                response = await client.xread({stream: last_id}, count=50, block=int(BLOCK_SECONDS * 1000))
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last_id = entry_id
+                        # Each call runs on its own, so a slow action does not hold up the rest
+                        task = asyncio.get_running_loop().create_task(self._answer(client, stream, entry_id, fields))
+                        self._calls.add(task)
+                        task.add_done_callback(self._calls.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Agent bus call handling error: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def _answer(self, client, stream: str, entry_id: str, fields: Dict[str, str]) -> None:
+        agent = self.local_agents.get(fields["agent_id"])
+        try:
+            if agent is None:
+                raise AgentNotFound(fields["agent_id"])
+            result = await _invoke_local(agent, fields["method"], json.loads(fields["payload"]))
+            reply = {"ok": True, "result": result}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        try:
+            reply_key = REPLY_KEY.format(request_id=fields["request_id"])
+            pipe = client.pipeline(transaction=True)
+            pipe.lpush(reply_key, json.dumps(reply, default=str))
+            pipe.expire(reply_key, REPLY_TTL_SECONDS)
+            pipe.xdel(stream, entry_id)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to answer agent call {fields.get('request_id')}: {e}")
+
+    async def _publish_states(self) -> None:
+        """Drain state changes queued by publish_state."""
+        client = self._async_redis()
+        while True:
+            await self._publish_wake.wait()
+            self._publish_wake.clear()
+            try:
+                await self._flush_pending(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Agent bus state publish failed, retrying: {e}")
+                await asyncio.sleep(1)
+                self._publish_wake.set()
+
+    async def _heartbeat(self) -> None:
+        """Keep this worker's node key alive and remove agents of workers whose key expired."""
+        client = self._async_redis()
+        while True:
+            try:
+                await client.set(NODE_KEY.format(node=self.node), datetime.utcnow().isoformat(), ex=NODE_TTL_SECONDS)
+                await self._prune_dead_nodes(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Agent bus heartbeat failed: {e}")
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+
+    async def _prune_dead_nodes(self, client) -> int:
+        """
+        Unregister agents whose node has no heartbeat key; return how many.
+
+        Runs as a WATCH transaction on the registry, so an agent registered
+        meanwhile is never removed; on a conflict the next heartbeat retries.
+        """
+        from redis.exceptions import WatchError
+
+        async with client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(REGISTRY_KEY)
+                registry = await pipe.hgetall(REGISTRY_KEY)
+                agents_by_node: Dict[str, List[str]] = {}
+                for agent_id, raw in registry.items():
+                    agents_by_node.setdefault(json.loads(raw)["node"], []).append(agent_id)
+                if not agents_by_node:
+                    return 0
+                nodes = list(agents_by_node)
+                alive = await pipe.mget([NODE_KEY.format(node=node) for node in nodes])
+                dead = [node for node, heartbeat in zip(nodes, alive) if heartbeat is None]
+                if not dead:
+                    return 0
+
+                removed = [agent_id for node in dead for agent_id in agents_by_node[node]]
+                pipe.multi()
+                pipe.hdel(REGISTRY_KEY, *removed)
+                for agent_id in removed:
+                    pipe.delete(STATE_KEY.format(agent_id=agent_id))
+                    pipe.xadd(EVENTS_STREAM, {"type": "unregister", "agent_id": agent_id},
+                              maxlen=EVENTS_MAXLEN, approximate=True)
+                pipe.delete(*(RPC_STREAM.format(node=node) for node in dead))
+                await pipe.execute()
+            except WatchError:
+                return 0
+        logger.info(f"Removed {len(removed)} agents of expired workers {dead}")
+        return len(removed)
+
+    async def _poll_unobservable(self) -> None:
+        """Publish changed top-level keys of local agents that cannot notify us."""
+        while True:
+            await asyncio.sleep(POLL_SECONDS)
+            for agent_id, previous in list(self._last_snapshots.items()):
+                agent = self.local_agents.get(agent_id)
+                if agent is None:
+                    continue
+                state = agent.get_state()
+                changed = {key: value for key, value in state.items() if previous.get(key, object()) != value}
+                if changed:
+                    self._last_snapshots[agent_id] = dict(state)
+                    try:
+                        self.publish_state(agent_id, changed)
+                    except Exception as e:
+                        logger.error(f"Failed to publish state for {agent_id}: {e}")
+
+
+def create_agent_bus(backend: Optional[str] = None) -> AgentBus:
+    """
+    Create an agent bus for the configured backend.
+
+    "redis" requires Redis; "memory" is single-process only; "auto" uses
+    Redis when it answers a ping and falls back to memory otherwise. The
+    ping blocks, so call this (or the first get_agent_bus) off the event loop.
+    """
+    backend = (backend or settings.AGENT_BUS_BACKEND).lower()
+    if backend == "memory":
+        return InMemoryAgentBus()
+
+    from infrastructure.redis_pool import get_redis
+    try:
+        client = get_redis()
+        client.ping()
+        logger.info("Agent registry and state bus backed by Redis Streams")
+        return RedisAgentBus(client)
+    except Exception as e:
+        if backend == "redis":
+            raise
+        logger.warning(
+            f"Redis unavailable for the agent bus ({e}); using in-memory bus. "
+            "Agents will only be visible on the worker that registered them."
+        )
+        return InMemoryAgentBus()
+
+
+# Global agent bus instance
+_agent_bus: Optional[AgentBus] = None
+
+
+def get_agent_bus() -> AgentBus:
+    """Get or create the global agent bus."""
+    global _agent_bus
+    if _agent_bus is None:
+        _agent_bus = create_agent_bus()
+    return _agent_bus
@@ -0,0 +1,275 @@
+"""
+Shared Redis client factory.
+Every component gets its Redis client here, so the process holds one
+bounded, health-checked connection pool per Redis URL instead of a pool
+(or a fresh connection) per call site.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import redis
+import redis.asyncio as redis_async
+
+from config import settings
+from monitoring.metrics import REDIS_COMMAND_SECONDS
+from monitoring.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# (client kind, command) -> histogram child; commands are a small fixed set
+_command_timers: Dict[Tuple[str, str], Any] = {}
+
+
+def _command_timer(kind: str, command_name: Any) -> Any:
+    key = (kind, command_name)
+    timer = _command_timers.get(key)
+    if timer is None:
+        timer = _command_timers.setdefault(key, REDIS_COMMAND_SECONDS.labels(kind, command_name))
+    return timer
+
+
+def _command_span(command_name: Any) -> Any:
+    """Client span for one checkout; a no-op outside a sampled trace."""
+    return get_tracer().start_span(
+        f"redis {command_name}",
+        kind="client",
+        attributes={"db.system": "redis", "db.operation": str(command_name)},
+        require_parent=True
+    )
+
+
+class _PoolMetrics:
+    """Checkout counters kept alongside a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_in_use = 0
+
+    def record(self, waited: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "peak_in_use": self.peak_in_use,
+            }
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """Blocking pool (callers wait for a free connection) that records usage."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = _PoolMetrics()
+
+    def in_use(self) -> int:
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        return len(self._connections) - idle
+
+    def idle(self) -> int:
+        return sum(1 for connection in list(self.pool.queue) if connection is not None)
+
+    def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            connection = super().get_connection(command_name, *keys, **options)
+        except redis.ConnectionError as e:
+            if "No connection available" in str(e):
+                self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - started, self.in_use())
+        # Round trip = checkout to release (one command, or one pipeline)
+        connection._round_trip_timer = _command_timer("sync", command_name)
+        connection._round_trip_started = time.perf_counter()
+        connection._trace_span = _command_span(command_name)
+        return connection
+
+    def release(self, connection):
+        timer = getattr(connection, "_round_trip_timer", None)
+        if timer is not None:
+            connection._round_trip_timer = None
+            timer.observe_since(connection._round_trip_started)
+            connection._trace_span.end()
+        super().release(connection)
+
+
+class InstrumentedAsyncConnectionPool(redis_async.BlockingConnectionPool):
+    """Async counterpart of InstrumentedConnectionPool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = _PoolMetrics()
+
+    def in_use(self) -> int:
+        return len(self._in_use_connections)
+
+    def idle(self) -> int:
+        return len(self._available_connections)
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        except redis.ConnectionError as e:
+            if "No connection available" in str(e):
+                self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - started, self.in_use())
+        connection._round_trip_timer = _command_timer("async", command_name)
+        connection._round_trip_started = time.perf_counter()
+        connection._trace_span = _command_span(command_name)
+        return connection
+
+    async def release(self, connection):
+        timer = getattr(connection, "_round_trip_timer", None)
+        if timer is not None:
+            connection._round_trip_timer = None
+            timer.observe_since(connection._round_trip_started)
+            connection._trace_span.end()
+        await super().release(connection)
+
+
+def _pool_kwargs(decode_responses: bool, max_connections: Optional[int]) -> Dict[str, Any]:
+    return {
+        "max_connections": max_connections or settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_keepalive": True,
+        "decode_responses": decode_responses,
+    }
+
+
+def _redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.password:
+        netloc = parts.netloc.replace(f":{parts.password}@", ":***@")
+        parts = parts._replace(netloc=netloc)
+    return urlunsplit(parts)
+
+
+_sync_clients: Dict[Tuple[str, bool], redis.Redis] = {}
+# Async connections are bound to the loop that opened them, so pools are per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, bool], redis_async.Redis]]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_redis(
+    url: Optional[str] = None,
+    decode_responses: bool = True,
+    max_connections: Optional[int] = None
+) -> redis.Redis:
+    """
+    Get the shared sync Redis client for url (defaults to settings.REDIS_URL).
+
+    max_connections only applies when the pool is first created.
+    """
+    url = url or settings.REDIS_URL
+    key = (url, decode_responses)
+    with _clients_lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            pool = InstrumentedConnectionPool.from_url(url, **_pool_kwargs(decode_responses, max_connections))
+            client = redis.Redis(connection_pool=pool)
+            _sync_clients[key] = client
+            logger.info(f"Redis pool created for {_redact_url(url)} (max {pool.max_connections} connections)")
+        return client
+
+
+def get_async_redis(
+    url: Optional[str] = None,
+    decode_responses: bool = True,
+    max_connections: Optional[int] = None
+) -> redis_async.Redis:
+    """Get the shared async Redis client for url on the running event loop."""
+    url = url or settings.REDIS_URL
+    key = (url, decode_responses)
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            pool = InstrumentedAsyncConnectionPool.from_url(url, **_pool_kwargs(decode_responses, max_connections))
+            client = redis_async.Redis(connection_pool=pool)
+            clients[key] = client
+            logger.info(f"Async Redis pool created for {_redact_url(url)} (max {pool.max_connections} connections)")
+        return client
+
+
+def get_redis_pool_stats() -> List[Dict[str, Any]]:
+    """Usage of every pool this process has opened."""
+    with _clients_lock:
+        entries = [("sync", key, client) for key, client in _sync_clients.items()]
+        for clients in list(_async_clients.values()):
+            entries.extend(("async", key, client) for key, client in clients.items())
+
+    stats = []
+    for kind, (url, decode_responses), client in entries:
+        pool = client.connection_pool
+        stats.append({
+            "kind": kind,
+            "url": _redact_url(url),
+            "decode_responses": decode_responses,
+            "max_connections": pool.max_connections,
+            "in_use": pool.in_use(),
+            "idle": pool.idle(),
+            **pool.metrics.as_dict(),
+        })
+    return stats
+
+
+def close_redis_pools() -> None:
+    """Disconnect all sync pools (async pools close with their event loop)."""
+    with _clients_lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.connection_pool.disconnect()
+
+
+def warm_redis(connections: int) -> int:
+    """Open up to `connections` connections in the sync pool (PING on each) and return them to it."""
+    pool = get_redis().connection_pool
+    opened = []
+    try:
+        for _ in range(min(connections, pool.max_connections)):
+            connection = pool.get_connection("PING")
+            opened.append(connection)
+            connection.send_command("PING")
+            connection.read_response()
+    finally:
+        for connection in opened:
+            pool.release(connection)
+    return len(opened)
+
+
+async def warm_async_redis(connections: int) -> int:
+    """Open `connections` connections in the running loop's async pool with concurrent PINGs."""
+    client = get_async_redis()
+    count = min(connections, client.connection_pool.max_connections)
+    await asyncio.gather(*(client.ping() for _ in range(count)))
+    return count
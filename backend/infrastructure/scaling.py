@@ -3,11 +3,14 @@ Scaling utilities and infrastructure management.
 Supports horizontal scaling, caching, and auto-scaling triggers.
 """
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from redis import Redis
-from elasticsearch import Elasticsearch
 
 from config import settings
+from infrastructure.redis_pool import get_redis
+
+if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
 
 logger = logging.getLogger(__name__)
 
@@ -17,20 +20,19 @@ class ScalingManager:
     
     def __init__(self):
         self.redis_client: Optional[Redis] = None
-        self.elasticsearch_client: Optional[Elasticsearch] = None
+        self.elasticsearch_client: Optional["Elasticsearch"] = None
     
     def get_redis_client(self) -> Redis:
-        """Get or create Redis client for caching."""
+        """Get the shared pooled Redis client for caching."""
         if self.redis_client is None:
-            self.redis_client = Redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True
-            )
+            self.redis_client = get_redis()
         return self.redis_client
     
-    def get_elasticsearch_client(self) -> Elasticsearch:
+    def get_elasticsearch_client(self) -> "Elasticsearch":
         """Get or create Elasticsearch client for search."""
         if self.elasticsearch_client is None:
+            # Imported on first use: elasticsearch takes ~0.5s to import
+            from elasticsearch import Elasticsearch
             self.elasticsearch_client = Elasticsearch(
                 [settings.ELASTICSEARCH_URL],
                 request_timeout=30
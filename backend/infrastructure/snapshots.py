@@ -0,0 +1,243 @@
+"""
+Snapshots of in-memory indexes for fast restart.
+
+Indexes the process builds in memory from the database (the job skill
+index) register a SnapshotSource. Their contents are written to one
+compact binary file each: a fixed header, then the payload in marshal
+format. At startup the file is memory-mapped and decoded straight from
+the mapping, then the source replays only what changed in its source of
+truth since the high-water mark stored in the header, so restart time
+tracks the delta rather than the data size. A missing, corrupt or
+incompatible snapshot (other Python or layout version) falls back to a
+full rebuild, as does one whose source identity (a digest of which
+database it came from and of the rows below its mark) no longer matches,
+e.g. after a database reset or with a snapshot written against another
+database.
+
+Only sources with a database behind them belong here: files are replaced
+atomically, so with several workers the last writer wins, which is only
+safe when every worker's snapshot is equivalent.
+"""
+import asyncio
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IXSN"
+FORMAT_VERSION = 2
+PYTHON_TAG = sys.version_info[0] * 100 + sys.version_info[1]  # marshal data is only stable within a Python version
+
+# magic, format version (read first, so older layouts are recognised)
+PREFIX = struct.Struct("<4sB")
+# magic, format version, marshal version, Python tag, source version,
+# high-water mark (-1 = none), payload length, payload CRC32, identity digest
+HEADER = struct.Struct("<4sBBHHqQI16s")
+
+
+def _identity_digest(identity: str) -> bytes:
+    # Only the digest is stored, so identities may include connection URLs
+    return hashlib.sha256(identity.encode("utf-8")).digest()[:16]
+
+
+class SnapshotSource:
+    """
+    An in-memory structure that can be snapshotted.
+
+    Subclasses set `name` (the file name) and `version` (bump it when the
+    payload layout changes; older snapshots are then rebuilt). Payloads
+    must be marshal-able: None, bool, int, float, str, bytes, and tuples,
+    lists, sets and dicts of those.
+    """
+
+    name: str = ""
+    version: int = 1
+
+    def dump(self) -> Tuple[Any, Optional[int]]:
+        """Return (payload, high-water mark of the data it contains)."""
+        raise NotImplementedError
+
+    def load(self, payload: Any, high_water: Optional[int]) -> None:
+        """Replace the in-memory contents with a dumped payload."""
+        raise NotImplementedError
+
+    def identity(self, high_water: Optional[int]) -> str:
+        """
+        Describe the source of truth as of a high-water mark. Saved with the
+        snapshot and recomputed on restore; a difference means the snapshot
+        does not belong to this data and it is rebuilt instead.
+        """
+        return ""
+
+    def catch_up(self) -> int:
+        """Apply changes past the high-water mark from the source of truth; return how many."""
+        return 0
+
+    def rebuild(self) -> int:
+        """Build from the source of truth when there is no usable snapshot; return records loaded."""
+        return 0
+
+    def count(self) -> int:
+        """Records currently held, for reporting."""
+        return 0
+
+
+class SnapshotStore:
+    """Writes and restores the snapshots of registered sources."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._sources: Dict[str, SnapshotSource] = {}
+        self._restored: Set[str] = set()  # Only these are saved, so an early shutdown cannot overwrite a snapshot with nothing
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, source: SnapshotSource) -> SnapshotSource:
+        self._sources[source.name] = source
+        return source
+
+    def path(self, source: SnapshotSource) -> str:
+        return os.path.join(self.directory, f"{source.name}.snap")
+
+    def save(self, source: SnapshotSource) -> Dict[str, Any]:
+        """Write source's snapshot (atomically replacing the previous one)."""
+        started = time.perf_counter()
+        payload, high_water = source.dump()
+        data = marshal.dumps(payload)
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, marshal.version, PYTHON_TAG, source.version,
+            -1 if high_water is None else high_water, len(data), zlib.crc32(data),
+            _identity_digest(source.identity(high_water))
+        )
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(source)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+        return {
+            "source": source.name,
+            "records": source.count(),
+            "bytes": HEADER.size + len(data),
+            "high_water": high_water,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def read(self, source: SnapshotSource) -> Optional[Tuple[Any, Optional[int], bytes]]:
+        """Decode source's snapshot (payload, high-water mark, identity digest) from a memory mapping, or None if there is no usable one."""
+        path = self.path(source)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < PREFIX.size:
+                    raise ValueError("truncated header")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    magic, fmt = PREFIX.unpack_from(mapped)
+                    if magic != MAGIC:
+                        raise ValueError("not a snapshot file")
+                    if fmt != FORMAT_VERSION:
+                        logger.info(f"Snapshot {path} has an older file format; rebuilding")
+                        return None
+                    if size < HEADER.size:
+                        raise ValueError("truncated header")
+                    _, _, marshal_version, python_tag, version, high_water, length, crc, identity = HEADER.unpack_from(mapped)
+                    if (marshal_version, python_tag, version) != (marshal.version, PYTHON_TAG, source.version):
+                        logger.info(f"Snapshot {path} was written by another Python or layout version; rebuilding")
+                        return None
+                    if HEADER.size + length != size:
+                        raise ValueError("truncated payload")
+                    with memoryview(mapped) as view, view[HEADER.size:] as data:
+                        if zlib.crc32(data) != crc:
+                            raise ValueError("checksum mismatch")
+                        payload = marshal.loads(data)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError, struct.error) as e:
+            logger.warning(f"Ignoring unusable snapshot {path}: {e}")
+            return None
+        return payload, (None if high_water < 0 else high_water), identity
+
+    def restore(self, source: SnapshotSource) -> Dict[str, Any]:
+        """Load source from its snapshot and replay the delta, or rebuild it."""
+        started = time.perf_counter()
+        snapshot = self.read(source)
+        if snapshot is not None:
+            payload, high_water, identity = snapshot
+            if identity != _identity_digest(source.identity(high_water)):
+                logger.info(f"Snapshot {self.path(source)} does not match the current data (reset or other database); rebuilding")
+                snapshot = None
+        if snapshot is not None:
+            source.load(payload, high_water)
+            loaded_ms = (time.perf_counter() - started) * 1000
+            replayed = source.catch_up()
+            detail = {"from": "snapshot", "high_water": high_water, "load_ms": round(loaded_ms, 1), "replayed": replayed}
+        else:
+            detail = {"from": "rebuild", "rebuilt": source.rebuild()}
+        self._restored.add(source.name)
+        detail.update(source=source.name, records=source.count(), ms=round((time.perf_counter() - started) * 1000, 1))
+        logger.info(f"Restored {source.name}: {detail}")
+        return detail
+
+    def restore_all(self) -> Dict[str, Dict[str, Any]]:
+        """Restore every registered source (the startup warmup hook)."""
+        return {name: self.restore(source) for name, source in self._sources.items()}
+
+    def save_all(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot every restored source; a failing source is logged and skipped."""
+        saved = {}
+        for name, source in self._sources.items():
+            if name not in self._restored:
+                continue
+            try:
+                saved[name] = self.save(source)
+            except Exception as e:
+                logger.error(f"Snapshot of {name} failed: {e}")
+        return saved
+
+    def start(self, interval: float) -> None:
+        """Snapshot every `interval` seconds in the background, so a crash loses at most one interval."""
+        if self._task is None and interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._save_periodically(interval))
+
+    async def _save_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.save_all)
+
+    async def stop(self) -> None:
+        """Stop periodic snapshots and write a final one."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.save_all)
+
+
+# Global snapshot store
+_snapshot_store: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get or create the process-wide snapshot store."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = SnapshotStore(settings.SNAPSHOT_DIR)
+    return _snapshot_store
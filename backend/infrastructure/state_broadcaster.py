@@ -0,0 +1,307 @@
+"""
+Agent state fan-out for Server-Sent Events.
+
+Agents publish their state changes; one broadcaster per process keeps the
+latest snapshot of each agent, turns each change into an RFC 6902 JSON
+Patch and pushes it to every subscriber of that agent. Idle streams cost
+nothing but a heartbeat, and reconnecting clients resume from
+Last-Event-ID out of a short replay buffer (or get a fresh snapshot when
+they have fallen too far behind).
+"""
+import asyncio
+import copy
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0
+REPLAY_BUFFER_SIZE = 256
+SUBSCRIBER_QUEUE_SIZE = 64
+# Agents that cannot notify us are diffed on this interval, once per agent
+POLL_SECONDS = 1.0
+
+_MISSING = object()
+
+
+def _escape_pointer(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def json_patch_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Build JSON Patch operations turning old into new.
+
+    Dicts are diffed key by key; lists and scalars are replaced whole when
+    they differ.
+    """
+    if old is _MISSING:
+        return [{"op": "add", "path": path, "value": new}]
+    if new is _MISSING:
+        return [{"op": "remove", "path": path}]
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = []
+        for key in old.keys() - new.keys():
+            ops.append({"op": "remove", "path": f"{path}/{_escape_pointer(key)}"})
+        for key, value in new.items():
+            ops.extend(json_patch_diff(old.get(key, _MISSING), value, f"{path}/{_escape_pointer(key)}"))
+        return ops
+    if type(old) is not type(new) or old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _format_event(event_id: Optional[int], payload: Dict[str, Any]) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(payload, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: "asyncio.Queue[Tuple[int, List[Dict[str, Any]]]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.resync = False
+
+
+class _AgentChannel:
+    def __init__(self, agent: Any = None, snapshot: Optional[Dict[str, Any]] = None):
+        self.agent = agent
+        self.snapshot: Dict[str, Any] = copy.deepcopy(agent.get_state() if agent is not None else snapshot or {})
+        self.seq = 0
+        self.history: Deque[Tuple[int, List[Dict[str, Any]]]] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self.subscribers: Set[_Subscriber] = set()
+        # Replicas (agent is None) are fed by publish() from the agent bus
+        self.observable = agent is None or hasattr(agent, "add_state_listener")
+        self.poller: Optional[asyncio.Task] = None
+
+
+class StateBroadcaster:
+    """Fans agent state changes out to SSE subscribers as JSON Patches."""
+
+    def __init__(self, heartbeat_seconds: float = HEARTBEAT_SECONDS):
+        self.heartbeat_seconds = heartbeat_seconds
+        self._channels: Dict[str, _AgentChannel] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------
+    # Agent side
+    # ------------------------------------------------------------------
+
+    def attach(self, agent_id: str, agent: Any) -> None:
+        """Start tracking an agent; its update_state calls become events."""
+        channel = _AgentChannel(agent)
+        self._bind_loop()
+        with self._lock:
+            self._channels[agent_id] = channel
+        if channel.observable:
+            agent.add_state_listener(self.publish)
+        else:
+            logger.info(f"Agent {agent_id} has no state listener support; falling back to shared polling")
+
+    def track(self, agent_id: str, snapshot: Dict[str, Any]) -> None:
+        """
+        Start (or reset) a replica of an agent that lives elsewhere.
+
+        Changes arrive through publish(); an existing channel keeps its
+        subscribers and sends them the new snapshot as a patch.
+        """
+        self._bind_loop()
+        with self._lock:
+            channel = self._channels.get(agent_id)
+            if channel is None or channel.agent is not None:
+                self._channels[agent_id] = _AgentChannel(snapshot=snapshot)
+                return
+        ops = json_patch_diff(channel.snapshot, snapshot)
+        channel.snapshot = copy.deepcopy(snapshot)
+        self._emit(channel, ops)
+
+    def detach(self, agent_id: str) -> None:
+        with self._lock:
+            channel = self._channels.pop(agent_id, None)
+        if channel is None:
+            return
+        if channel.agent is not None and channel.observable:
+            channel.agent.remove_state_listener(self.publish)
+        if channel.poller is not None:
+            channel.poller.cancel()
+
+    def _bind_loop(self) -> None:
+        if self._loop is None:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+
+    def publish(self, agent_id: str, updates: Dict[str, Any]) -> None:
+        """
+        Record a state change (the keys passed to update_state).
+
+        Safe to call from any thread; delivery always happens on the event
+        loop serving the streams.
+        """
+        loop = self._loop
+        if loop is None:
+            self._apply(agent_id, updates)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._apply(agent_id, updates)
+        else:
+            loop.call_soon_threadsafe(self._apply, agent_id, copy.deepcopy(updates))
+
+    def _apply(self, agent_id: str, updates: Dict[str, Any]) -> None:
+        channel = self._channels.get(agent_id)
+        if channel is None:
+            return
+        ops: List[Dict[str, Any]] = []
+        for key, value in updates.items():
+            # Snapshot values are replaced, never mutated, so ops can share them
+            value = copy.deepcopy(value)
+            ops.extend(json_patch_diff(
+                channel.snapshot.get(key, _MISSING), value, f"/{_escape_pointer(key)}"
+            ))
+            channel.snapshot[key] = value
+        self._emit(channel, ops)
+
+    def _emit(self, channel: _AgentChannel, ops: List[Dict[str, Any]]) -> None:
+        if not ops:
+            return
+        channel.seq += 1
+        event = (channel.seq, ops)
+        channel.history.append(event)
+        for subscriber in channel.subscribers:
+            if subscriber.resync:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and send a snapshot instead
+                subscriber.resync = True
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait((channel.seq, []))
+
+    async def _poll(self, channel: _AgentChannel) -> None:
+        while True:
+            await asyncio.sleep(POLL_SECONDS)
+            state = channel.agent.get_state()
+            ops = json_patch_diff(channel.snapshot, state)
+            if ops:
+                channel.snapshot = copy.deepcopy(state)
+                self._emit(channel, ops)
+
+    # ------------------------------------------------------------------
+    # Subscriber side
+    # ------------------------------------------------------------------
+
+    def has_agent(self, agent_id: str) -> bool:
+        return agent_id in self._channels
+
+    def get_snapshot(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Latest known state of an agent (a copy), or None if untracked."""
+        channel = self._channels.get(agent_id)
+        return copy.deepcopy(channel.snapshot) if channel is not None else None
+
+    def _snapshot_event(self, agent_id: str, channel: _AgentChannel) -> str:
+        return _format_event(channel.seq, {
+            "agentId": agent_id,
+            "type": "snapshot",
+            "state": channel.snapshot,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    def _patch_event(self, agent_id: str, event_id: int, ops: List[Dict[str, Any]]) -> str:
+        return _format_event(event_id, {
+            "agentId": agent_id,
+            "type": "patch",
+            "patch": ops,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    async def subscribe(self, agent_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield SSE frames for an agent until the client disconnects.
+
+        Starts with the patches after last_event_id when they are still
+        buffered, otherwise with a full snapshot.
+        """
+        self._loop = asyncio.get_running_loop()
+        channel = self._channels.get(agent_id)
+        if channel is None:
+            return
+
+        subscriber = _Subscriber()
+        channel.subscribers.add(subscriber)
+        if not channel.observable and channel.poller is None:
+            channel.poller = self._loop.create_task(self._poll(channel))
+
+        try:
+            replay = self._replay(channel, last_event_id)
+            if replay is None:
+                yield self._snapshot_event(agent_id, channel)
+            else:
+                for event_id, ops in replay:
+                    yield self._patch_event(agent_id, event_id, ops)
+
+            while True:
+                try:
+                    event_id, ops = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if subscriber.resync:
+                    subscriber.resync = False
+                    yield self._snapshot_event(agent_id, channel)
+                else:
+                    yield self._patch_event(agent_id, event_id, ops)
+        finally:
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers and channel.poller is not None:
+                channel.poller.cancel()
+                channel.poller = None
+
+    def _replay(
+        self,
+        channel: _AgentChannel,
+        last_event_id: Optional[str]
+    ) -> Optional[List[Tuple[int, List[Dict[str, Any]]]]]:
+        """Buffered events after last_event_id, or None if a snapshot is needed."""
+        if last_event_id is None:
+            return None
+        try:
+            last_seen = int(last_event_id)
+        except ValueError:
+            return None
+        if last_seen == channel.seq:
+            return []
+        if last_seen > channel.seq or not channel.history or channel.history[0][0] > last_seen + 1:
+            return None
+        return [event for event in channel.history if event[0] > last_seen]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            agent_id: {"subscribers": len(channel.subscribers), "seq": channel.seq}
+            for agent_id, channel in list(self._channels.items())
+        }
+
+
+# Global broadcaster instance
+_broadcaster: Optional[StateBroadcaster] = None
+
+
+def get_state_broadcaster() -> StateBroadcaster:
+    """Get or create the global state broadcaster."""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = StateBroadcaster()
+    return _broadcaster
@@ -0,0 +1,203 @@
+"""
+Instance warmup and readiness gating.
+
+Startup registers warmup hooks (open pooled connections, build SDK
+clients, load indexes and caches, compile regexes) and starts them; they
+run in parallel in the background, sync hooks in the default executor and
+async hooks on the event loop. /health answers as soon as the process is
+up, while /ready stays 503 until every required hook has succeeded, so an
+orchestrator only routes traffic to warm instances. A failed required
+hook is retried with exponential backoff until it succeeds (a database
+that was down at boot does not leave the instance unready for good).
+Optional hooks run once; a failure is logged but does not hold readiness
+back. /ready is public, so reports carry only status and timings; errors
+go to the log.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from config import settings
+from monitoring.metrics import WARMUP_HOOK_SECONDS, WARMUP_READY
+
+logger = logging.getLogger(__name__)
+
+WarmupFunction = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+@dataclass
+class WarmupHook:
+    name: str
+    function: WarmupFunction
+    required: bool = True
+    timeout: Optional[float] = None
+
+
+@dataclass
+class HookResult:
+    name: str
+    required: bool
+    status: str = "pending"  # pending, running, ok, failed, timeout
+    seconds: Optional[float] = None
+    attempts: int = 0
+    detail: Any = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Public form: status and timing only (detail and error can name hosts, ports and credentials)."""
+        return {
+            "name": self.name,
+            "required": self.required,
+            "status": self.status,
+            "attempts": self.attempts,
+            "ms": round(self.seconds * 1000, 1) if self.seconds is not None else None,
+        }
+
+
+class Warmup:
+    """Registry and runner for warmup hooks; tracks readiness."""
+
+    def __init__(self, timeout: float = 30.0, retry_max_seconds: float = 30.0):
+        self.timeout = timeout
+        self.retry_max_seconds = retry_max_seconds
+        self._hooks: Dict[str, WarmupHook] = {}
+        self._results: Dict[str, HookResult] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self.draining = False
+
+    def register(
+        self,
+        name: str,
+        function: WarmupFunction,
+        required: bool = True,
+        timeout: Optional[float] = None
+    ) -> None:
+        """Add a hook; it must be registered before start()."""
+        if self._task is not None:
+            raise RuntimeError(f"Warmup already started; cannot register {name!r}")
+        self._hooks[name] = WarmupHook(name, function, required, timeout)
+        self._results[name] = HookResult(name, required)
+
+    def hook(self, name: str, required: bool = True, timeout: Optional[float] = None):
+        """Decorator form of register()."""
+        def decorator(function: WarmupFunction) -> WarmupFunction:
+            self.register(name, function, required, timeout)
+            return function
+        return decorator
+
+    def start(self) -> asyncio.Task:
+        """Run every hook in the background on the running loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def run(self) -> Dict[str, Any]:
+        self._started_at = time.monotonic()
+        WARMUP_READY.set(0)
+        await asyncio.gather(*(self._run_hook(hook) for hook in self._hooks.values()))
+        self._finished_at = time.monotonic()
+        WARMUP_READY.set(1 if self.ready else 0)
+
+        timings = ", ".join(
+            f"{result.name} {result.seconds * 1000:.0f}ms" + ("" if result.status == "ok" else f" ({result.status})")
+            for result in sorted(self._results.values(), key=lambda r: r.seconds or 0, reverse=True)
+        )
+        elapsed_ms = (self._finished_at - self._started_at) * 1000
+        logger.info(f"Warmup finished in {elapsed_ms:.0f}ms, instance ready: {timings or 'no hooks'}")
+        return self.report()
+
+    async def _run_hook(self, hook: WarmupHook) -> None:
+        """Run a hook once, or for a required hook until it succeeds."""
+        delay = 1.0
+        while True:
+            await self._attempt_hook(hook)
+            if self._results[hook.name].status == "ok" or not hook.required:
+                return
+            logger.info(f"Retrying warmup hook {hook.name} in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max_seconds)
+
+    async def _attempt_hook(self, hook: WarmupHook) -> None:
+        result = self._results[hook.name]
+        result.status = "running"
+        result.attempts += 1
+        timeout = hook.timeout or self.timeout
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(hook.function):
+                pending = hook.function()
+            else:
+                pending = asyncio.to_thread(hook.function)
+            result.detail = await asyncio.wait_for(pending, timeout)
+            result.status = "ok"
+            result.error = None
+        except asyncio.TimeoutError:
+            result.status = "timeout"
+            result.error = f"did not finish within {timeout:g}s"
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.seconds = time.perf_counter() - started
+            WARMUP_HOOK_SECONDS.labels(hook.name).set(result.seconds)
+
+        if result.status != "ok":
+            log = logger.error if hook.required else logger.warning
+            log(f"Warmup hook {hook.name} {result.status} (attempt {result.attempts}): {result.error}")
+
+    @property
+    def finished(self) -> bool:
+        return self._finished_at is not None
+
+    @property
+    def ready(self) -> bool:
+        """Warmup finished (so every required hook succeeded) and not shutting down."""
+        return (
+            self.finished
+            and not self.draining
+            and all(result.status == "ok" for result in self._results.values() if result.required)
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """Readiness plus per-hook status and timing."""
+        if self.draining:
+            status = "draining"
+        else:
+            status = "ready" if self.ready else "warming"
+        end = self._finished_at or time.monotonic()
+        return {
+            "ready": self.ready,
+            "status": status,
+            "warmup_ms": round((end - self._started_at) * 1000, 1) if self._started_at else None,
+            "hooks": [result.as_dict() for result in self._results.values()],
+        }
+
+    async def stop(self) -> None:
+        """Report not-ready from now on (shutdown drain) and cancel unfinished hooks."""
+        self.draining = True
+        WARMUP_READY.set(0)
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global warmup instance
+_warmup: Optional[Warmup] = None
+
+
+def get_warmup() -> Warmup:
+    """Get or create the process-wide warmup registry."""
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup(
+            timeout=settings.WARMUP_TIMEOUT_SECONDS,
+            retry_max_seconds=settings.WARMUP_RETRY_MAX_SECONDS
+        )
+    return _warmup
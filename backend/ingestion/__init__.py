@@ -0,0 +1,28 @@
+"""
+Bulk Ingestion Module.
+Streams partner feeds into the database in COPY-sized batches.
+"""
+
+from ingestion.job_postings import (
+    JobPostingIngestor,
+    IngestionReport,
+    RecordValidationError,
+    normalize_record,
+    elasticsearch_index_hook,
+    skill_index_hook
+)
+from ingestion.readers import iter_records, detect_format
+from ingestion.skills import normalize_skill, normalize_skills
+
+__all__ = [
+    "JobPostingIngestor",
+    "IngestionReport",
+    "RecordValidationError",
+    "normalize_record",
+    "elasticsearch_index_hook",
+    "skill_index_hook",
+    "iter_records",
+    "detect_format",
+    "normalize_skill",
+    "normalize_skills"
+]
@@ -0,0 +1,324 @@
+"""
+Bulk job posting ingestion.
+Streams partner feeds (JSON, JSONL, CSV), validates and normalizes each
+record, and writes batches with PostgreSQL COPY instead of per-row ORM
+inserts. Post-batch hooks keep search indexes and caches in step.
+
+Usage:
+    python -m ingestion.job_postings data/simulated_opportunities.json --batch-size 5000
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from database.models import JobPosting
+from ingestion.readers import iter_records
+from ingestion.skills import normalize_skills
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = ["id", "title", "description", "required_skills", "preferred_skills", "created_at", "active"]
+
+# Feed field name -> candidate source keys, in order of preference
+FIELD_SOURCES = {
+    "title": ["title", "job_title", "name"],
+    "description": ["description", "summary", "body"],
+    "required_skills": ["required_skills", "requirements", "skills", "requiredSkills"],
+    "preferred_skills": ["preferred_skills", "preferredSkills", "nice_to_have", "niceToHave"],
+    "created_at": ["created_at", "createdAt", "postedDate", "posted_at"],
+    "active": ["active", "isActive", "is_active"],
+}
+
+# Called after each committed batch with the inserted rows (including ids)
+BatchHook = Callable[[List[Dict[str, Any]]], None]
+
+
+class RecordValidationError(ValueError):
+    """Raised when a feed record cannot become a job posting."""
+
+
+@dataclass
+class IngestionReport:
+    """Throughput and outcome of an ingestion run."""
+    source: str
+    records_read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    rejections: List[str] = field(default_factory=list)  # First few rejection reasons
+
+    @property
+    def records_per_second(self) -> float:
+        return self.inserted / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "records_read": self.records_read,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "records_per_second": round(self.records_per_second, 1),
+            "rejections": self.rejections,
+        }
+
+
+def _first(record: Dict[str, Any], keys: List[str]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_bool(value: Any, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "t")
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise RecordValidationError(f"invalid timestamp '{value}'")
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a raw feed record and map it onto job_postings columns."""
+    if not isinstance(record, dict):
+        raise RecordValidationError("record is not an object")
+
+    title = str(_first(record, FIELD_SOURCES["title"]) or "").strip()
+    description = str(_first(record, FIELD_SOURCES["description"]) or "").strip()
+    if not title:
+        raise RecordValidationError("missing title")
+    if not description:
+        raise RecordValidationError("missing description")
+    if len(title) > 255:
+        raise RecordValidationError("title longer than 255 characters")
+
+    required = normalize_skills(_first(record, FIELD_SOURCES["required_skills"]))
+    required_keys = {skill.lower() for skill in required}
+    preferred = [
+        skill for skill in normalize_skills(_first(record, FIELD_SOURCES["preferred_skills"]))
+        if skill.lower() not in required_keys
+    ]
+
+    return {
+        "title": title,
+        "description": description,
+        "required_skills": required,
+        "preferred_skills": preferred or None,
+        "created_at": _parse_datetime(_first(record, FIELD_SOURCES["created_at"])),
+        "active": _parse_bool(_first(record, FIELD_SOURCES["active"])),
+    }
+
+
+class JobPostingIngestor:
+    """Batched, COPY-based loader for job postings."""
+
+    def __init__(
+        self,
+        db_session: Session,
+        batch_size: int = 5000,
+        hooks: Optional[List[BatchHook]] = None,
+        max_reported_rejections: int = 20
+    ):
+        self.db = db_session
+        self.batch_size = batch_size
+        self.hooks = list(hooks or [])
+        self.max_reported_rejections = max_reported_rejections
+        self._use_copy = db_session.get_bind().dialect.name == "postgresql"
+
+    def add_hook(self, hook: BatchHook) -> None:
+        """Register a post-batch hook (search indexing, cache invalidation)."""
+        self.hooks.append(hook)
+
+    def ingest_file(self, path: Path, fmt: Optional[str] = None) -> IngestionReport:
+        """Stream a feed file into job_postings."""
+        return self.ingest(iter_records(Path(path), fmt), source=str(path))
+
+    def ingest(self, records: Iterable[Dict[str, Any]], source: str = "<stream>") -> IngestionReport:
+        """Validate, normalize and insert records in batches."""
+        report = IngestionReport(source=source)
+        started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+
+        for record in records:
+            report.records_read += 1
+            try:
+                batch.append(normalize_record(record))
+            except RecordValidationError as e:
+                report.rejected += 1
+                if len(report.rejections) < self.max_reported_rejections:
+                    report.rejections.append(f"record {report.records_read}: {e}")
+                continue
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report, started)
+                batch = []
+
+        if batch:
+            self._flush(batch, report, started)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"Ingested {report.inserted} job postings from {source} "
+            f"({report.rejected} rejected) in {report.elapsed_seconds:.2f}s "
+            f"({report.records_per_second:.0f}/s)"
+        )
+        return report
+
+    def _flush(self, rows: List[Dict[str, Any]], report: IngestionReport, started: float) -> None:
+        try:
+            if self._use_copy:
+                self._copy_batch(rows)
+            else:
+                self._insert_batch(rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        report.inserted += len(rows)
+        report.batches += 1
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Batch {report.batches}: {len(rows)} postings "
+            f"({report.inserted} total, {report.inserted / elapsed:.0f}/s)"
+        )
+
+        for hook in self.hooks:
+            try:
+                hook(rows)
+            except Exception as e:
+                logger.error(f"Ingestion hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+    def _copy_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """COPY a batch into job_postings with pre-allocated ids."""
+        ids = self.db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('job_postings', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(rows)}
+        ).scalars().all()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row_id, row in zip(ids, rows):
+            row["id"] = row_id
+            writer.writerow([
+                row_id,
+                row["title"],
+                row["description"],
+                json.dumps(row["required_skills"]),
+                json.dumps(row["preferred_skills"]) if row["preferred_skills"] is not None else "",
+                row["created_at"].isoformat(sep=" "),
+                "t" if row["active"] else "f",
+            ])
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY job_postings ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _insert_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """Portable fallback: one multi-row INSERT ... RETURNING per batch."""
+        ids = self.db.execute(
+            insert(JobPosting).returning(JobPosting.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+        for row_id, row in zip(ids, rows):
+            row["id"] = row_id
+
+
+def elasticsearch_index_hook(index: str = "job_postings") -> BatchHook:
+    """Build a hook that bulk-indexes each batch into Elasticsearch."""
+    def index_batch(rows: List[Dict[str, Any]]) -> None:
+        from elasticsearch.helpers import bulk
+        from infrastructure.scaling import scaling_manager
+
+        actions = [
+            {
+                "_index": index,
+                "_id": row["id"],
+                "_source": {
+                    "title": row["title"],
+                    "description": row["description"],
+                    "required_skills": row["required_skills"],
+                    "preferred_skills": row["preferred_skills"] or [],
+                    "created_at": row["created_at"].isoformat(),
+                    "active": row["active"],
+                },
+            }
+            for row in rows
+        ]
+        bulk(scaling_manager.get_elasticsearch_client(), actions)
+
+    index_batch.__name__ = "elasticsearch_index_hook"
+    return index_batch
+
+
+def skill_index_hook() -> BatchHook:
+    """
+    Build a hook that adds each batch to this process's job skill index,
+    for ingestion running inside the API process. Other processes (and the
+    CLI's own batches) reach their indexes through the index's replay of
+    postings above its high-water mark.
+    """
+    def index_batch(rows: List[Dict[str, Any]]) -> None:
+        from ai.skill_index import get_job_skill_index
+        get_job_skill_index().add_postings(rows)
+
+    index_batch.__name__ = "skill_index_hook"
+    return index_batch
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load job postings from a feed file")
+    parser.add_argument("path", type=Path, help="JSON, JSONL or CSV feed")
+    parser.add_argument("--format", choices=["json", "jsonl", "csv"], default=None)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--index", action="store_true", help="Index each batch into Elasticsearch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from database.connection import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ingestor = JobPostingIngestor(db, batch_size=args.batch_size)
+        if args.index:
+            ingestor.add_hook(elasticsearch_index_hook())
+        report = ingestor.ingest_file(args.path, args.format)
+    finally:
+        db.close()
+
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Streaming record readers for bulk ingestion.
+JSON arrays, JSON Lines and CSV are read incrementally so memory stays flat
+regardless of feed size.
+"""
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+SUPPORTED_FORMATS = ("json", "jsonl", "csv")
+
+
+def detect_format(path: Path) -> str:
+    """Guess the feed format from the extension, peeking at .json files."""
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    if suffix == ".json":
+        with path.open("r", encoding="utf-8") as f:
+            head = f.read(CHUNK_SIZE).lstrip()
+        return "json" if head.startswith("[") else "jsonl"
+    raise ValueError(f"Cannot detect feed format for {path}; pass one of {SUPPORTED_FORMATS}")
+
+
+def iter_json_array(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield items of a top-level JSON array without loading the whole document.
+    Items are decoded one at a time with JSONDecoder.raw_decode over a
+    sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    started = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        # Skip whitespace and structural separators
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer):
+                break
+            if not fill():
+                if not started:
+                    raise ValueError("Empty JSON document")
+                raise ValueError("Unterminated JSON array")
+
+        char = buffer[position]
+        if not started:
+            if char != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if char == "]":
+            return
+        if char == ",":
+            position += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof or not fill():
+                raise
+            continue
+        if end == len(buffer) and not eof:
+            # A scalar may continue past the buffer edge; decode again with more input
+            if fill():
+                continue
+        position = end
+        yield item
+
+
+def iter_json_lines(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield one object per non-empty line."""
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed JSON on line {line_number}: {e}")
+
+
+def iter_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per CSV row keyed by the header."""
+    yield from csv.DictReader(stream)
+
+
+def iter_records(path: Path, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream raw records from a feed file."""
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported feed format '{fmt}'; expected one of {SUPPORTED_FORMATS}")
+
+    newline = "" if fmt == "csv" else None
+    with path.open("r", encoding="utf-8", newline=newline) as stream:
+        if fmt == "json":
+            yield from iter_json_array(stream)
+        elif fmt == "jsonl":
+            yield from iter_json_lines(stream)
+        else:
+            yield from iter_csv(stream)
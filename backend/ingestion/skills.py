@@ -0,0 +1,86 @@
+"""
+Skill name normalization for ingested postings.
+Feeds spell the same capability many ways ("js", "Javascript", "JavaScript ");
+matching compares skills by exact string, so they are canonicalized on the
+way in.
+"""
+import re
+from typing import Any, Dict, Iterable, List
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SPLIT_RE = re.compile(r"\s*[;|,]\s*")
+
+MAX_SKILL_LENGTH = 100
+
+# Lowercased alias -> canonical name
+SKILL_ALIASES: Dict[str, str] = {
+    "js": "JavaScript",
+    "javascript": "JavaScript",
+    "ts": "TypeScript",
+    "typescript": "TypeScript",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "node.js": "Node.js",
+    "reactjs": "React",
+    "react.js": "React",
+    "react": "React",
+    "py": "Python",
+    "python": "Python",
+    "golang": "Go",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "mysql": "MySQL",
+    "k8s": "Kubernetes",
+    "kubernetes": "Kubernetes",
+    "aws": "AWS",
+    "gcp": "GCP",
+    "ml": "Machine Learning",
+    "machine learning": "Machine Learning",
+    "ai": "AI",
+    "llm": "LLMs",
+    "llms": "LLMs",
+    "ui/ux": "UI/UX Design",
+    "ux/ui": "UI/UX Design",
+    "c sharp": "C#",
+    "csharp": "C#",
+    "c++": "C++",
+    "cpp": "C++",
+    "matlab": "MATLAB",
+    "sql": "SQL",
+}
+
+
+def normalize_skill(raw: Any) -> str:
+    """Canonicalize a single skill name ("" if unusable)."""
+    if raw is None:
+        return ""
+    # Trailing punctuation only: leading dots are part of names like ".NET"
+    skill = _WHITESPACE_RE.sub(" ", str(raw)).strip().rstrip(".,;:")
+    if not skill or len(skill) > MAX_SKILL_LENGTH:
+        return ""
+    return SKILL_ALIASES.get(skill.lower(), skill)
+
+
+def normalize_skills(raw: Any) -> List[str]:
+    """
+    Normalize a skill list, deduplicating case-insensitively.
+    Accepts a list or a delimited string (CSV feeds use ';', '|' or ',').
+    """
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        items: Iterable[Any] = _SPLIT_RE.split(raw)
+    elif isinstance(raw, (list, tuple)):
+        items = raw
+    else:
+        items = [raw]
+
+    seen = set()
+    skills = []
+    for item in items:
+        skill = normalize_skill(item)
+        key = skill.lower()
+        if skill and key not in seen:
+            seen.add(key)
+            skills.append(skill)
+    return skills
@@ -13,6 +13,13 @@ from typing import Optional
 import psycopg2
 import redis
 
+try:
+    from infrastructure.redis_pool import get_redis
+except ImportError:
+    # Installed standalone (jobmatch-cli package) without the backend tree
+    def get_redis(url: str) -> redis.Redis:
+        return redis.Redis.from_url(url, decode_responses=True)
+
 # ASCII art banner
 BANNER = """
 ╔══════════════════════════════════════════════════════════╗
@@ -38,10 +45,9 @@ class JobMatchCLI(cmd.Cmd):
         
         # Connect to database
         self.db = psycopg2.connect(os.getenv("DATABASE_URL"))
-        self.redis = redis.Redis(
-            host=os.getenv("REDIS_HOST", "localhost"),
-            port=int(os.getenv("REDIS_PORT", 6379)),
-            decode_responses=True
+        self.redis = get_redis(
+            os.getenv("REDIS_URL")
+            or f"redis://{os.getenv('REDIS_HOST', 'localhost')}:{int(os.getenv('REDIS_PORT', 6379))}"
         )
         
         # Load user session state
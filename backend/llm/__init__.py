@@ -1,4 +1,4 @@
 """LLM client abstraction layer."""
-from llm.client import LLMClient, get_llm_client
+from llm.client import LLMClient, create_openai_client, get_llm_client
 
-__all__ = ["LLMClient", "get_llm_client"]
+__all__ = ["LLMClient", "create_openai_client", "get_llm_client"]
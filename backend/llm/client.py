@@ -3,13 +3,28 @@ LLM Client Abstraction Layer.
 Supports OpenRouter, OpenAI, and Ollama with unified interface.
 """
 import logging
+import time
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 from config import settings
+from monitoring.metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from monitoring.tracing import get_current_span, get_tracer
 
 logger = logging.getLogger(__name__)
 
 
+def create_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """
+    Create an OpenAI SDK client (None without an API key; defaults to
+    settings.OPENAI_API_KEY). openai takes ~0.6s to import, so it is only
+    imported here, when a client is actually built.
+    """
+    api_key = settings.OPENAI_API_KEY if api_key is None else api_key
+    if not api_key:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 class LLMClient:
     """Unified LLM client supporting multiple providers."""
     
@@ -18,6 +33,24 @@ class LLMClient:
         self.model = settings.LLM_MODEL
         self._client = None
         self._initialize_client()
+        self._bind_metrics()
+    
+    def _bind_metrics(self):
+        """Bind metric children for the provider/model settled on at init."""
+        labels = (self.provider, self.model)
+        self._latency_metric = LLM_REQUEST_SECONDS.labels(*labels)
+        self._error_metric = LLM_ERRORS.labels(*labels)
+        self._prompt_tokens_metric = LLM_TOKENS.labels(*labels, "prompt")
+        self._completion_tokens_metric = LLM_TOKENS.labels(*labels, "completion")
+    
+    def _record_tokens(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        span = get_current_span()
+        if prompt_tokens:
+            self._prompt_tokens_metric.inc(prompt_tokens)
+            span.set_attribute("llm.usage.prompt_tokens", prompt_tokens)
+        if completion_tokens:
+            self._completion_tokens_metric.inc(completion_tokens)
+            span.set_attribute("llm.usage.completion_tokens", completion_tokens)
     
     def _initialize_client(self):
         """Initialize the appropriate LLM client based on provider."""
@@ -29,10 +62,7 @@ class LLMClient:
                     self._initialize_ollama()
                     return
                 
-                self._client = OpenAI(
-                    base_url=settings.LLM_BASE_URL,
-                    api_key=settings.OPENROUTER_API_KEY
-                )
+                self._client = create_openai_client(settings.OPENROUTER_API_KEY, base_url=settings.LLM_BASE_URL)
                 logger.info(f"Initialized OpenRouter client with model: {self.model}")
             
             elif self.provider == "openai":
@@ -42,7 +72,7 @@ class LLMClient:
                     self._initialize_ollama()
                     return
                 
-                self._client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                self._client = create_openai_client(settings.OPENAI_API_KEY)
                 logger.info(f"Initialized OpenAI client with model: {self.model}")
             
             elif self.provider == "ollama":
@@ -87,10 +117,22 @@ class LLMClient:
         Returns:
             Generated text response
         """
-        if self.provider == "ollama":
-            return self._chat_ollama(messages, temperature, **kwargs)
-        else:
-            return self._chat_openai_compatible(messages, temperature, max_tokens, **kwargs)
+        started = time.perf_counter()
+        with get_tracer().span(
+            "llm.chat",
+            kind="client",
+            attributes={"llm.provider": self.provider, "llm.model": self.model, "llm.messages": len(messages)}
+        ):
+            try:
+                if self.provider == "ollama":
+                    return self._chat_ollama(messages, temperature, **kwargs)
+                else:
+                    return self._chat_openai_compatible(messages, temperature, max_tokens, **kwargs)
+            except Exception:
+                self._error_metric.inc()
+                raise
+            finally:
+                self._latency_metric.observe_since(started)
     
     def _chat_openai_compatible(
         self,
@@ -122,6 +164,9 @@ class LLMClient:
             params.update(kwargs)
             
             response = self._client.chat.completions.create(**params)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self._record_tokens(usage.prompt_tokens, usage.completion_tokens)
             return response.choices[0].message.content
         
         except Exception as e:
@@ -144,6 +189,7 @@ class LLMClient:
                     **kwargs
                 }
             )
+            self._record_tokens(response.get("prompt_eval_count"), response.get("eval_count"))
             return response["message"]["content"]
         
         except Exception as e:
@@ -0,0 +1,7 @@
+"""
+Load-test harness.
+Drives scripted user journeys against backend/main.py under uvicorn, with
+in-process stand-ins for the LLM, Stripe, Twilio, SES and Redis, to find
+the concurrency ceiling per worker. Run with `python -m loadtest --help`
+from backend/.
+"""
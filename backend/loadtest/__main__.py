@@ -0,0 +1,327 @@
+"""
+Load-test runner.
+
+    cd backend
+    python -m loadtest --workers 2 --concurrency 1 4 16 64 --duration 30
+
+Starts the provider fakes and the Redis stand-in in a child process, seeds
+a SQLite database with the simulated corpus (or uses --database-url), serves
+loadtest.app under uvicorn with the requested worker count, then runs the
+journey mix at each concurrency stage. Each virtual user holds one
+keep-alive connection, as a browser would, so the in-memory session store
+of the worker that registered it also serves its later requests.
+
+Per stage it reports throughput, latency percentiles and error rate,
+overall and per step, and names the ceiling: the highest-throughput stage
+that stays within --max-error-rate and --slo-p99-ms.
+
+The Redis stand-in does not run Lua, so the app is started with
+AUTH_TOKEN_STORE=memory and AGENT_BUS_BACKEND=memory.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from loadtest.fakes import serve_standins
+from loadtest.journeys import DEFAULT_MIX, JOURNEYS, JourneyContext, StepFailed, StepResult
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ----------------------------------------------------------------------
+# Stand-ins and the app under test
+# ----------------------------------------------------------------------
+
+def seed_database(database_url: Optional[str], scale: int, seed: int, workdir: str) -> Tuple[str, List[str]]:
+    """Load the matching corpus; returns the database URL and the seeded user ids."""
+    from sqlalchemy import create_engine, text
+    from testing.matching_benchmark import seed_matching_database
+    
+    database_url = database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.sqlite3')}"
+    engine = create_engine(database_url)
+    try:
+        if engine.dialect.name == "sqlite":
+            # Let the workers read while another one writes
+            with engine.connect() as connection:
+                connection.execute(text("PRAGMA journal_mode=WAL"))
+        profiles = seed_matching_database(engine, scale, seed)
+    finally:
+        engine.dispose()
+    return database_url, [profile["user_id"] for profile in profiles]
+
+
+def _app_environment(args, database_url: str, fakes_url: str, redis_port: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "ENVIRONMENT": "development",
+        "DATABASE_URL": database_url,
+        "REDIS_URL": f"redis://127.0.0.1:{redis_port}/0",
+        "AUTH_TOKEN_STORE": "memory",
+        "AGENT_BUS_BACKEND": "memory",
+        "SNAPSHOT_ENABLED": "false",  # Never write snapshots of the throwaway database where a dev server restores them
+        "LLM_PROVIDER": "openrouter",
+        "OPENROUTER_API_KEY": "sk-or-loadtest",
+        "LLM_BASE_URL": f"{fakes_url}/v1",
+        "STRIPE_SECRET_KEY": "sk_test_loadtest",
+        "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+        "TWILIO_AUTH_TOKEN": "loadtest",
+        "TWILIO_PHONE_NUMBER": "+15005550006",
+        "AWS_ACCESS_KEY_ID": "loadtest",
+        "AWS_SECRET_ACCESS_KEY": "loadtest",
+        "AWS_ENDPOINT_URL_SES": f"{fakes_url}/ses/",
+        "TRACING_EXPORTER": env.get("TRACING_EXPORTER", "none"),
+        "LOADTEST_FAKES_URL": fakes_url,
+        "LOADTEST_CAPABILITY_SCALE": str(args.capability_scale),
+        "LOADTEST_SEED": str(args.seed),
+        "PYTHONPATH": os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")])),
+    })
+    if args.keep_rate_limit:
+        env["LOADTEST_KEEP_RATE_LIMIT"] = "1"
+    return env
+
+
+def _wait_until_up(url: str, timeout: float, process: Optional[subprocess.Popen] = None) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode} before becoming ready")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+# ----------------------------------------------------------------------
+# Load generation
+# ----------------------------------------------------------------------
+
+async def _virtual_user(index: int, base_url: str, journeys: List[str], user_ids: List[str],
+                        results: List[StepResult], stop_at: float, seed: int) -> None:
+    rng = random.Random(seed * 100003 + index)
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        while time.monotonic() < stop_at:
+            name = rng.choice(journeys)
+            ctx = JourneyContext(client=client, journey=name, rng=rng, results=results, user_ids=user_ids)
+            try:
+                await JOURNEYS[name](ctx)
+            except StepFailed:
+                pass
+
+
+async def run_stage(base_url: str, concurrency: int, duration: float, mix: Dict[str, int],
+                    user_ids: List[str], seed: int) -> List[StepResult]:
+    journeys = [name for name, weight in mix.items() for _ in range(weight)]
+    results: List[StepResult] = []
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(*(
+        _virtual_user(index, base_url, journeys, user_ids, results, stop_at, seed)
+        for index in range(concurrency)
+    ))
+    return results
+
+
+def summarize(results: List[StepResult], wall_seconds: float) -> Dict[str, Any]:
+    latencies = sorted(result.seconds for result in results)
+    count = len(latencies)
+    errors = sum(1 for result in results if not result.ok)
+    
+    def percentile(fraction: float) -> Optional[float]:
+        return round(latencies[min(count - 1, int(fraction * count))] * 1000, 1) if latencies else None
+    
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "rps": round(count / wall_seconds, 2) if wall_seconds > 0 else None,
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+    }
+
+
+def report_stage(concurrency: int, results: List[StepResult], wall_seconds: float) -> Dict[str, Any]:
+    by_step = defaultdict(list)
+    for result in results:
+        by_step[result.step].append(result)
+    status_codes = defaultdict(int)
+    sample_errors = {}
+    for result in results:
+        status_codes[str(result.status)] += 1
+        if not result.ok and result.step not in sample_errors:
+            sample_errors[result.step] = f"{result.status}: {result.error}"
+    return {
+        "concurrency": concurrency,
+        **summarize(results, wall_seconds),
+        "status_codes": dict(status_codes),
+        "steps": {step: summarize(step_results, wall_seconds) for step, step_results in sorted(by_step.items())},
+        "sample_errors": sample_errors,
+    }
+
+
+def find_ceiling(stages: List[Dict[str, Any]], max_error_rate: float, slo_p99_ms: float) -> Optional[Dict[str, Any]]:
+    healthy = [
+        stage for stage in stages
+        if stage["requests"] and stage["error_rate"] <= max_error_rate and (stage["p99_ms"] or 0) <= slo_p99_ms
+    ]
+    return max(healthy, key=lambda stage: stage["rps"]) if healthy else None
+
+
+def print_stage(stage: Dict[str, Any]) -> None:
+    print(
+        f"\nconcurrency {stage['concurrency']:>4}: {stage['requests']} requests, {stage['rps']} req/s, "
+        f"p50 {stage['p50_ms']}ms, p90 {stage['p90_ms']}ms, p99 {stage['p99_ms']}ms, "
+        f"errors {stage['error_rate']:.2%}"
+    )
+    print(f"  {'step':<26} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for step, summary in stage["steps"].items():
+        print(
+            f"  {step:<26} {summary['requests']:>9} {summary['rps']:>8} {summary['p50_ms']:>9} "
+            f"{summary['p90_ms']:>9} {summary['p99_ms']:>9} {summary['error_rate']:>8.2%}"
+        )
+    for step, error in stage["sample_errors"].items():
+        print(f"  ! {step}: {error}")
+
+
+def _parse_mix(values: Optional[List[str]]) -> Dict[str, int]:
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"unknown journey {name!r} (choose from {', '.join(JOURNEYS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="virtual users per stage")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of single-user load before the first stage")
+    parser.add_argument("--mix", nargs="+", metavar="JOURNEY=WEIGHT", help=f"journey weights (default {DEFAULT_MIX})")
+    parser.add_argument("--scale", type=int, default=1, help="matching corpus multiplier for the seeded database")
+    parser.add_argument("--capability-scale", type=int, default=1, help="zk capability index multiplier (0 = empty)")
+    parser.add_argument("--database-url", help="use this database instead of a temporary SQLite file (it is reseeded)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="fake LLM time to first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0, help="fake LLM generation rate (0 = instant)")
+    parser.add_argument("--provider-latency-ms", type=float, default=50.0, help="fake Stripe/Twilio/SES latency")
+    parser.add_argument("--keep-rate-limit", action="store_true", help="keep the per-IP rate limiter in the app")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="highest error rate a stage may have to count")
+    parser.add_argument("--slo-p99-ms", type=float, default=2000.0, help="highest p99 a stage may have to count")
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args(argv)
+    mix = _parse_mix(args.mix)
+    
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    fakes_port, redis_port, app_port = _free_port(), _free_port(), _free_port()
+    fakes_url = f"http://127.0.0.1:{fakes_port}"
+    base_url = f"http://127.0.0.1:{app_port}"
+    standins = multiprocessing.get_context("spawn").Process(
+        target=serve_standins,
+        args=(fakes_port, redis_port, {
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "provider_latency_ms": args.provider_latency_ms,
+        }),
+        daemon=True,
+    )
+    server = None
+    try:
+        standins.start()
+        _wait_until_up(f"{fakes_url}/_stats", 30)
+        print(f"Seeding the matching corpus (scale {args.scale})...")
+        database_url, user_ids = seed_database(args.database_url, args.scale, args.seed, workdir)
+        
+        print(f"Starting the app with {args.workers} worker(s) on {base_url}...")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "loadtest.app:app", "--host", "127.0.0.1", "--port", str(app_port),
+             "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR,
+            env=_app_environment(args, database_url, fakes_url, redis_port),
+        )
+        _wait_until_up(f"{base_url}/health", 120, server)
+        
+        if args.warmup > 0:
+            asyncio.run(run_stage(base_url, 1, args.warmup, mix, user_ids, args.seed))
+        
+        stages = []
+        for concurrency in args.concurrency:
+            started = time.monotonic()
+            results = asyncio.run(run_stage(base_url, concurrency, args.duration, mix, user_ids, args.seed))
+            stage = report_stage(concurrency, results, time.monotonic() - started)
+            stages.append(stage)
+            print_stage(stage)
+        
+        ceiling = find_ceiling(stages, args.max_error_rate, args.slo_p99_ms)
+        provider_calls = httpx.get(f"{fakes_url}/_stats").json()
+        print()
+        if ceiling:
+            print(
+                f"Ceiling: {ceiling['rps']} req/s at concurrency {ceiling['concurrency']} with {args.workers} worker(s) "
+                f"({ceiling['rps'] / args.workers:.1f} req/s per worker, p99 {ceiling['p99_ms']}ms)"
+            )
+        else:
+            print(f"No stage met p99 <= {args.slo_p99_ms:g}ms with error rate <= {args.max_error_rate:.1%}")
+        print(f"Provider calls: {provider_calls}")
+        
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump({
+                    "workers": args.workers,
+                    "duration_seconds": args.duration,
+                    "mix": mix,
+                    "scale": args.scale,
+                    "capability_scale": args.capability_scale,
+                    "fakes": {
+                        "llm_latency_ms": args.llm_latency_ms,
+                        "llm_tokens_per_second": args.llm_tokens_per_second,
+                        "provider_latency_ms": args.provider_latency_ms,
+                    },
+                    "slo": {"max_error_rate": args.max_error_rate, "p99_ms": args.slo_p99_ms},
+                    "stages": stages,
+                    "ceiling": ceiling,
+                    "provider_calls": provider_calls,
+                }, f, indent=2)
+            print(f"Wrote {args.output}")
+        return 0
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        standins.terminate()
+        standins.join(timeout=5)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
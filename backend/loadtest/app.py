@@ -0,0 +1,69 @@
+"""
+The application under load.
+
+This is main.app as deployed, plus the routers the load journeys drive
+that main.py does not mount yet (chat, matching). Provider SDKs that
+cannot be pointed elsewhere through the environment are redirected to
+the fakes here: Stripe via stripe.api_base, Twilio by rewriting request
+URLs. The per-IP rate limiter is removed unless LOADTEST_KEEP_RATE_LIMIT
+is set, since all load comes from one address.
+
+Served by the runner as `uvicorn loadtest.app:app`; LOADTEST_FAKES_URL
+must point at the provider fakes.
+"""
+import logging
+import os
+
+from main import app
+from api import chat, matching
+from api.zero_knowledge_auth import CAPABILITIES_DB
+from security.rate_limiter import RateLimiterMiddleware
+
+logger = logging.getLogger(__name__)
+
+FAKES_URL = os.environ["LOADTEST_FAKES_URL"].rstrip("/")
+
+
+def _redirect_providers():
+    import stripe
+    from twilio.http.http_client import TwilioHttpClient
+    
+    stripe.api_base = f"{FAKES_URL}/stripe"
+    
+    send = TwilioHttpClient.request
+    
+    def request(self, method, url, *args, **kwargs):
+        url = url.replace("https://api.twilio.com", f"{FAKES_URL}/twilio")
+        return send(self, method, url, *args, **kwargs)
+    
+    TwilioHttpClient.request = request
+
+
+def _mount_routers():
+    mounted = {route.path for route in app.routes}
+    for module in (chat, matching):
+        if not any(route.path in mounted for route in module.router.routes):
+            app.include_router(module.router)
+
+
+def _remove_rate_limit():
+    if os.getenv("LOADTEST_KEEP_RATE_LIMIT"):
+        return
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not RateLimiterMiddleware]
+    app.middleware_stack = None
+
+
+def _preload_capabilities():
+    """Give /api/zk-match/find a realistically sized index to scan."""
+    scale = int(os.getenv("LOADTEST_CAPABILITY_SCALE", "1"))
+    if scale <= 0:
+        return
+    from testing.matching_benchmark import capability_records
+    CAPABILITIES_DB.update(capability_records(scale, seed=int(os.getenv("LOADTEST_SEED", "1"))))
+    logger.info(f"Preloaded {len(CAPABILITIES_DB)} capability records")
+
+
+_redirect_providers()
+_mount_routers()
+_remove_rate_limit()
+_preload_capabilities()
@@ -0,0 +1,154 @@
+"""
+Fake provider endpoints for load testing.
+
+One ASGI app that stands in for:
+- an OpenAI-compatible LLM (/v1/chat/completions), with latency of
+  llm_latency_ms plus completion_tokens / llm_tokens_per_second;
+- Stripe's REST API (/stripe/v1/...);
+- Twilio's REST API (/twilio/2010-04-01/...);
+- Amazon SES's query API (/ses/).
+
+Call counts per provider are served at /_stats. serve_standins() runs
+this app and the Redis stand-in in one process for the load-test runner.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+SES_NAMESPACE = "http://ses.amazonaws.com/doc/2010-12-01/"
+
+
+def create_fake_providers_app(
+    llm_latency_ms: float = 300,
+    llm_tokens_per_second: float = 50,
+    llm_completion_tokens: int = 120,
+    provider_latency_ms: float = 50
+) -> FastAPI:
+    """Build the fake provider app with the given latency profile."""
+    app = FastAPI(title="Load test provider fakes")
+    calls: Counter = Counter()
+    ids = itertools.count(1)
+    
+    async def provider_delay():
+        if provider_latency_ms:
+            await asyncio.sleep(provider_latency_ms / 1000)
+    
+    @app.get("/_stats")
+    async def stats():
+        return dict(calls)
+    
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        calls["llm"] += 1
+        completion_tokens = min(llm_completion_tokens, body.get("max_tokens") or llm_completion_tokens)
+        delay = llm_latency_ms / 1000
+        if llm_tokens_per_second:
+            delay += completion_tokens / llm_tokens_per_second
+        await asyncio.sleep(delay)
+        
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", [])) * 4 // 3
+        content = " ".join(["token"] * completion_tokens)
+        return {
+            "id": f"chatcmpl-fake{next(ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    
+    @app.api_route("/stripe/v1/{path:path}", methods=["GET", "POST", "DELETE"])
+    async def stripe_api(path: str, request: Request):
+        calls["stripe"] += 1
+        await provider_delay()
+        segments = [segment for segment in path.split("/") if segment]
+        resource = segments[0].rstrip("s") if segments else "object"
+        # Retrieve/update/cancel calls carry the object id (cus_..., sub_...) in the path
+        has_id = len(segments) > 1 and "_" in segments[1]
+        if request.method == "GET" and not has_id:
+            return {"object": "list", "data": [], "has_more": False, "url": f"/v1/{path}"}
+        
+        form = dict(await request.form()) if request.method == "POST" else {}
+        object_id = segments[1] if has_id else f"{resource[:4]}_fake{next(ids)}"
+        return {
+            "id": object_id,
+            "object": resource,
+            "livemode": False,
+            "status": "active",
+            "url": f"https://checkout.stripe.test/{object_id}",
+            "created": int(time.time()),
+            "metadata": {},
+            **{key: value for key, value in form.items() if "[" not in key},
+        }
+    
+    @app.api_route("/twilio/2010-04-01/Accounts/{account_sid}/{resource}.json", methods=["GET", "POST"])
+    async def twilio_api(account_sid: str, resource: str):
+        calls["twilio"] += 1
+        await provider_delay()
+        prefix = {"Messages": "SM", "Calls": "CA"}.get(resource, "XX")
+        return JSONResponse({
+            "sid": f"{prefix}{next(ids):032d}",
+            "account_sid": account_sid,
+            "status": "queued",
+            "date_created": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime()),
+        }, status_code=201)
+    
+    @app.post("/ses/")
+    @app.post("/ses")
+    async def ses_api(request: Request):
+        form = await request.form()
+        action = form.get("Action", "")
+        calls["ses"] += 1
+        await provider_delay()
+        if action == "GetSendQuota":
+            result = "<Max24HourSend>50000.0</Max24HourSend><MaxSendRate>14.0</MaxSendRate><SentLast24Hours>0.0</SentLast24Hours>"
+        elif action == "SendBulkTemplatedEmail":
+            count = sum(1 for key in form.keys() if key.endswith(".Destination.ToAddresses.member.1"))
+            members = "".join(
+                f"<member><Status>Success</Status><MessageId>fake-{next(ids)}</MessageId></member>"
+                for _ in range(max(count, 1))
+            )
+            result = f"<Status>{members}</Status>"
+        else:
+            result = f"<MessageId>fake-{next(ids)}</MessageId>"
+        body = (
+            f'<{action}Response xmlns="{SES_NAMESPACE}"><{action}Result>{result}</{action}Result>'
+            f"<ResponseMetadata><RequestId>fake-{next(ids)}</RequestId></ResponseMetadata></{action}Response>"
+        )
+        return Response(body, media_type="text/xml")
+    
+    return app
+
+
+def serve_standins(fakes_port: int, redis_port: int, fake_options: Dict[str, Any]) -> None:
+    """Serve the provider fakes over HTTP and the Redis stand-in on one event loop (blocks)."""
+    import uvicorn
+    from loadtest.redis_standin import RedisStandIn
+    
+    async def serve():
+        redis = RedisStandIn()
+        await redis.start(port=redis_port)
+        config = uvicorn.Config(
+            create_fake_providers_app(**fake_options),
+            host="127.0.0.1",
+            port=fakes_port,
+            log_level="warning",
+            access_log=False,
+        )
+        await uvicorn.Server(config).serve()
+    
+    asyncio.run(serve())
@@ -0,0 +1,131 @@
+"""
+Scripted user journeys for the load test.
+
+A journey is a coroutine taking a JourneyContext; each step goes through
+ctx.step(name, method, path, ...) so its latency and outcome are recorded
+under that name. A step that fails ends the journey.
+"""
+import itertools
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+SKILLS = [
+    "python", "javascript", "typescript", "react", "fastapi", "django", "sql",
+    "postgresql", "aws", "docker", "kubernetes", "machine learning", "go", "rust",
+]
+EXPERIENCE_LEVELS = ["junior", "mid", "senior", "staff"]
+AVAILABILITY = ["full-time", "part-time", "contract"]
+CHAT_PROMPTS = [
+    "What kinds of roles fit someone with my skills?",
+    "How should I describe my experience with distributed systems?",
+    "Which of my skills are most in demand right now?",
+]
+
+_sequence = itertools.count()
+
+
+@dataclass
+class StepResult:
+    journey: str
+    step: str
+    started: float
+    seconds: float
+    status: Optional[int]
+    ok: bool
+    error: Optional[str] = None
+
+
+class StepFailed(Exception):
+    pass
+
+
+@dataclass
+class JourneyContext:
+    client: httpx.AsyncClient
+    journey: str
+    rng: random.Random
+    results: List[StepResult]
+    user_ids: List[str]
+    state: Dict[str, Any] = field(default_factory=dict)
+    
+    async def step(self, name: str, method: str, path: str, expect: int = 200, **kwargs) -> httpx.Response:
+        started = time.time()
+        before = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.results.append(StepResult(self.journey, name, started, time.perf_counter() - before, None, False, type(e).__name__))
+            raise StepFailed(name) from e
+        elapsed = time.perf_counter() - before
+        ok = response.status_code == expect
+        error = None if ok else response.text[:200]
+        self.results.append(StepResult(self.journey, name, started, elapsed, response.status_code, ok, error))
+        if not ok:
+            raise StepFailed(name)
+        return response
+
+
+def _capabilities(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(2, 5)),
+        "experience_years": rng.randint(0, 20),
+        "availability": rng.choice(AVAILABILITY),
+        "rate_range": rng.choice(EXPERIENCE_LEVELS),
+        "currently_available": True,
+    }
+
+
+async def candidate(ctx: JourneyContext) -> None:
+    """Register zero-knowledge, search for matches, ask the assistant."""
+    email = f"loadtest-{uuid.uuid4().hex[:12]}-{next(_sequence)}@example.com"
+    capabilities = _capabilities(ctx.rng)
+    registered = await ctx.step("zk_register", "POST", "/api/zk-auth/register", json={
+        "email": email,
+        "auth_hash": uuid.uuid4().hex + uuid.uuid4().hex,
+        "encrypted_profile": "ENCRYPTED:" + uuid.uuid4().hex * 8,
+        "capabilities": capabilities,
+    })
+    token = registered.json()["session_token"]
+    
+    await ctx.step("zk_find_matches", "POST", "/api/zk-match/find", json={
+        "seeking_skills": ctx.rng.sample(SKILLS, 3),
+        "experience_level": ctx.rng.choice(EXPERIENCE_LEVELS),
+        "max_results": 20,
+    })
+    await ctx.step("zk_my_matches", "GET", "/api/zk-match/my-matches", headers={"Authorization": f"Bearer {token}"})
+    await ctx.step("chat", "POST", "/api/chat/", json={
+        "messages": [
+            {"role": "system", "content": "You are a helpful job matching assistant."},
+            {"role": "user", "content": ctx.rng.choice(CHAT_PROMPTS)},
+        ],
+        "max_tokens": 300,
+    })
+
+
+async def matching(ctx: JourneyContext) -> None:
+    """Generate database-backed matches for a seeded candidate."""
+    user_id = ctx.rng.choice(ctx.user_ids)
+    await ctx.step("generate_matches", "POST", f"/api/matching/generate/{user_id}", params={"limit": 10})
+
+
+async def subscriber(ctx: JourneyContext) -> None:
+    """Start a Stripe checkout."""
+    await ctx.step("create_checkout_session", "POST", "/api/subscription/create-checkout-session", json={
+        "email": f"subscriber-{next(_sequence)}@example.com",
+        "anonymous_id": uuid.uuid4().hex,
+    })
+
+
+JOURNEYS: Dict[str, Callable[[JourneyContext], Awaitable[None]]] = {
+    "candidate": candidate,
+    "matching": matching,
+    "subscriber": subscriber,
+}
+
+# Share of virtual users running each journey
+DEFAULT_MIX = {"candidate": 6, "matching": 3, "subscriber": 1}
@@ -0,0 +1,447 @@
+"""
+Redis stand-in for load testing.
+
+A small asyncio server speaking RESP2 with the subset of commands the
+backend issues (strings, hashes, lists, expiry, pub/sub, streams,
+MULTI/EXEC pipelines). Data lives in process memory and persistence,
+eviction, clustering and Lua are not supported: EVAL/EVALSHA answer with
+an error, so components that rely on scripts should be configured to use
+their in-memory backends (the load test does this).
+"""
+import asyncio
+import fnmatch
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    pass
+
+
+class _Simple(str):
+    """A +simple string reply."""
+
+
+OK = _Simple("OK")
+QUEUED = _Simple("QUEUED")
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, _Simple):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, RespError):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, (list, tuple)):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    if isinstance(value, float):
+        value = repr(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n" % len(value) + value + b"\r\n"
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command (redis-cli, telnet)
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header[1:])
+        data = await reader.readexactly(length + 2)
+        args.append(data[:-2])
+    return args
+
+
+class RedisStandIn:
+    """In-memory RESP2 server; start() binds, stop() closes."""
+    
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = defaultdict(set)
+        self.commands_served = 0
+        self._changed = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stream_seq = 0
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    # ------------------------------------------------------------------
+    # Connection handling
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queued: Optional[List[List[bytes]]] = None
+        try:
+            while True:
+                args = await read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                name = args[0].upper().decode()
+                self.commands_served += 1
+                
+                if name == "MULTI":
+                    queued = []
+                    reply: Any = OK
+                elif name == "EXEC":
+                    if queued is None:
+                        reply = RespError("ERR EXEC without MULTI")
+                    else:
+                        reply = [await self._call(command) for command in queued]
+                        queued = None
+                elif name == "DISCARD":
+                    queued = None
+                    reply = OK
+                elif queued is not None:
+                    queued.append(args)
+                    reply = QUEUED
+                elif name in ("SUBSCRIBE", "PSUBSCRIBE"):
+                    for index, channel in enumerate(args[1:], 1):
+                        self.channels[channel].add(writer)
+                        writer.write(encode([name.lower(), channel, index]))
+                    await writer.drain()
+                    continue
+                else:
+                    reply = await self._call(args)
+                writer.write(encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for subscribers in self.channels.values():
+                subscribers.discard(writer)
+            writer.close()
+    
+    async def _call(self, args: List[bytes]) -> Any:
+        handler = getattr(self, f"cmd_{args[0].decode().lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{args[0].decode()}' (not supported by the Redis stand-in)")
+        try:
+            result = handler(*args[1:])
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        except RespError as e:
+            return e
+        except (TypeError, ValueError, IndexError):
+            return RespError(f"ERR wrong arguments for '{args[0].decode()}'")
+    
+    # ------------------------------------------------------------------
+    # Keyspace
+    
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+    
+    def _get(self, key: bytes, kind: type, default: Any = None) -> Any:
+        if not self._alive(key):
+            return default
+        value = self.data[key]
+        if not isinstance(value, kind):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+    
+    def _container(self, key: bytes, kind: type) -> Any:
+        value = self._get(key, kind)
+        if value is None:
+            value = self.data[key] = kind()
+        return value
+    
+    def _touch(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def cmd_ping(self, message: bytes = None):
+        return message if message is not None else _Simple("PONG")
+    
+    def cmd_echo(self, message: bytes):
+        return message
+    
+    def cmd_select(self, index: bytes):
+        return OK
+    
+    def cmd_client(self, *args: bytes):
+        return OK
+    
+    def cmd_info(self, *args: bytes):
+        return f"# Server\r\nredis_version:7.0.0-standin\r\nconnected_clients:1\r\nused_memory:{len(self.data)}\r\n"
+    
+    def cmd_hello(self, *args: bytes):
+        raise RespError("NOPROTO the Redis stand-in only speaks RESP2")
+    
+    def cmd_flushall(self, *args: bytes):
+        self.data.clear()
+        self.expires.clear()
+        return OK
+    
+    cmd_flushdb = cmd_flushall
+    
+    def cmd_dbsize(self):
+        return sum(1 for key in list(self.data) if self._alive(key))
+    
+    def cmd_keys(self, pattern: bytes):
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key.decode(), pattern.decode())]
+    
+    def cmd_exists(self, *keys: bytes):
+        return sum(1 for key in keys if self._alive(key))
+    
+    def cmd_del(self, *keys: bytes):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+    
+    cmd_unlink = cmd_del
+    
+    def cmd_expire(self, key: bytes, seconds: bytes, *flags: bytes):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + int(seconds)
+        return 1
+    
+    def cmd_pexpire(self, key: bytes, milliseconds: bytes, *flags: bytes):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + int(milliseconds) / 1000
+        return 1
+    
+    def cmd_ttl(self, key: bytes):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, int(round(deadline - time.time())))
+    
+    def cmd_pttl(self, key: bytes):
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else max(0, int((deadline - time.time()) * 1000))
+    
+    # ------------------------------------------------------------------
+    # Strings
+    
+    def cmd_get(self, key: bytes):
+        return self._get(key, bytes)
+    
+    def cmd_mget(self, *keys: bytes):
+        return [self.data[key] if self._alive(key) and isinstance(self.data[key], bytes) else None for key in keys]
+    
+    def cmd_set(self, key: bytes, value: bytes, *options: bytes):
+        options = [option.upper() for option in options]
+        exists = self._alive(key)
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        previous = self.data.get(key) if b"GET" in options else None
+        self.data[key] = value
+        if b"KEEPTTL" not in options:
+            self.expires.pop(key, None)
+        for flag, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+            if flag in options:
+                self.expires[key] = time.time() + int(options[options.index(flag) + 1]) * scale
+        return previous if b"GET" in options else OK
+    
+    def cmd_setex(self, key: bytes, seconds: bytes, value: bytes):
+        return self.cmd_set(key, value, b"EX", seconds)
+    
+    def cmd_getdel(self, key: bytes):
+        value = self._get(key, bytes)
+        self.cmd_del(key)
+        return value
+    
+    def cmd_incrby(self, key: bytes, amount: bytes):
+        value = int(self._get(key, bytes, b"0")) + int(amount)
+        self.data[key] = str(value).encode()
+        return value
+    
+    def cmd_incr(self, key: bytes):
+        return self.cmd_incrby(key, b"1")
+    
+    def cmd_decr(self, key: bytes):
+        return self.cmd_incrby(key, b"-1")
+    
+    # ------------------------------------------------------------------
+    # Hashes
+    
+    def cmd_hset(self, key: bytes, *pairs: bytes):
+        mapping = self._container(key, dict)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in mapping
+            mapping[field] = value
+        return added
+    
+    def cmd_hmset(self, key: bytes, *pairs: bytes):
+        self.cmd_hset(key, *pairs)
+        return OK
+    
+    def cmd_hget(self, key: bytes, field: bytes):
+        return self._get(key, dict, {}).get(field)
+    
+    def cmd_hgetall(self, key: bytes):
+        return [item for pair in self._get(key, dict, {}).items() for item in pair]
+    
+    def cmd_hdel(self, key: bytes, *fields: bytes):
+        mapping = self._get(key, dict, {})
+        return sum(1 for field in fields if mapping.pop(field, None) is not None)
+    
+    def cmd_hincrby(self, key: bytes, field: bytes, amount: bytes):
+        mapping = self._container(key, dict)
+        value = int(mapping.get(field, b"0")) + int(amount)
+        mapping[field] = str(value).encode()
+        return value
+    
+    # ------------------------------------------------------------------
+    # Lists
+    
+    def cmd_lpush(self, key: bytes, *values: bytes):
+        items = self._container(key, deque)
+        items.extendleft(values)
+        self._touch()
+        return len(items)
+    
+    def cmd_rpush(self, key: bytes, *values: bytes):
+        items = self._container(key, deque)
+        items.extend(values)
+        self._touch()
+        return len(items)
+    
+    def cmd_llen(self, key: bytes):
+        return len(self._get(key, deque, ()))
+    
+    def cmd_lrange(self, key: bytes, start: bytes, stop: bytes):
+        items = list(self._get(key, deque, ()))
+        stop = int(stop)
+        return items[int(start):(None if stop == -1 else stop + 1)]
+    
+    async def cmd_blpop(self, *args: bytes):
+        keys, deadline = args[:-1], time.time() + float(args[-1]) if float(args[-1]) else None
+        while True:
+            for key in keys:
+                items = self._get(key, deque)
+                if items:
+                    return [key, items.popleft()]
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+    
+    # ------------------------------------------------------------------
+    # Pub/sub
+    
+    def cmd_publish(self, channel: bytes, message: bytes):
+        subscribers = list(self.channels.get(channel, ()))
+        for writer in subscribers:
+            writer.write(encode([b"message", channel, message]))
+        return len(subscribers)
+    
+    # ------------------------------------------------------------------
+    # Streams (XADD/XREAD, enough for the agent bus)
+    
+    def _next_stream_id(self, entries: List[Tuple[bytes, List[bytes]]]) -> bytes:
+        now = int(time.time() * 1000)
+        last_ms, last_seq = (int(part) for part in entries[-1][0].split(b"-")) if entries else (0, 0)
+        if now <= last_ms:
+            return f"{last_ms}-{last_seq + 1}".encode()
+        return f"{now}-0".encode()
+    
+    def cmd_xadd(self, key: bytes, *args: bytes):
+        entries = self._container(key, list)
+        args = list(args)
+        maxlen = None
+        if args and args[0].upper() == b"MAXLEN":
+            args.pop(0)
+            if args[0] in (b"~", b"="):
+                args.pop(0)
+            maxlen = int(args.pop(0))
+        entry_id = args.pop(0)
+        if entry_id == b"*":
+            entry_id = self._next_stream_id(entries)
+        entries.append((entry_id, args))
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[:len(entries) - maxlen]
+        self._touch()
+        return entry_id
+    
+    def _entries_after(self, key: bytes, last_id: bytes, count: Optional[int]) -> List[Any]:
+        entries = self._get(key, list, [])
+        if last_id == b"$":
+            return []
+        
+        def as_tuple(entry_id: bytes) -> Tuple[int, int]:
+            ms, _, seq = entry_id.partition(b"-")
+            return int(ms), int(seq or 0)
+        
+        after = as_tuple(last_id)
+        found = [[entry_id, fields] for entry_id, fields in entries if as_tuple(entry_id) > after]
+        return found[:count] if count else found
+    
+    async def cmd_xread(self, *args: bytes):
+        args = list(args)
+        count = block = None
+        while args and args[0].upper() in (b"COUNT", b"BLOCK"):
+            option = args.pop(0).upper()
+            value = int(args.pop(0))
+            if option == b"COUNT":
+                count = value
+            else:
+                block = value
+        if args.pop(0).upper() != b"STREAMS":
+            raise RespError("ERR syntax error")
+        keys, ids = args[:len(args) // 2], args[len(args) // 2:]
+        # "$" means "entries newer than now"
+        ids = [self._get(key, list, [])[-1][0] if last_id == b"$" and self._get(key, list, []) else (b"0-0" if last_id == b"$" else last_id) for key, last_id in zip(keys, ids)]
+        deadline = time.time() + block / 1000 if block else None
+        while True:
+            result = []
+            for key, last_id in zip(keys, ids):
+                entries = self._entries_after(key, last_id, count)
+                if entries:
+                    result.append([key, entries])
+            if result or block is None:
+                return result or None
+            remaining = None if block == 0 else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+    
+    # ------------------------------------------------------------------
+    # Scripting is not supported
+    
+    def cmd_script(self, *args: bytes):
+        raise RespError("ERR scripting is not supported by the Redis stand-in")
+    
+    cmd_eval = cmd_evalsha = cmd_script
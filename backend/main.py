@@ -1,19 +1,23 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from config import settings
 # Temporarily slim imports to avoid cascading import failures
-from api import voice, subscription, age_verification, zero_knowledge_auth, zero_knowledge_matching, google_oauth, social_auth
+from api import voice, subscription, age_verification, zero_knowledge_auth, zero_knowledge_matching, google_oauth, social_auth, profiling
 try:
     from api import agent_ui
 except ImportError:
     agent_ui = None  # Agent UI module optional
 from security.security_headers import SecurityHeadersMiddleware
 from security.rate_limiter import RateLimiterMiddleware
+from monitoring.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, render_metrics
+from monitoring.tracing import TracingMiddleware, instrument_agents, shutdown_tracing
 
 # Read version
 try:
@@ -52,6 +56,15 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Request metrics (times everything inside it)
+app.add_middleware(MetricsMiddleware)
+# Name the route in loop blocking reports (debug mode only)
+if settings.LOOP_BLOCKING_DEBUG:
+    from monitoring.loop_blocking import BlockingAttributionMiddleware
+    app.add_middleware(BlockingAttributionMiddleware)
+# Request tracing (outermost, so the server span covers the whole stack)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 # Minimal routers to bring up critical endpoints
 app.include_router(voice.router)  # Twilio voice integration
@@ -61,6 +74,7 @@ app.include_router(zero_knowledge_auth.router)  # Zero-knowledge authentication
 app.include_router(zero_knowledge_matching.router)  # Zero-knowledge matching
 app.include_router(google_oauth.router)  # Google OAuth
 app.include_router(social_auth.router)  # Social authentication (email, SMS, etc.)
+app.include_router(profiling.router)  # Admin CPU profiling and event loop inspection
 
 # Agent UI API (if available)
 if agent_ui:
@@ -71,6 +85,166 @@ if agent_ui:
 #     app.include_router(gcp_cli.router)
 
 
+@app.on_event("startup")
+async def start_agent_bus():
+    """Replicate the cluster's agent registry and state into this worker."""
+    if agent_ui:
+        from infrastructure.agent_bus import get_agent_bus
+        # Creating the bus pings Redis synchronously; keep that off the loop
+        bus = await asyncio.to_thread(get_agent_bus)
+        await bus.start()
+
+
+@app.on_event("shutdown")
+async def stop_agent_bus():
+    """Stop agent bus replication."""
+    if agent_ui:
+        from infrastructure.agent_bus import get_agent_bus
+        await get_agent_bus().stop()
+
+
+@app.on_event("startup")
+async def start_tracing():
+    """Trace agent phases alongside the HTTP, database, Redis and LLM spans."""
+    instrument_agents()
+
+
+@app.on_event("shutdown")
+async def stop_tracing():
+    """Flush spans still waiting for export."""
+    shutdown_tracing()
+
+
+@app.on_event("startup")
+async def start_profiling():
+    """Watch for event loop stalls and, if configured, keep a rolling CPU profile."""
+    from monitoring.profiler import get_continuous_profiler, get_loop_lag_monitor
+    if settings.LOOP_LAG_THRESHOLD_MS > 0:
+        get_loop_lag_monitor().start()
+    if settings.PROFILER_CONTINUOUS_HZ > 0:
+        get_continuous_profiler().start()
+    if settings.LOOP_BLOCKING_DEBUG:
+        from monitoring.loop_blocking import enable_loop_blocking_debug
+        enable_loop_blocking_debug()
+
+
+@app.on_event("shutdown")
+async def stop_profiling():
+    from monitoring.profiler import get_continuous_profiler, get_loop_lag_monitor
+    await get_loop_lag_monitor().stop()
+    get_continuous_profiler().stop()
+
+
+@app.on_event("startup")
+async def start_notification_dispatcher():
+    """Start the outbox worker so queued emails (including any left from a previous run) go out."""
+    from notifications.dispatcher import get_notification_dispatcher
+    get_notification_dispatcher().start()
+
+
+@app.on_event("shutdown")
+async def stop_notification_dispatcher():
+    """Stop the outbox worker; unsent messages stay in the outbox."""
+    from notifications.dispatcher import get_notification_dispatcher
+    await get_notification_dispatcher().stop()
+
+
+@app.on_event("startup")
+async def resume_moderation():
+    """Re-queue forum posts a previous run left pending AI moderation."""
+    from ai.moderation_pipeline import get_moderation_pipeline
+    await get_moderation_pipeline().resume_pending()
+
+
+@app.on_event("shutdown")
+async def stop_moderation():
+    """Stop the moderation worker; posts it had not finished stay pending for the next start."""
+    from ai.moderation_pipeline import get_moderation_pipeline
+    await get_moderation_pipeline().stop()
+
+
+@app.on_event("startup")
+async def start_skill_index_refresh():
+    """Keep the job skill index current in the background so matching never waits on a replay."""
+    from ai.skill_index import get_job_skill_index
+    get_job_skill_index().start()
+
+
+@app.on_event("shutdown")
+async def stop_skill_index_refresh():
+    """Stop the job skill index refresh."""
+    from ai.skill_index import get_job_skill_index
+    await get_job_skill_index().stop()
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """Warm connections, clients and compiled patterns in the background; /ready reports 503 until done."""
+    from infrastructure.warmup import get_warmup
+    warmup = get_warmup()
+    if not settings.WARMUP_ENABLED:
+        warmup.start()  # No hooks: ready at once, still reports draining on shutdown
+        return
+    
+    from database.connection import warm_pool
+    from infrastructure.redis_pool import warm_async_redis, warm_redis
+    from llm import get_llm_client
+    
+    def warm_database():
+        return {"connections": warm_pool(settings.WARMUP_DB_CONNECTIONS)}
+    
+    async def warm_redis_pools():
+        return {
+            "sync_connections": await asyncio.to_thread(warm_redis, settings.WARMUP_REDIS_CONNECTIONS),
+            "async_connections": await warm_async_redis(settings.WARMUP_REDIS_CONNECTIONS),
+        }
+    
+    def warm_clients():
+        get_llm_client()
+        subscription.get_stripe()
+    
+    def warm_regexes():
+        from ai.moderation_pipeline import get_moderation_pipeline
+        import ai.content_fingerprint  # noqa: F401 - compiles its patterns at import
+        get_moderation_pipeline()
+    
+    def warm_openapi():
+        return {"paths": len(app.openapi()["paths"])}
+    
+    warmup.register("database", warm_database)
+    warmup.register("redis", warm_redis_pools, required=False)
+    warmup.register("clients", warm_clients, required=False)
+    warmup.register("regexes", warm_regexes, required=False)
+    warmup.register("openapi", warm_openapi, required=False)
+    
+    from ai.skill_index import get_job_skill_index
+    if settings.SNAPSHOT_ENABLED:
+        from infrastructure.snapshots import get_snapshot_store
+        snapshots = get_snapshot_store()
+        snapshots.register(get_job_skill_index())
+        warmup.register("snapshots", snapshots.restore_all, required=False)
+        snapshots.start(settings.SNAPSHOT_INTERVAL_SECONDS)
+    else:
+        warmup.register("job_skill_index", get_job_skill_index().catch_up, required=False)
+    
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def stop_warmup():
+    """Report not-ready first so the load balancer drains this instance."""
+    from infrastructure.warmup import get_warmup
+    await get_warmup().stop()
+
+
+@app.on_event("shutdown")
+async def save_snapshots():
+    """Write final snapshots of the in-memory indexes so the next start restores them."""
+    if settings.SNAPSHOT_ENABLED:
+        from infrastructure.snapshots import get_snapshot_store
+        await get_snapshot_store().stop()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -105,6 +279,20 @@ async def health_check():
     })
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once warmup has finished, 503 while warming (failed required hooks are retried) or when draining."""
+    from infrastructure.warmup import get_warmup
+    report = get_warmup().report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
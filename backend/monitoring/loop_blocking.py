@@ -0,0 +1,283 @@
+"""
+Event loop blocking detector (debug and test mode).
+
+Wraps asyncio's callback runner so every callback the loop executes is
+timed. A callback that runs longer than a detector's threshold, usually
+an async handler calling blocking code (LLMClient.chat, sync SQLAlchemy,
+boto3, stripe), is reported with:
+
+- how long it held the loop,
+- the task or callback it belongs to,
+- the HTTP route being served (with BlockingAttributionMiddleware), and
+- the stack where it was blocking, captured by a watchdog thread while
+  the callback was still running.
+
+This is for development and tests: it patches asyncio.Handle._run
+process-wide and only sees loops built on asyncio's own event loop
+(run uvicorn with --loop asyncio; uvloop's handles cannot be wrapped).
+The pytest plugin in testing/pytest_loop_blocking.py fails tests whose
+code blocks the loop.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_FRAMES = 25
+
+_current_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("loop_blocking_scope", default=None)
+
+
+@dataclass
+class BlockingEvent:
+    """One callback that held the event loop past a threshold."""
+    duration_ms: float
+    callback: str
+    route: Optional[str] = None
+    stack: List[str] = field(default_factory=list)
+    occurred_at: float = field(default_factory=time.time)
+
+    def describe(self) -> str:
+        where = f" while serving {self.route}" if self.route else ""
+        lines = [f"Event loop blocked for {self.duration_ms:.1f}ms by {self.callback}{where}"]
+        if self.stack:
+            lines.append("Blocking stack (most recent call last):")
+            lines.extend(self.stack)
+        else:
+            lines.append("(stack not captured: the callback ended before the watchdog saw it)")
+        return "\n".join(lines)
+
+
+class _Running:
+    """The callback currently executing on one loop thread."""
+
+    __slots__ = ("started", "handle", "stack", "scope")
+
+    def __init__(self, started: float, handle: Any):
+        self.started = started
+        self.handle = handle
+        self.stack: Optional[List[str]] = None
+        # Set when a request finishes inside this callback
+        self.scope: Optional[Dict[str, Any]] = None
+
+
+# Process-wide state shared by all installed detectors
+_detectors: List["LoopBlockingDetector"] = []
+_running: Dict[int, _Running] = {}
+_state_lock = threading.Lock()
+_original_run: Optional[Callable[[Any], None]] = None
+_watchdog: Optional[threading.Thread] = None
+_watchdog_stop = threading.Event()
+
+
+def _timed_run(handle: Any) -> None:
+    original = _original_run or asyncio.events.Handle._run
+    if not _detectors:
+        original(handle)
+        return
+    thread_id = threading.get_ident()
+    outer = _running.get(thread_id)
+    current = _Running(time.perf_counter(), handle)
+    _running[thread_id] = current
+    try:
+        original(handle)
+    finally:
+        duration = time.perf_counter() - current.started
+        if outer is None:
+            _running.pop(thread_id, None)
+        else:
+            # Nested loop (run_until_complete inside a callback): restore the outer entry
+            _running[thread_id] = outer
+        for detector in list(_detectors):
+            if duration >= detector.threshold:
+                detector._report(current, duration)
+
+
+def _format_stack(frame: Any) -> List[str]:
+    summary = traceback.extract_stack(frame)
+    # Drop the loop machinery below the callback (test runner, run_forever, Handle._run)
+    for index in range(len(summary) - 1, -1, -1):
+        if summary[index].name == "_timed_run" and summary[index].filename == __file__:
+            summary = [entry for entry in summary[index + 1:] if not entry.filename.endswith("events.py")]
+            break
+    return [line.rstrip("\n") for line in traceback.format_list(summary[-MAX_STACK_FRAMES:])]
+
+
+def _watch() -> None:
+    while True:
+        with _state_lock:
+            thresholds = [detector.threshold for detector in _detectors]
+        if not thresholds:
+            return
+        threshold = min(thresholds)
+        if _watchdog_stop.wait(threshold / 4):
+            return
+        now = time.perf_counter()
+        frames = None
+        for thread_id, current in list(_running.items()):
+            if current.stack is not None or now - current.started < threshold:
+                continue
+            if frames is None:
+                frames = sys._current_frames()
+            frame = frames.get(thread_id)
+            if frame is not None:
+                current.stack = _format_stack(frame)
+
+
+def _describe_callback(handle: Any) -> str:
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"task {owner.get_name()!r} ({getattr(coro, '__qualname__', coro)})"
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+def _describe_route(current: _Running) -> Optional[str]:
+    scope = current.scope
+    if scope is None:
+        context = getattr(current.handle, "_context", None)
+        scope = context.get(_current_scope) if context is not None else None
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {route.path if route is not None else scope.get('path', '')}".strip()
+
+
+class LoopBlockingDetector:
+    """
+    Reports event loop callbacks that run longer than threshold_ms.
+
+    Several detectors can be installed at once (e.g. the app's debug mode
+    and the pytest plugin), each with its own threshold and listener.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 50,
+        on_block: Optional[Callable[[BlockingEvent], None]] = None,
+        max_events: int = 200
+    ):
+        self.threshold = threshold_ms / 1000
+        self.on_block = on_block
+        self.events: Deque[BlockingEvent] = deque(maxlen=max_events)
+
+    @property
+    def installed(self) -> bool:
+        return self in _detectors
+
+    def install(self) -> "LoopBlockingDetector":
+        global _original_run, _watchdog
+        with _state_lock:
+            if self in _detectors:
+                return self
+            if _original_run is None:
+                _original_run = asyncio.events.Handle._run
+                asyncio.events.Handle._run = _timed_run
+            _detectors.append(self)
+            if _watchdog is None or not _watchdog.is_alive():
+                _watchdog_stop.clear()
+                _watchdog = threading.Thread(target=_watch, name="loop-blocking-watchdog", daemon=True)
+                _watchdog.start()
+        return self
+
+    def uninstall(self) -> None:
+        global _original_run, _watchdog
+        with _state_lock:
+            if self not in _detectors:
+                return
+            _detectors.remove(self)
+            if _detectors:
+                return
+            asyncio.events.Handle._run = _original_run
+            _original_run = None
+            _watchdog_stop.set()
+            watchdog, _watchdog = _watchdog, None
+        if watchdog is not None:
+            watchdog.join(timeout=5)
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def _report(self, current: _Running, duration: float) -> None:
+        event = BlockingEvent(
+            duration_ms=round(duration * 1000, 1),
+            callback=_describe_callback(current.handle),
+            route=_describe_route(current),
+            stack=current.stack or []
+        )
+        self.events.append(event)
+        if self.on_block is not None:
+            self.on_block(event)
+
+    def __enter__(self) -> "LoopBlockingDetector":
+        return self.install()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.uninstall()
+
+
+class BlockingAttributionMiddleware:
+    """ASGI middleware that lets blocking reports name the request's route."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+            # The request may end in the same callback that blocked
+            current = _running.get(threading.get_ident())
+            if current is not None:
+                current.scope = scope
+
+
+def _log_block(event: BlockingEvent) -> None:
+    logger.warning(event.describe())
+
+
+# Global debug-mode detector
+_debug_detector: Optional[LoopBlockingDetector] = None
+
+
+def enable_loop_blocking_debug(threshold_ms: Optional[float] = None) -> LoopBlockingDetector:
+    """Install the process-wide detector that logs every blocking callback (LOOP_BLOCKING_DEBUG)."""
+    global _debug_detector
+    if _debug_detector is None:
+        if threshold_ms is None:
+            from config import settings
+            threshold_ms = settings.LOOP_BLOCKING_THRESHOLD_MS
+        _debug_detector = LoopBlockingDetector(threshold_ms, on_block=_log_block)
+    _debug_detector.install()
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None and not isinstance(loop, asyncio.BaseEventLoop):
+        logger.warning(
+            f"Loop blocking debug mode cannot see callbacks on {type(loop).__module__}.{type(loop).__name__}; "
+            "run uvicorn with --loop asyncio"
+        )
+    else:
+        logger.info(f"Loop blocking debug mode on: reporting callbacks over {_debug_detector.threshold * 1000:g}ms")
+    return _debug_detector
+
+
+def get_loop_blocking_detector() -> Optional[LoopBlockingDetector]:
+    """The debug-mode detector, if enabled."""
+    return _debug_detector
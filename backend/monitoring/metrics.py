@@ -0,0 +1,414 @@
+"""
+Prometheus-compatible metrics.
+
+A small, dependency-free registry rendered in the Prometheus text
+exposition format (0.0.4) at /metrics. Hot paths bind their label
+children once (at import or construction) and then only touch a
+pre-allocated child: an increment or a bucket bump under a per-child
+lock, with no label lookups or string formatting per call.
+
+Values that already live elsewhere (DB and Redis pool usage, SSE
+subscribers) are read by collectors at scrape time instead of being
+tracked on every operation.
+"""
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; suits everything from a Redis call to an LLM round trip
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+
+class HistogramChild:
+    __slots__ = ("_upper_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self._upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; cumulated only when rendering
+        self._counts = [0] * (len(upper_bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def observe_since(self, started: float) -> None:
+        """Observe the seconds elapsed since a time.perf_counter() reading."""
+        self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """
+        Child for one label combination; bind it once and keep it.
+
+        Creating a child is the only allocation; later calls with the same
+        values return the same object.
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: Tuple[str, ...], child: Any) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {_format_value(child.get())}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.upper_bounds = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def observe_since(self, started: float) -> None:
+        self._default.observe_since(started)
+
+    def _render_child(self, key: Tuple[str, ...], child: HistogramChild) -> List[str]:
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors, and renders them."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run collector() before every scrape (e.g. to refresh gauges)."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.debug(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+
+# ----------------------------------------------------------------------
+# Metric catalog
+# ----------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+
+MATCHING_STAGE_SECONDS = registry.histogram(
+    "matching_stage_duration_seconds",
+    "MatchingEngine.generate_matches time per stage",
+    ["stage"]
+)
+MATCHES_GENERATED = registry.counter("matching_matches_generated_total", "Match records created")
+
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_duration_seconds",
+    "LLMClient.chat latency",
+    ["provider", "model"]
+)
+LLM_TOKENS = registry.counter("llm_tokens_total", "LLM tokens used", ["provider", "model", "kind"])
+LLM_ERRORS = registry.counter("llm_errors_total", "LLMClient.chat failures", ["provider", "model"])
+
+PII_SCAN_SECONDS = registry.histogram("pii_scan_duration_seconds", "PIIScanner.scan latency")
+PII_SCANS_WITH_PII = registry.counter("pii_scans_with_pii_total", "Scans that found PII")
+
+CHECKPOINT_SECONDS = registry.histogram(
+    "state_checkpoint_duration_seconds",
+    "StateManager.create_checkpoint latency",
+    ["checkpoint_type"]
+)
+
+DB_POOL_CONNECTIONS = registry.gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state (size, checked_in, checked_out, overflow)",
+    ["state"]
+)
+
+REDIS_COMMAND_SECONDS = registry.histogram(
+    "redis_command_duration_seconds",
+    "Redis round trip (connection checkout to release) by command",
+    ["client", "command"]
+)
+REDIS_POOL_CONNECTIONS = registry.gauge(
+    "redis_pool_connections",
+    "Redis pool connections by state (in_use, idle)",
+    ["client", "state"]
+)
+REDIS_POOL_CHECKOUT_TIMEOUTS = registry.gauge(
+    "redis_pool_checkout_timeouts",
+    "Redis pool checkouts that timed out waiting for a connection",
+    ["client"]
+)
+
+RATE_LIMIT_REJECTIONS = registry.counter("rate_limit_rejections_total", "Requests rejected by the rate limiter")
+
+SSE_SUBSCRIBERS = registry.gauge("sse_subscribers", "Open agent state SSE streams")
+SSE_CHANNELS = registry.gauge("sse_channels", "Agents tracked by the state broadcaster")
+
+EVENT_LOOP_LAG_SECONDS = registry.histogram("event_loop_lag_seconds", "How late the loop lag heartbeat woke up")
+EVENT_LOOP_BLOCKS = registry.counter("event_loop_blocks_total", "Loop stalls longer than LOOP_LAG_THRESHOLD_MS")
+
+WARMUP_HOOK_SECONDS = registry.gauge("warmup_hook_duration_seconds", "How long each startup warmup hook took", ["hook"])
+WARMUP_READY = registry.gauge("warmup_ready", "1 once warmup has finished and the instance reports ready")
+
+
+def _collect_db_pool() -> None:
+    # Only report an engine the app has already created
+    connection = sys.modules.get("database.connection")
+    if connection is None:
+        return
+    pool = connection.engine.pool
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, state, None)
+        if method is not None:
+            value = method()
+            if state == "overflow":
+                value = max(0, value)  # QueuePool counts down from -pool_size until the pool is full
+            DB_POOL_CONNECTIONS.labels(state.replace("checked", "checked_")).set(value)
+
+
+def _collect_redis_pools() -> None:
+    redis_pool = sys.modules.get("infrastructure.redis_pool")
+    if redis_pool is None:
+        return
+    totals: Dict[str, Dict[str, float]] = {}
+    for stats in redis_pool.get_redis_pool_stats():
+        entry = totals.setdefault(stats["kind"], {"in_use": 0, "idle": 0, "checkout_timeouts": 0})
+        for field in entry:
+            entry[field] += stats[field]
+    for client, entry in totals.items():
+        REDIS_POOL_CONNECTIONS.labels(client, "in_use").set(entry["in_use"])
+        REDIS_POOL_CONNECTIONS.labels(client, "idle").set(entry["idle"])
+        REDIS_POOL_CHECKOUT_TIMEOUTS.labels(client).set(entry["checkout_timeouts"])
+
+
+def _collect_sse() -> None:
+    broadcaster_module = sys.modules.get("infrastructure.state_broadcaster")
+    if broadcaster_module is None or broadcaster_module._broadcaster is None:
+        return
+    stats = broadcaster_module._broadcaster.stats()
+    SSE_CHANNELS.set(len(stats))
+    SSE_SUBSCRIBERS.set(sum(channel["subscribers"] for channel in stats.values()))
+
+
+registry.add_collector(_collect_db_pool)
+registry.add_collector(_collect_redis_pools)
+registry.add_collector(_collect_sse)
+
+
+def render_metrics() -> str:
+    """Current metrics in Prometheus text format."""
+    return registry.render()
+
+
+_STATUS_CLASSES = {1: "1xx", 2: "2xx", 3: "3xx", 4: "4xx", 5: "5xx"}
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template.
+
+    Routes are labelled by their declared path ("/api/agents/{agent_id}")
+    and statuses by class, so the number of children stays bounded.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._children: Dict[Tuple[str, str, str], HistogramChild] = {}
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            key = (scope["method"], getattr(route, "path", "unmatched"), _STATUS_CLASSES.get(status // 100, "5xx"))
+            child = self._children.get(key)
+            if child is None:
+                child = self._children.setdefault(key, HTTP_REQUEST_SECONDS.labels(*key))
+            child.observe_since(started)
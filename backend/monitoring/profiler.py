@@ -0,0 +1,361 @@
+"""
+In-process profiling for live workers.
+
+- SamplingProfiler: on-demand wall-clock sampler that walks every
+  thread's stack at a fixed interval and aggregates collapsed stacks
+  (the "a;b;c count" format flamegraph.pl and speedscope read).
+- ContinuousProfiler: the same sampler at a low rate, keeping a rolling
+  window of per-second buckets so the recent past can be inspected
+  after the fact.
+- LoopLagMonitor: measures event loop lag with a heartbeat task and, from
+  a watchdog thread, captures the loop thread's stack while the loop is
+  blocked, which points straight at blocking calls inside async handlers.
+
+Everything is pure Python (sys._current_frames), so nothing needs to be
+installed on the worker.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from monitoring.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_frame_labels: Dict[Any, str] = {}
+
+
+def _frame_label(code: Any) -> str:
+    label = _frame_labels.get(code)
+    if label is None:
+        path = code.co_filename
+        short = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+        label = _frame_labels.setdefault(code, f"{short}:{code.co_name}")
+    return label
+
+
+def collapse_stack(frame: Any) -> Tuple[str, bool]:
+    """Root-first "a;b;c" for a frame, and whether the thread looks idle."""
+    code = frame.f_code
+    idle = (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels), idle
+
+
+class StackProfile:
+    """Aggregated stack samples."""
+
+    def __init__(self, counts: Counter, samples: int, duration: float, interval: float):
+        self.counts = counts
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+
+    def collapsed(self) -> str:
+        """One "stack count" line per distinct stack, hottest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions by self samples (the leaf of each stack)."""
+        self_counts: Counter = Counter()
+        for stack, count in self.counts.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        total = sum(self_counts.values()) or 1
+        return [
+            {"frame": frame, "samples": count, "share": round(count / total, 4)}
+            for frame, count in self_counts.most_common(limit)
+        ]
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "distinct_stacks": len(self.counts),
+            "top": self.top(limit),
+        }
+
+
+class _StackSampler:
+    """Background thread that samples all other threads' stacks."""
+
+    def __init__(self, interval: float, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _start_thread(self, name: str) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _stop_thread(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack, idle = collapse_stack(frame)
+                if idle and not self.include_idle:
+                    continue
+                stacks.append(f"{names.get(ident, ident)};{stack}")
+            self._record(stacks)
+
+    def _record(self, stacks: List[str]) -> None:
+        raise NotImplementedError
+
+
+class SamplingProfiler(_StackSampler):
+    """
+    On-demand sampler: start(), let it run, stop() for the profile.
+
+    One session at a time per process; start() raises RuntimeError while
+    a session is running.
+    """
+
+    def __init__(self, interval: float = 0.01, include_idle: bool = False):
+        super().__init__(interval, include_idle)
+        self._counts: Counter = Counter()
+        self._samples = 0
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profiling session is already running")
+            self._counts = Counter()
+            self._samples = 0
+            self._started = time.perf_counter()
+            self._start_thread("sampling-profiler")
+
+    def stop(self) -> StackProfile:
+        with self._lock:
+            self._stop_thread()
+            return StackProfile(self._counts, self._samples, time.perf_counter() - self._started, self.interval)
+
+    def _record(self, stacks: List[str]) -> None:
+        self._samples += 1
+        self._counts.update(stacks)
+
+
+class ContinuousProfiler(_StackSampler):
+    """Low-rate sampler that keeps per-second buckets for the last window_seconds."""
+
+    def __init__(self, hz: float = 5.0, window_seconds: int = 600, include_idle: bool = False):
+        super().__init__(1.0 / hz, include_idle)
+        self.window_seconds = window_seconds
+        self._buckets: Deque[Tuple[int, Counter, int]] = deque()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if not self.running:
+            self._start_thread("continuous-profiler")
+            logger.info(f"Continuous profiler sampling at {1 / self.interval:g} Hz over {self.window_seconds}s")
+
+    def stop(self) -> None:
+        self._stop_thread()
+
+    def _record(self, stacks: List[str]) -> None:
+        second = int(time.time())
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append((second, Counter(), 0))
+                while self._buckets and self._buckets[0][0] <= second - self.window_seconds:
+                    self._buckets.popleft()
+            _, counts, samples = self._buckets[-1]
+            counts.update(stacks)
+            self._buckets[-1] = (second, counts, samples + 1)
+
+    def profile(self, seconds: Optional[int] = None) -> StackProfile:
+        """Merge the buckets of the last `seconds` (default: the whole window)."""
+        since = int(time.time()) - (seconds or self.window_seconds)
+        merged: Counter = Counter()
+        samples = 0
+        with self._lock:
+            buckets = [bucket for bucket in self._buckets if bucket[0] > since]
+            for _, counts, bucket_samples in buckets:
+                merged.update(counts)
+                samples += bucket_samples
+        duration = (buckets[-1][0] - buckets[0][0] + 1) if buckets else 0
+        return StackProfile(merged, samples, duration, self.interval)
+
+
+class LoopLagMonitor:
+    """
+    Event loop lag and blocking detector.
+
+    A heartbeat task sleeps `interval` and measures how late it wakes up.
+    A watchdog thread checks the heartbeat; once the loop has not come
+    back for threshold_ms it captures the loop thread's stack (the code
+    that is blocking), and the event is completed with the full stall
+    length when the loop resumes.
+    """
+
+    def __init__(self, threshold_ms: float = 100, interval: float = 0.05, max_events: int = 100):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.lags: Deque[float] = deque(maxlen=1200)
+        self.blocked_count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._last_beat = time.perf_counter()
+        self._pending: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop (call from inside it)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=5)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._last_beat = now
+            lag = max(0.0, now - before - self.interval)
+            self.lags.append(lag)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                self._finish_event(lag)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 4):
+            stalled = time.perf_counter() - self._last_beat - self.interval
+            if stalled < self.threshold or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack, _ = collapse_stack(frame)
+            self._pending = {"detected_at": time.time(), "stack": stack.split(";")}
+
+    def _finish_event(self, lag: float) -> None:
+        self.blocked_count += 1
+        EVENT_LOOP_BLOCKS.inc()
+        event, self._pending = self._pending, None
+        if event is None:
+            # Stalled between two watchdog checks; the stack is gone
+            event = {"detected_at": time.time(), "stack": []}
+        event["blocked_ms"] = round(lag * 1000, 1)
+        self.events.append(event)
+        culprit = event["stack"][-1] if event["stack"] else "unknown"
+        logger.warning(f"Event loop blocked for {event['blocked_ms']}ms in {culprit}")
+
+    def snapshot(self, events: int = 20) -> Dict[str, Any]:
+        ordered = sorted(self.lags)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 2)
+
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": {"p50": percentile(0.50), "p99": percentile(0.99), "max": percentile(1.0)},
+            "blocked_count": self.blocked_count,
+            "recent_blocks": list(self.events)[-events:],
+        }
+
+
+def describe_tasks(limit: int = 200) -> List[Dict[str, Any]]:
+    """The running loop's tasks with the line each is suspended at (call from the loop)."""
+    described = []
+    for task in list(asyncio.all_tasks())[:limit]:
+        coro = task.get_coro()
+        frames = task.get_stack(limit=1)
+        location = f"{frames[0].f_code.co_filename}:{frames[0].f_lineno}" if frames else None
+        described.append({
+            "name": task.get_name(),
+            "coroutine": getattr(coro, "__qualname__", repr(coro)),
+            "suspended_at": location,
+        })
+    return described
+
+
+# Global instances
+_continuous_profiler: Optional[ContinuousProfiler] = None
+_loop_lag_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_continuous_profiler() -> ContinuousProfiler:
+    """Get or create the global continuous profiler (not started)."""
+    global _continuous_profiler
+    if _continuous_profiler is None:
+        from config import settings
+        _continuous_profiler = ContinuousProfiler(
+            hz=settings.PROFILER_CONTINUOUS_HZ or 5.0,
+            window_seconds=settings.PROFILER_WINDOW_SECONDS
+        )
+    return _continuous_profiler
+
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    """Get or create the global loop lag monitor (not started)."""
+    global _loop_lag_monitor
+    if _loop_lag_monitor is None:
+        from config import settings
+        _loop_lag_monitor = LoopLagMonitor(threshold_ms=settings.LOOP_LAG_THRESHOLD_MS or 100)
+    return _loop_lag_monitor
@@ -1,17 +1,22 @@
 """
 System Health Monitoring with SMS Alerts
-Monitors critical subsystems and sends SMS alerts when they go offline.
+Monitors critical subsystems and sends SMS alerts when they go offline
+or when their latency regresses against their own recent baseline.
 """
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Awaitable, Callable, Deque, Dict, List, Optional, Any
 from dataclasses import dataclass
-import aiohttp
-from twilio.rest import Client
 
 from config import settings
 
+if TYPE_CHECKING:
+    import aiohttp
+    from twilio.rest import Client
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +28,73 @@ class SubsystemStatus:
     last_check: datetime
     error_message: Optional[str] = None
     consecutive_failures: int = 0
+    latency_ms: Optional[float] = None
+    degraded: bool = False
+    consecutive_slow: int = 0
+
+
+class LatencyHistogram:
+    """
+    Rolling window of probe latencies for one subsystem.
+    
+    Reports percentiles and bucket counts over the window, and compares
+    the latest samples with the older part of the window to spot a
+    regression before it turns into an outage.
+    """
+    
+    BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+    
+    def __init__(self, window: int = 240):
+        self.samples: Deque[float] = deque(maxlen=window)
+    
+    def record(self, latency_ms: float) -> None:
+        self.samples.append(latency_ms)
+    
+    @staticmethod
+    def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+        return round(ordered[index], 2)
+    
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        ordered = sorted(self.samples)
+        return {
+            "p50": self._percentile(ordered, 0.50),
+            "p95": self._percentile(ordered, 0.95),
+            "p99": self._percentile(ordered, 0.99),
+        }
+    
+    def buckets(self) -> Dict[str, int]:
+        counts = {f"le_{bound}": 0 for bound in self.BUCKETS_MS}
+        counts["le_inf"] = 0
+        for sample in self.samples:
+            for bound in self.BUCKETS_MS:
+                if sample <= bound:
+                    counts[f"le_{bound}"] += 1
+                    break
+            else:
+                counts["le_inf"] += 1
+        return counts
+    
+    def regression(self, recent: int, min_baseline: int) -> Optional[Dict[str, float]]:
+        """
+        Median of the last `recent` samples vs. the median of the rest.
+        
+        Returns None until the window holds enough history for a baseline.
+        """
+        if len(self.samples) < recent + min_baseline:
+            return None
+        samples = list(self.samples)
+        baseline = sorted(samples[:-recent])
+        latest = sorted(samples[-recent:])
+        return {
+            "baseline_ms": baseline[len(baseline) // 2],
+            "recent_ms": latest[len(latest) // 2],
+        }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {"samples": len(self.samples), **self.percentiles(), "buckets": self.buckets()}
 
 
 class SystemMonitor:
@@ -34,203 +106,173 @@ class SystemMonitor:
     
     # Monitoring intervals
     CHECK_INTERVAL = 60  # Check every 60 seconds
+    FAST_CHECK_INTERVAL = 15  # ...while anything is failing or degraded
     ALERT_COOLDOWN = 300  # 5 minutes between duplicate alerts
+    PROBE_TIMEOUT = 5.0  # Per-probe deadline in seconds
     
     # Failure thresholds
     FAILURE_THRESHOLD = 3  # Alert after 3 consecutive failures
     
+    # Latency regression: the median of the last RECENT_SAMPLES probes is
+    # over REGRESSION_FACTOR x the window's baseline median (and at least
+    # REGRESSION_MIN_DELTA_MS slower), or over SLOW_FRACTION of the timeout
+    HISTOGRAM_WINDOW = 240
+    RECENT_SAMPLES = 5
+    MIN_BASELINE_SAMPLES = 20
+    REGRESSION_FACTOR = 3.0
+    REGRESSION_MIN_DELTA_MS = 50.0
+    SLOW_FRACTION = 0.8
+    SLOW_THRESHOLD = 2  # Alert after 2 consecutive slow checks
+    
     def __init__(self):
         """Initialize the system monitor."""
         self.subsystems: Dict[str, SubsystemStatus] = {}
         self.last_alerts: Dict[str, datetime] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._http: Optional["aiohttp.ClientSession"] = None
+        self._db_probe: Optional[asyncio.Future] = None
+        self._twilio_client: Optional["Client"] = None
         
-        # Initialize Twilio client
-        if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
-            self.twilio_client = Client(
-                settings.TWILIO_ACCOUNT_SID,
-                settings.TWILIO_AUTH_TOKEN
-            )
+        # The Twilio client is built on the first alert rather than at import
+        self.twilio_enabled = bool(settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN)
+        if self.twilio_enabled:
             self.TWILIO_FROM = settings.TWILIO_PHONE_NUMBER
             logger.info("✅ Twilio SMS alerting enabled")
         else:
-            self.twilio_client = None
             logger.warning("⚠️  Twilio not configured - alerts will be logged only")
     
-    async def check_linear_mcp(self) -> SubsystemStatus:
-        """Check Linear MCP API availability."""
+    @property
+    def twilio_client(self) -> Optional["Client"]:
+        """The Twilio client, created on first use; None when Twilio is not configured."""
+        if self._twilio_client is None and self.twilio_enabled:
+            from twilio.rest import Client
+            self._twilio_client = Client(
+                settings.TWILIO_ACCOUNT_SID,
+                settings.TWILIO_AUTH_TOKEN
+            )
+        return self._twilio_client
+    
+    def _get_http(self) -> "aiohttp.ClientSession":
+        """One keep-alive HTTP session for every HTTP probe."""
+        if self._http is None or self._http.closed:
+            import aiohttp
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10),
+                timeout=aiohttp.ClientTimeout(total=self.PROBE_TIMEOUT)
+            )
+        return self._http
+    
+    async def close(self) -> None:
+        """Release the probe clients."""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+    
+    async def _probe(self, name: str, check: Callable[[], Awaitable[Optional[str]]]) -> SubsystemStatus:
+        """
+        Time one probe under PROBE_TIMEOUT.
+        
+        check() returns None when healthy or an error message; raising or
+        timing out also counts as unhealthy.
+        """
+        started = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                # Check Linear GraphQL API
-                async with session.post(
-                    'https://api.linear.app/graphql',
-                    json={'query': '{ viewer { id } }'},
-                    headers={'Authorization': 'Bearer YOUR_LINEAR_TOKEN'},
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return SubsystemStatus(
-                            name="Linear MCP",
-                            is_healthy=True,
-                            last_check=datetime.now()
-                        )
-                    else:
-                        return SubsystemStatus(
-                            name="Linear MCP",
-                            is_healthy=False,
-                            last_check=datetime.now(),
-                            error_message=f"HTTP {response.status}"
-                        )
+            error = await asyncio.wait_for(check(), timeout=self.PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.PROBE_TIMEOUT:g}s"
         except Exception as e:
-            return SubsystemStatus(
-                name="Linear MCP",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+            error = str(e) or e.__class__.__name__
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        
+        return SubsystemStatus(
+            name=name,
+            is_healthy=error is None,
+            last_check=datetime.now(),
+            error_message=error,
+            latency_ms=latency_ms
+        )
+    
+    async def _http_check(self, method: str, url: str, **kwargs) -> Optional[str]:
+        async with self._get_http().request(method, url, **kwargs) as response:
+            await response.read()
+            return None if response.status == 200 else f"HTTP {response.status}"
+    
+    async def check_linear_mcp(self) -> SubsystemStatus:
+        """Check Linear MCP API availability."""
+        # Check Linear GraphQL API
+        return await self._probe("Linear MCP", lambda: self._http_check(
+            "POST",
+            'https://api.linear.app/graphql',
+            json={'query': '{ viewer { id } }'},
+            headers={'Authorization': 'Bearer YOUR_LINEAR_TOKEN'}
+        ))
     
     async def check_database(self) -> SubsystemStatus:
         """Check PostgreSQL database availability."""
-        try:
-            # Import here to avoid circular dependency
-            from sqlalchemy import create_engine, text
-            
-            engine = create_engine(settings.DATABASE_URL)
-            with engine.connect() as conn:
-                result = conn.execute(text("SELECT 1"))
-                if result:
-                    return SubsystemStatus(
-                        name="PostgreSQL Database",
-                        is_healthy=True,
-                        last_check=datetime.now()
-                    )
-        except Exception as e:
-            return SubsystemStatus(
-                name="PostgreSQL Database",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+        async def check() -> Optional[str]:
+            # The driver is blocking: run it off the loop, and never stack
+            # a second probe thread on one that is still hung
+            if self._db_probe is not None and not self._db_probe.done():
+                return "Previous probe still waiting on the database"
+            self._db_probe = asyncio.ensure_future(asyncio.to_thread(self._select_one))
+            await asyncio.shield(self._db_probe)
+            return None
+        
+        return await self._probe("PostgreSQL Database", check)
+    
+    @staticmethod
+    def _select_one() -> None:
+        # Import here to avoid circular dependency
+        from sqlalchemy import text
+        from database.connection import engine
+        
+        # The application's pooled engine: the probe borrows a connection
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
     
     async def check_redis(self) -> SubsystemStatus:
         """Check Redis cache availability."""
-        try:
-            import redis.asyncio as redis
+        async def check() -> Optional[str]:
+            from infrastructure.redis_pool import get_async_redis
             
-            client = redis.from_url(settings.REDIS_URL)
-            await client.ping()
-            await client.close()
-            
-            return SubsystemStatus(
-                name="Redis Cache",
-                is_healthy=True,
-                last_check=datetime.now()
-            )
-        except Exception as e:
-            return SubsystemStatus(
-                name="Redis Cache",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+            # Shared pool: the check borrows a connection instead of opening one
+            await get_async_redis().ping()
+            return None
+        
+        return await self._probe("Redis Cache", check)
     
     async def check_elasticsearch(self) -> SubsystemStatus:
         """Check Elasticsearch availability."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{settings.ELASTICSEARCH_URL}/_cluster/health",
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return SubsystemStatus(
-                            name="Elasticsearch",
-                            is_healthy=True,
-                            last_check=datetime.now()
-                        )
-                    else:
-                        return SubsystemStatus(
-                            name="Elasticsearch",
-                            is_healthy=False,
-                            last_check=datetime.now(),
-                            error_message=f"HTTP {response.status}"
-                        )
-        except Exception as e:
-            return SubsystemStatus(
-                name="Elasticsearch",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+        return await self._probe("Elasticsearch", lambda: self._http_check(
+            "GET", f"{settings.ELASTICSEARCH_URL}/_cluster/health"
+        ))
     
     async def check_ollama(self) -> SubsystemStatus:
         """Check Ollama LLM service availability."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{settings.OLLAMA_BASE_URL}/api/tags",
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return SubsystemStatus(
-                            name="Ollama LLM",
-                            is_healthy=True,
-                            last_check=datetime.now()
-                        )
-                    else:
-                        return SubsystemStatus(
-                            name="Ollama LLM",
-                            is_healthy=False,
-                            last_check=datetime.now(),
-                            error_message=f"HTTP {response.status}"
-                        )
-        except Exception as e:
-            return SubsystemStatus(
-                name="Ollama LLM",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+        return await self._probe("Ollama LLM", lambda: self._http_check(
+            "GET", f"{settings.OLLAMA_BASE_URL}/api/tags"
+        ))
     
     async def check_frontend(self) -> SubsystemStatus:
         """Check frontend Next.js application."""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://jobmatch.zip",
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return SubsystemStatus(
-                            name="Frontend (jobmatch.zip)",
-                            is_healthy=True,
-                            last_check=datetime.now()
-                        )
-                    else:
-                        return SubsystemStatus(
-                            name="Frontend (jobmatch.zip)",
-                            is_healthy=False,
-                            last_check=datetime.now(),
-                            error_message=f"HTTP {response.status}"
-                        )
-        except Exception as e:
-            return SubsystemStatus(
-                name="Frontend (jobmatch.zip)",
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
-            )
+        return await self._probe("Frontend (jobmatch.zip)", lambda: self._http_check(
+            "GET", "https://jobmatch.zip"
+        ))
     
     async def send_sms_alert(self, message: str) -> bool:
         """Send SMS alert via Twilio."""
-        if not self.twilio_client:
+        if not self.twilio_enabled:
             logger.warning(f"📱 ALERT (Twilio disabled): {message}")
             return False
         
         try:
-            sms = self.twilio_client.messages.create(
-                body=message,
-                from_=self.TWILIO_FROM,
-                to=self.ALERT_PHONE
+            # The Twilio client is blocking; keep it off the event loop
+            sms = await asyncio.to_thread(
+                lambda: self.twilio_client.messages.create(
+                    body=message,
+                    from_=self.TWILIO_FROM,
+                    to=self.ALERT_PHONE
+                )
             )
             logger.info(f"✅ SMS alert sent: {sms.sid}")
             return True
@@ -258,7 +300,7 @@ class SystemMonitor:
         self.subsystems[status.name] = status
         
         # Check if we should alert
-        if (status.consecutive_failures >= self.FAILURE_THRESHOLD and 
+        if (status.consecutive_failures >= self.FAILURE_THRESHOLD and
             self.should_send_alert(status.name)):
             
             alert_message = (
@@ -292,8 +334,52 @@ class SystemMonitor:
         
         # Reset consecutive failures
         status.consecutive_failures = 0
+        await self.handle_latency(status)
         self.subsystems[status.name] = status
     
+    def _is_slow(self, status: SubsystemStatus, histogram: LatencyHistogram) -> Optional[str]:
+        """Why the latest latency counts as a regression, or None."""
+        if status.latency_ms >= self.SLOW_FRACTION * self.PROBE_TIMEOUT * 1000:
+            return f"{status.latency_ms:.0f}ms is close to the {self.PROBE_TIMEOUT:g}s probe timeout"
+        
+        regression = histogram.regression(self.RECENT_SAMPLES, self.MIN_BASELINE_SAMPLES)
+        if regression is None:
+            return None
+        baseline, recent = regression["baseline_ms"], regression["recent_ms"]
+        if recent > baseline * self.REGRESSION_FACTOR and recent - baseline >= self.REGRESSION_MIN_DELTA_MS:
+            return f"median latency {recent:.0f}ms vs {baseline:.0f}ms baseline"
+        return None
+    
+    async def handle_latency(self, status: SubsystemStatus):
+        """Record a healthy probe's latency and alert on sustained regressions."""
+        histogram = self.histograms.setdefault(status.name, LatencyHistogram(self.HISTOGRAM_WINDOW))
+        histogram.record(status.latency_ms)
+        
+        previous = self.subsystems.get(status.name)
+        reason = self._is_slow(status, histogram)
+        if reason is None:
+            if previous is not None and previous.degraded:
+                logger.info(f"✅ {status.name} latency back to normal")
+            return
+        
+        status.consecutive_slow = (previous.consecutive_slow if previous else 0) + 1
+        status.degraded = status.consecutive_slow >= self.SLOW_THRESHOLD
+        status.error_message = reason
+        alert_key = f"{status.name}:latency"
+        if status.degraded and self.should_send_alert(alert_key):
+            percentiles = histogram.percentiles()
+            alert_message = (
+                f"⚠️ JOBMATCH WARNING ⚠️\n\n"
+                f"System: {status.name}\n"
+                f"Status: DEGRADED\n"
+                f"Latency: {reason}\n"
+                f"p50/p95/p99: {percentiles['p50']}/{percentiles['p95']}/{percentiles['p99']}ms\n"
+                f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+            await self.send_sms_alert(alert_message)
+            self.last_alerts[alert_key] = datetime.now()
+            logger.warning(f"⚠️ {status.name} is DEGRADED: {reason}")
+    
     async def check_all_subsystems(self):
         """Check all critical subsystems."""
         checks = [
@@ -317,28 +403,39 @@ class SystemMonitor:
             else:
                 await self.handle_failure(result)
     
+    def next_interval(self) -> float:
+        """Check more often while anything is failing or degraded, to confirm or clear it sooner."""
+        if any(not status.is_healthy or status.consecutive_slow for status in self.subsystems.values()):
+            return self.FAST_CHECK_INTERVAL
+        return self.CHECK_INTERVAL
+    
     async def run_monitoring_loop(self):
         """Main monitoring loop."""
         logger.info("🔍 System monitoring started")
         logger.info(f"📱 Alerts will be sent to: {self.ALERT_PHONE}")
-        logger.info(f"⏱️  Check interval: {self.CHECK_INTERVAL}s")
+        logger.info(f"⏱️  Check interval: {self.CHECK_INTERVAL}s ({self.FAST_CHECK_INTERVAL}s while degraded)")
         
-        while True:
-            try:
-                await self.check_all_subsystems()
-                await asyncio.sleep(self.CHECK_INTERVAL)
-            except Exception as e:
-                logger.error(f"Monitoring loop error: {e}")
-                await asyncio.sleep(self.CHECK_INTERVAL)
+        try:
+            while True:
+                try:
+                    await self.check_all_subsystems()
+                except Exception as e:
+                    logger.error(f"Monitoring loop error: {e}")
+                await asyncio.sleep(self.next_interval())
+        finally:
+            await self.close()
     
     def get_status_report(self) -> Dict[str, Any]:
         """Get current status of all monitored subsystems."""
         return {
             subsystem_name: {
                 "healthy": status.is_healthy,
+                "degraded": status.degraded,
                 "last_check": status.last_check.isoformat(),
                 "consecutive_failures": status.consecutive_failures,
-                "error": status.error_message
+                "error": status.error_message,
+                "latency_ms": status.latency_ms,
+                "latency": self.histograms[subsystem_name].snapshot() if subsystem_name in self.histograms else None
             }
             for subsystem_name, status in self.subsystems.items()
         }
@@ -0,0 +1,517 @@
+"""
+Request tracing.
+
+A lightweight OpenTelemetry-compatible tracer: spans carry W3C trace
+context (traceparent in, X-Trace-Id out), are head-sampled by trace id
+ratio when a trace starts (children inherit the decision) and are
+exported in batches as OTLP/HTTP JSON, or as OTLP span JSON lines to the
+console or a file for local work and tests.
+
+Spans are created automatically for HTTP requests (TracingMiddleware),
+SQLAlchemy statements (instrument_sqlalchemy), Redis commands (the
+shared pools), LLMClient.chat and agent perceive/decide/act phases
+(instrument_agents). Database and Redis spans are only recorded inside
+an existing trace, so background chatter never starts traces of its own.
+
+The active span lives in a context variable, so work handed to threads
+must carry the context along (asyncio.to_thread does; executors need
+contextvars.copy_context().run), and background workers started from a
+request should run in detached_context() so they do not join its trace.
+"""
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+MAX_STATEMENT_CHARS = 1000
+
+
+class Span:
+    """One timed operation. Unsampled spans only carry context."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "_tracer"
+    )
+
+    def __init__(
+        self,
+        tracer: Optional["Tracer"],
+        name: str,
+        trace_id: int,
+        span_id: int,
+        parent_id: Optional[int],
+        sampled: bool,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.kind = kind
+        self.attributes = dict(attributes) if (sampled and attributes) else {}
+        self.status = "unset"
+        self.status_message = ""
+        self.start_ns = time.time_ns() if sampled else 0
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        if self.sampled:
+            self.status = "error"
+            self.status_message = f"{error.__class__.__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled and self._tracer is not None:
+            self._tracer.processor.on_end(self)
+
+    @property
+    def trace_id_hex(self) -> str:
+        return f"{self.trace_id:032x}"
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id:032x}-{self.span_id:016x}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """This span in OTLP JSON form."""
+        span = {
+            "traceId": f"{self.trace_id:032x}",
+            "spanId": f"{self.span_id:016x}",
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": {"unset": 0, "ok": 1, "error": 2}[self.status], "message": self.status_message},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = f"{self.parent_id:016x}"
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+# Returned when tracing is disabled or a leaf span has no trace to join
+_NOOP_SPAN = Span(None, "", 0, 0, None, sampled=False)
+_NOOP_SPAN.end_ns = 0
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Span:
+    """The active span, or a no-op span outside any trace."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def detached_context() -> Context:
+    """A copy of the current context without the active span, for tasks that outlive the request starting them."""
+    context = copy_context()
+    context.run(_current_span.set, None)
+    return context
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[int, int, bool]]:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        trace_id, span_id, flags = int(parts[1], 16), int(parts[2], 16), int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if not trace_id or not span_id:
+        return None
+    return trace_id, span_id, bool(flags & 1)
+
+
+# ----------------------------------------------------------------------
+# Exporters and the batch processor
+# ----------------------------------------------------------------------
+
+class SpanExporter:
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """One OTLP span JSON object per line on stderr."""
+
+    def __init__(self, stream: Any = None):
+        self.stream = stream or sys.stderr
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            self.stream.write(json.dumps(span.to_otlp()) + "\n")
+        self.stream.flush()
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Appends OTLP span JSON lines to a file (handy in tests)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        super().__init__(open(path, "a", encoding="utf-8"))
+
+    def shutdown(self) -> None:
+        self.stream.close()
+
+
+class OTLPHttpJsonExporter(SpanExporter):
+    """Posts batches to an OTLP/HTTP endpoint (e.g. http://collector:4318/v1/traces) as JSON."""
+
+    def __init__(self, endpoint: str, service_name: str, headers: Optional[Dict[str, str]] = None, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self.resource = {"attributes": [_otlp_attribute("service.name", service_name)]}
+
+    def export(self, spans: List[Span]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{"scope": {"name": "jobmatch.tracing"}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(body).encode("utf-8"), headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them from a background thread."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue: int = 4096,
+        batch_size: int = 256,
+        interval: float = 2.0
+    ):
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: Deque[Span] = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._export_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            # Never block the request path on a slow collector
+            self.dropped += 1
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._export_lock:
+            while self._queue:
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Span export failed, dropped {len(batch)} spans: {e}")
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.exporter.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    """
+    Creates spans and applies head sampling.
+
+    A trace's sampling decision is made once, when its root span starts:
+    traces continued from an incoming traceparent keep the caller's
+    decision; new ones are kept when their trace id falls under
+    sample_ratio (the OpenTelemetry TraceIdRatioBased rule).
+    """
+
+    def __init__(self, processor: Optional[BatchSpanProcessor], sample_ratio: float = 1.0):
+        self.processor = processor
+        self.enabled = processor is not None
+        self.sample_ratio = max(0.0, min(1.0, sample_ratio))
+        self._bound = int(self.sample_ratio * (1 << 64))
+        self._random = random.SystemRandom()
+
+    def _should_sample(self, trace_id: int) -> bool:
+        return (trace_id & 0xFFFFFFFFFFFFFFFF) < self._bound
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Tuple[int, int, bool]] = None,
+        require_parent: bool = False
+    ) -> Span:
+        """
+        Start a span without making it current (call end() on it).
+
+        parent overrides the current span with a remote (trace_id,
+        span_id, sampled); require_parent returns a no-op span outside
+        an existing trace.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            current = _current_span.get()
+            if current is not None and current is not _NOOP_SPAN:
+                trace_id, parent_id, sampled = current.trace_id, current.span_id, current.sampled
+            elif require_parent:
+                return _NOOP_SPAN
+            else:
+                trace_id = self._random.getrandbits(128) or 1
+                parent_id = None
+                sampled = self._should_sample(trace_id)
+
+        if require_parent and not sampled:
+            return _NOOP_SPAN
+        span_id = self._random.getrandbits(64) or 1
+        return Span(self, name, trace_id, span_id, parent_id, sampled, kind, attributes)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Tuple[int, int, bool]] = None,
+        require_parent: bool = False
+    ) -> Iterator[Span]:
+        """Run a block inside a new current span; exceptions mark it as an error."""
+        span = self.start_span(name, kind, attributes, parent, require_parent)
+        if span is _NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def create_tracer(
+    exporter: Optional[str] = None,
+    sample_ratio: Optional[float] = None,
+    endpoint: Optional[str] = None,
+    file_path: Optional[str] = None,
+    service_name: Optional[str] = None
+) -> Tracer:
+    """
+    Build a tracer from settings.
+
+    exporter is "otlp", "console", "file" or "none" (a disabled tracer
+    whose spans cost a single attribute check).
+    """
+    from config import settings
+
+    exporter = (exporter or settings.TRACING_EXPORTER).lower()
+    sample_ratio = settings.TRACING_SAMPLE_RATIO if sample_ratio is None else sample_ratio
+    service_name = service_name or settings.TRACING_SERVICE_NAME
+
+    if exporter == "none":
+        return Tracer(None)
+    if exporter == "otlp":
+        span_exporter: SpanExporter = OTLPHttpJsonExporter(endpoint or settings.TRACING_OTLP_ENDPOINT, service_name)
+    elif exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    elif exporter == "file":
+        span_exporter = FileSpanExporter(file_path or settings.TRACING_FILE_PATH)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {exporter}")
+
+    logger.info(f"Tracing enabled: {exporter} exporter, sampling {sample_ratio:.0%} of new traces")
+    return Tracer(BatchSpanProcessor(span_exporter), sample_ratio)
+
+
+# Global tracer instance
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get or create the global tracer."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = create_tracer()
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    """Flush queued spans and stop the exporter thread."""
+    global _tracer
+    with _tracer_lock:
+        tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Instrumentation
+# ----------------------------------------------------------------------
+
+def instrument_sqlalchemy(engine: Any) -> None:
+    """Record a client span around every statement executed inside a trace."""
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = get_tracer().start_span(
+            "db.query",
+            kind="client",
+            attributes={"db.system": engine.dialect.name, "db.statement": statement[:MAX_STATEMENT_CHARS]},
+            require_parent=True
+        )
+        if context is not None:
+            context._trace_span = span
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+def instrument_agents() -> bool:
+    """Trace agent run/perceive/decide/act when the agents package is importable."""
+    try:
+        from src.agents.base_agent import BaseAgent
+    except Exception as e:
+        logger.debug(f"Agent tracing not installed: {e}")
+        return False
+
+    def phase_span(agent: Any, phase: str):
+        return get_tracer().span(
+            f"agent.{phase}",
+            attributes={"agent.name": agent.name, "agent.id": agent.agent_id, "agent.class": type(agent).__name__}
+        )
+
+    BaseAgent.phase_hook = staticmethod(phase_span)
+    return True
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per HTTP request.
+
+    Continues the caller's trace from a traceparent header and returns
+    the trace id of sampled requests in X-Trace-Id.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        tracer = get_tracer()
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with tracer.span(
+            f"HTTP {scope['method']}",
+            kind="server",
+            attributes={"http.method": scope["method"], "http.target": scope.get("path", "")},
+            parent=parse_traceparent(traceparent)
+        ) as span:
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "error"
+                    if span.sampled:
+                        message.setdefault("headers", [])
+                        message["headers"] = list(message["headers"]) + [(b"x-trace-id", span.trace_id_hex.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -0,0 +1,16 @@
+"""
+Notifications Module.
+Durable outbox and pooled transports for outbound email.
+"""
+
+from notifications.dispatcher import NotificationDispatcher, get_notification_dispatcher
+from notifications.transports import SMTPConnectionPool, get_smtp_pool
+from notifications.local_smtp import LocalSMTPServer
+
+__all__ = [
+    "NotificationDispatcher",
+    "get_notification_dispatcher",
+    "SMTPConnectionPool",
+    "get_smtp_pool",
+    "LocalSMTPServer"
+]
@@ -0,0 +1,266 @@
+"""
+Outbound notification dispatcher.
+Callers write to a durable outbox and return immediately; a background
+worker claims due messages, sends them concurrently over pooled
+connections and retries failures with exponential backoff.
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from database.models import NotificationOutbox
+from monitoring.tracing import detached_context
+from security.pii_redaction import redact_email
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# A claimed message not resolved within this window is picked up again
+SEND_LEASE_SECONDS = 120
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+class NotificationDispatcher:
+    """Durable outbox with a background sender."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        email_manager=None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        self._session_factory = session_factory
+        self._email_manager = email_manager
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.NOTIFICATION_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.NOTIFICATION_RETRY_BASE_SECONDS
+        self.poll_seconds = poll_seconds or settings.NOTIFICATION_POLL_SECONDS
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from database.connection import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    @property
+    def email_manager(self):
+        if self._email_manager is None:
+            from auth.email_provider import create_email_manager
+            self._email_manager = create_email_manager()
+        return self._email_manager
+
+    # ------------------------------------------------------------------
+    # Enqueue API
+    # ------------------------------------------------------------------
+
+    def enqueue_email(
+        self,
+        db: Session,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        text_body: Optional[str] = None
+    ) -> NotificationOutbox:
+        """Write an email to the outbox and return without sending."""
+        notification = NotificationOutbox(
+            channel="email",
+            recipient=to_email,
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body,
+            status=PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        db.add(notification)
+        db.commit()
+        db.refresh(notification)
+
+        logger.info(f"Queued email {notification.id} to {redact_email(to_email)}: {subject}")
+        self.wake()
+        return notification
+
+    def wake(self) -> None:
+        """Nudge the worker; starts it if called on a running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self.start()
+            self._wake.set()
+        elif self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        # Otherwise the next poll (or worker start) picks the message up
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        # Often started by the first enqueue in a request; keep sends out of that trace
+        self._worker = self._loop.create_task(self._run(), context=detached_context())
+
+    async def stop(self) -> None:
+        """Cancel the background worker."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                sent = await self.dispatch_due()
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {e}", exc_info=True)
+                sent = 0
+
+            if sent:
+                continue  # Drain backlog before sleeping
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_due(self) -> int:
+        """Claim and send one batch of due messages. Returns the batch size."""
+        claimed = await asyncio.to_thread(self._claim_due)
+        if not claimed:
+            return 0
+
+        results = await self._send(claimed)
+        await asyncio.to_thread(self._record_results, results)
+        return len(claimed)
+
+    def _claim_due(self) -> List[Dict[str, Any]]:
+        """Lock due messages (SKIP LOCKED so workers never double-send)."""
+        db = self._new_session()
+        try:
+            now = datetime.utcnow()
+            rows = db.query(NotificationOutbox).filter(
+                or_(NotificationOutbox.status == PENDING, NotificationOutbox.status == SENDING),
+                NotificationOutbox.next_attempt_at <= now
+            ).order_by(
+                NotificationOutbox.next_attempt_at.asc()
+            ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            claimed = []
+            for row in rows:
+                row.status = SENDING
+                row.attempts += 1
+                row.next_attempt_at = now + timedelta(seconds=SEND_LEASE_SECONDS)
+                claimed.append({
+                    "id": row.id,
+                    "recipient": row.recipient,
+                    "subject": row.subject,
+                    "html_body": row.html_body,
+                    "text_body": row.text_body,
+                    "attempts": row.attempts,
+                })
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    async def _send(self, messages: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        manager = self.email_manager
+
+        # Messages go out concurrently, bounded by the SMTP pool size
+        limit = asyncio.Semaphore(max(1, settings.SMTP_POOL_SIZE))
+
+        async def send_one(message: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            async with limit:
+                try:
+                    outcome = await manager.send_email(
+                        message["recipient"],
+                        message["subject"],
+                        message["html_body"],
+                        message["text_body"]
+                    )
+                except Exception as e:
+                    outcome = {"success": False, "error": str(e)}
+                return message, outcome
+
+        return list(await asyncio.gather(*(send_one(m) for m in messages)))
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = self.retry_base_seconds * (2 ** (attempts - 1))
+        return min(delay, MAX_RETRY_DELAY_SECONDS) * random.uniform(0.8, 1.2)
+
+    def _record_results(self, results: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        db = self._new_session()
+        try:
+            now = datetime.utcnow()
+            rows = {
+                row.id: row
+                for row in db.query(NotificationOutbox).filter(
+                    NotificationOutbox.id.in_([message["id"] for message, _ in results])
+                ).all()
+            }
+            for message, outcome in results:
+                row = rows.get(message["id"])
+                if row is None:
+                    continue
+                row.provider = outcome.get("provider")
+                if outcome.get("success"):
+                    row.status = SENT
+                    row.sent_at = now
+                    row.provider_message_id = outcome.get("message_id")
+                    row.last_error = None
+                elif row.attempts >= self.max_attempts:
+                    row.status = FAILED
+                    row.last_error = outcome.get("error")
+                    logger.error(
+                        f"Email {row.id} to {redact_email(row.recipient)} failed permanently "
+                        f"after {row.attempts} attempts: {row.last_error}"
+                    )
+                else:
+                    row.status = PENDING
+                    row.last_error = outcome.get("error")
+                    row.next_attempt_at = now + timedelta(seconds=self._retry_delay(row.attempts))
+                    logger.warning(
+                        f"Email {row.id} to {redact_email(row.recipient)} failed "
+                        f"(attempt {row.attempts}), retrying at {row.next_attempt_at.isoformat()}"
+                    )
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global dispatcher instance
+_dispatcher: Optional[NotificationDispatcher] = None
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get or create the global notification dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = NotificationDispatcher()
+    return _dispatcher
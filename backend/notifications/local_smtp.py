@@ -0,0 +1,106 @@
+"""
+Local SMTP stand-in for development and tests.
+A minimal in-process SMTP sink that accepts mail without TLS or auth and
+records every message, so the outbox and SMTP pool can be exercised
+without a real provider.
+
+Usage:
+    server = LocalSMTPServer().start()
+    pool = SMTPConnectionPool(server.host, server.port, use_tls=False)
+    ...
+    server.messages  # [(mail_from, [rcpt_to], raw_bytes), ...]
+    server.stop()
+"""
+import socketserver
+import threading
+from typing import List, Tuple
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self) -> None:
+        server: "LocalSMTPServer" = self.server.owner
+        with server._lock:
+            server.connections += 1
+
+        self._reply("220 localhost LocalSMTPServer ready")
+        mail_from, rcpt_to = "", []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost" if verb == "EHLO" else "250 localhost")
+                if verb == "EHLO":
+                    self._reply("250 8BITMIME")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = command.split(":", 1)[1].strip().strip("<>").split(">")[0], []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command.split(":", 1)[1].strip().strip("<>").split(">")[0])
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    if data_line.startswith(b".."):
+                        data_line = data_line[1:]
+                    lines.append(data_line)
+                with server._lock:
+                    server.messages.append((mail_from, rcpt_to, b"".join(lines)))
+                mail_from, rcpt_to = "", []
+                self._reply("250 OK: queued")
+            elif verb == "RSET":
+                mail_from, rcpt_to = "", []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """In-process SMTP sink recording received messages."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _ThreadingTCPServer((host, port), _SMTPHandler)
+        self._server.owner = self
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.connections = 0
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "LocalSMTPServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,166 @@
+"""
+Pooled email transports.
+Persistent SMTP connections reused across messages.
+"""
+import logging
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of persistent SMTP connections.
+
+    Connections are checked out per message and returned afterwards; idle
+    connections are probed with NOOP before reuse and replaced if the
+    server has dropped them.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        max_connections: int = 4,
+        idle_check_seconds: float = 30.0,
+        timeout: float = 30.0
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.max_connections = max_connections
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self.stats = {"connections_opened": 0, "connections_reused": 0, "connections_dropped": 0}
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.stats["connections_opened"] += 1
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < self.idle_check_seconds:
+                break
+            try:
+                if server.noop()[0] == 250:
+                    break
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._discard(server)
+
+        with self._lock:
+            self.stats["connections_reused"] += 1
+        return server
+
+    def _discard(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self.stats["connections_dropped"] += 1
+        try:
+            server.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        """Check out a live connection, returning it to the pool afterwards."""
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            if server is not None:
+                self._discard(server)
+                server = None
+            raise
+        finally:
+            if server is not None:
+                self._idle.put((server, time.monotonic()))
+            self._slots.release()
+
+    def send(self, message: Message) -> None:
+        """
+        Send a message, retrying once if a pooled connection turned out stale.
+
+        Raises SMTPRecipientsRefused if the server refused any recipient
+        (send_message only raises when it refuses all of them).
+        """
+        for attempt in (1, 2):
+            try:
+                with self.connection() as server:
+                    refused = server.send_message(message)
+                break
+            except smtplib.SMTPServerDisconnected:
+                if attempt == 2:
+                    raise
+                logger.info("Pooled SMTP connection was stale, reconnecting")
+        if refused:
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+
+_smtp_pools: Dict[Tuple, SMTPConnectionPool] = {}
+_smtp_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(
+    host: str,
+    port: int,
+    user: str = "",
+    password: str = "",
+    use_tls: bool = True,
+    max_connections: int = 4
+) -> SMTPConnectionPool:
+    """Get the shared pool for an SMTP configuration."""
+    key = (host, port, user, use_tls)
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(host, port, user, password, use_tls, max_connections)
+            _smtp_pools[key] = pool
+        return pool
+
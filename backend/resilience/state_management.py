@@ -4,6 +4,7 @@ Implements checkpoint system for all AI decisions with rollback capabilities.
 """
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
@@ -12,6 +13,8 @@ from sqlalchemy import Column, String, DateTime, Text, Integer, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 
+from monitoring.metrics import CHECKPOINT_SECONDS
+
 Base = declarative_base()
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,10 @@ class CheckpointType(str, Enum):
     SYSTEM = "system"
 
 
+# Pre-bound per type so create_checkpoint does no label lookups
+_CHECKPOINT_TIMERS = {checkpoint_type: CHECKPOINT_SECONDS.labels(checkpoint_type.value) for checkpoint_type in CheckpointType}
+
+
 class StateCheckpoint(Base):
     """Database model for state checkpoints."""
     __tablename__ = "state_snapshots"
@@ -66,6 +73,7 @@ class StateManager:
         created_by: Optional[str] = None
     ) -> StateCheckpoint:
         """Create a new state checkpoint."""
+        started = time.perf_counter()
         checkpoint = StateCheckpoint(
             checkpoint_type=checkpoint_type.value,
             entity_id=entity_id,
@@ -76,6 +84,7 @@ class StateManager:
         self.db.add(checkpoint)
         self.db.commit()
         self.db.refresh(checkpoint)
+        _CHECKPOINT_TIMERS[checkpoint_type].observe_since(started)
         logger.info(f"Created checkpoint {checkpoint.id} for {checkpoint_type.value}:{entity_id}")
         return checkpoint
     
@@ -9,12 +9,17 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 import logging
 
+from monitoring.metrics import RATE_LIMIT_REJECTIONS
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimiterMiddleware(BaseHTTPMiddleware):
     """Rate limiting middleware."""
     
+    # Orchestrator probes all come from one address; never rate limit them
+    EXEMPT_PATHS = frozenset({"/health", "/ready"})
+    
     def __init__(self, app: ASGIApp, requests_per_minute: int = 60):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
@@ -69,10 +74,14 @@ class RateLimiterMiddleware(BaseHTTPMiddleware):
     
     async def dispatch(self, request: Request, call_next):
         """Check rate limit before processing request."""
+        if request.url.path in self.EXEMPT_PATHS:
+            return await call_next(request)
+        
         client_id = self._get_client_id(request)
         
         if self._is_rate_limited(client_id):
             logger.warning(f"Rate limit exceeded for {client_id}")
+            RATE_LIMIT_REJECTIONS.inc()
             raise HTTPException(
                 status_code=429,
                 detail="Rate limit exceeded. Please try again later."
@@ -6,8 +6,6 @@ import logging
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from config import settings
@@ -65,6 +63,10 @@ class SearchConsoleManager:
                 logger.error(f"Failed to parse credentials JSON: {e}")
                 logger.debug(f"First 200 chars of creds: {creds_str[:200]}")
                 return
+            
+            # Imported only once credentials exist: google auth + discovery take ~0.3s
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
             credentials = service_account.Credentials.from_service_account_info(
                 credentials_info,
                 scopes=['https://www.googleapis.com/auth/webmasters']
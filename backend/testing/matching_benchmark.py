@@ -0,0 +1,477 @@
+"""
+Matching Benchmark Suite.
+Measures the matching hot paths on the simulated data corpus, scaled up by
+synthetic expansion, so every optimization has before/after numbers.
+
+Benchmarks:
+    generate_matches   MatchingEngine.generate_matches against a database
+                       loaded with the job postings and profiles
+    predict_longevity  LongevityPredictor.predict_longevity on profile/job pairs
+    find_matches       CapabilityMatcher.find_matches over the zero-knowledge
+                       capability corpus, queried with the simulated seekers
+
+Each benchmark/scale runs in a fresh process so peak RSS is its own.
+
+Usage (from backend/):
+    python -m testing.matching_benchmark --scales 1 10 100 --output benchmark.json
+    python -m testing.matching_benchmark --baseline before.json --output after.json
+
+With --baseline the run exits non-zero when throughput drops, or p99 rises,
+by more than --max-regression. The default database is a throwaway SQLite
+file; --database-url can point at Postgres, but the benchmark tables are
+dropped and recreated there, so it requires --reset-database.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPPORTUNITIES_PATH = os.path.join(BACKEND_DIR, "data", "simulated_opportunities.json")
+PROFILES_PATH = os.path.join(BACKEND_DIR, "data", "simulated_profiles.json")
+USERS_PATH = os.path.join(BACKEND_DIR, "testing", "simulated_users.json")
+SEEKERS_PATH = os.path.join(BACKEND_DIR, "testing", "simulated_seekers.json")
+
+BENCHMARKS = ("generate_matches", "predict_longevity", "find_matches")
+INSERT_BATCH = 5000
+EXPERIENCE_LEVELS = ["junior", "mid", "senior", "staff", "principal"]
+
+
+# ----------------------------------------------------------------------
+# Corpus
+# ----------------------------------------------------------------------
+
+def _load(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _vocabulary(records: List[Dict[str, Any]], key: str) -> List[str]:
+    return sorted({skill for record in records for skill in record.get(key, [])})
+
+
+def _perturb(skills: List[str], vocabulary: List[str], rng: random.Random) -> List[str]:
+    """Swap one skill for another from the vocabulary so copies are not identical."""
+    if not skills:
+        return skills
+    skills = list(skills)
+    skills[rng.randrange(len(skills))] = rng.choice(vocabulary)
+    return list(dict.fromkeys(skills))
+
+
+def expand(records: List[Dict[str, Any]], scale: int, copy_record: Callable[[Dict[str, Any], int, random.Random], Dict[str, Any]], seed: int) -> Iterator[Dict[str, Any]]:
+    """Yield scale copies of the records; copy 0 is the original data."""
+    for copy in range(scale):
+        rng = random.Random(seed * 1000003 + copy)
+        for record in records:
+            yield copy_record(record, copy, rng)
+
+
+def job_postings(scale: int, seed: int) -> List[Dict[str, Any]]:
+    """Job posting rows from simulated_opportunities.json."""
+    opportunities = _load(OPPORTUNITIES_PATH)
+    vocabulary = _vocabulary(opportunities, "skills")
+    
+    def copy_record(opportunity, copy, rng):
+        required = opportunity.get("requirements") or opportunity.get("skills", [])
+        if copy:
+            required = _perturb(required, vocabulary, rng)
+        return {
+            "title": opportunity["title"],
+            "description": opportunity["description"],
+            "required_skills": required,
+            "preferred_skills": [skill for skill in opportunity.get("skills", []) if skill not in required],
+            "active": opportunity.get("isActive", True),
+        }
+    
+    return list(expand(opportunities, scale, copy_record, seed))
+
+
+def _career_stage(years: int) -> str:
+    if years >= 10:
+        return "senior"
+    if years >= 4:
+        return "mid-career"
+    return "early-career"
+
+
+def _duration_months(duration: str) -> int:
+    try:
+        return int(str(duration).split()[0]) * 12
+    except (ValueError, IndexError):
+        return 0
+
+
+def candidate_profiles(scale: int, seed: int) -> List[Dict[str, Any]]:
+    """User ids and assessment results from simulated_profiles.json."""
+    profiles = _load(PROFILES_PATH)
+    vocabulary = _vocabulary(profiles, "skills")
+    
+    def copy_record(profile, copy, rng):
+        skills = _perturb(profile.get("skills", []), vocabulary, rng) if copy else profile.get("skills", [])
+        years = profile.get("yearsExperience", 0)
+        return {
+            "user_id": f"{profile['anonymousId']}-{copy}",
+            "results": {
+                "strengths": skills,
+                "tool_proficiency_score": min(100, 40 + years * 3),
+                "learning_goals": rng.sample(vocabulary, 3),
+                "work_style": {"remote": profile.get("preferences", {}).get("workType")},
+                "career_stage": _career_stage(years),
+                "past_engagements": [
+                    {"duration_months": _duration_months(job.get("duration"))}
+                    for job in profile.get("experience", [])
+                ],
+                "compensation_expectations": {"min": profile.get("preferences", {}).get("salaryMin", 0)},
+            },
+        }
+    
+    return list(expand(profiles, scale, copy_record, seed))
+
+
+def capability_records(scale: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """Zero-knowledge capabilities from simulated_users.json plus the candidate profiles."""
+    users = _load(USERS_PATH)
+    profiles = _load(PROFILES_PATH)
+    base = [dict(user["capabilities"], user_id=user["user_id"]) for user in users]
+    for profile in profiles:
+        years = profile.get("yearsExperience", 0)
+        base.append({
+            "user_id": profile["anonymousId"],
+            "skills": profile.get("skills", []),
+            "experience_years": years,
+            "availability": str(profile.get("preferences", {}).get("employmentType", "")).lower(),
+            "rate_range": EXPERIENCE_LEVELS[min(len(EXPERIENCE_LEVELS) - 1, years // 4)],
+            "industries": [profile.get("field", "")],
+            "currently_available": True,
+        })
+    vocabulary = _vocabulary(base, "skills")
+    
+    def copy_record(capabilities, copy, rng):
+        record = dict(capabilities, user_id=f"{capabilities['user_id']}-{copy}")
+        if copy:
+            record["skills"] = _perturb(capabilities.get("skills", []), vocabulary, rng)
+        return record
+    
+    return {record["user_id"]: record for record in expand(base, scale, copy_record, seed)}
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+def _rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies: List[float], wall_seconds: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    
+    def percentile(fraction: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(count - 1, int(fraction * count))] * 1000, 4)
+    
+    return {
+        "operations": count,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(count / wall_seconds, 2) if wall_seconds > 0 else None,
+        "mean_ms": round(sum(ordered) / count * 1000, 4) if count else None,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else None,
+    }
+
+
+def _timed(operations: List[Callable[[], Any]], warmup: int) -> Dict[str, Any]:
+    for operation in operations[:warmup]:
+        operation()
+    latencies = []
+    started = time.perf_counter()
+    for operation in operations:
+        before = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - before)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def _bulk_insert(session, model, rows: List[Dict[str, Any]]) -> None:
+    from sqlalchemy import insert
+    for start in range(0, len(rows), INSERT_BATCH):
+        session.execute(insert(model), rows[start:start + INSERT_BATCH])
+    session.commit()
+
+
+def seed_matching_database(engine, scale: int, seed: int) -> List[Dict[str, Any]]:
+    """Recreate the matching tables and load the corpus; returns the candidate profiles."""
+    from sqlalchemy.orm import sessionmaker
+    from database.models import AnonymousUser, Base, CapabilityAssessment, JobPosting
+    from resilience.state_management import Base as StateBase
+    
+    for metadata in (Base.metadata, StateBase.metadata):
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+    
+    jobs = job_postings(scale, seed)
+    profiles = candidate_profiles(scale, seed)
+    now = datetime.utcnow()
+    with sessionmaker(bind=engine)() as session:
+        _bulk_insert(session, JobPosting, [dict(job, created_at=now) for job in jobs])
+        _bulk_insert(session, AnonymousUser, [
+            {"id": profile["user_id"], "created_at": now, "last_active": now} for profile in profiles
+        ])
+        _bulk_insert(session, CapabilityAssessment, [
+            {
+                "user_id": profile["user_id"],
+                "assessment_type": "ai_tool_proficiency",
+                "results": profile["results"],
+                "human_reviewed": False,
+                "created_at": now,
+            }
+            for profile in profiles
+        ])
+    return profiles
+
+
+def bench_generate_matches(scale: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import sessionmaker
+    from database.models import JobPosting
+    from ai.matching_engine import create_matching_engine
+    
+    workdir = None
+    database_url = options["database_url"]
+    if not database_url:
+        workdir = tempfile.mkdtemp(prefix="matching-benchmark-")
+        database_url = f"sqlite:///{os.path.join(workdir, 'benchmark.sqlite3')}"
+    
+    engine = create_engine(database_url)
+    try:
+        profiles = seed_matching_database(engine, scale, options["seed"])
+        Session = sessionmaker(bind=engine)
+        with Session() as session:
+            corpus = {"job_postings": session.scalar(select(func.count()).select_from(JobPosting)), "profiles": len(profiles)}
+        rss_after_load = _rss_mb()
+        
+        rng = random.Random(options["seed"])
+        user_ids = [profile["user_id"] for profile in rng.sample(profiles, min(options["samples"], len(profiles)))]
+        del profiles
+        
+        with Session() as session:
+            matching = create_matching_engine(session)
+            operations = [lambda user_id=user_id: matching.generate_matches(user_id, limit=10) for user_id in user_ids]
+            result = _timed(operations, options["warmup"])
+        return {"corpus": corpus, "rss_after_setup_mb": rss_after_load, **result}
+    finally:
+        engine.dispose()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_predict_longevity(scale: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    from ai.longevity_predictor import create_longevity_predictor
+    
+    jobs = [
+        {
+            "required_skills": job["required_skills"],
+            "preferred_skills": job["preferred_skills"],
+            "work_style": {},
+            "compensation": {},
+        }
+        for job in job_postings(scale, options["seed"])
+    ]
+    profiles = [dict(profile["results"], skills=profile["results"]["strengths"]) for profile in candidate_profiles(scale, options["seed"])]
+    corpus = {"job_postings": len(jobs), "profiles": len(profiles)}
+    rss_after_setup = _rss_mb()
+    
+    predictor = create_longevity_predictor()
+    rng = random.Random(options["seed"])
+    operations = []
+    for _ in range(options["pairs"]):
+        user_profile, job = rng.choice(profiles), rng.choice(jobs)
+        compatibility = rng.randint(40, 100)
+        operations.append(lambda u=user_profile, j=job, c=compatibility: predictor.predict_longevity(u, j, c))
+    return {"corpus": corpus, "rss_after_setup_mb": rss_after_setup, **_timed(operations, options["warmup"])}
+
+
+def bench_find_matches(scale: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    from api.zero_knowledge_matching import CAPABILITIES_DB, CapabilityMatcher, MatchRequest
+    
+    CAPABILITIES_DB.clear()
+    CAPABILITIES_DB.update(capability_records(scale, options["seed"]))
+    corpus = {"capabilities": len(CAPABILITIES_DB)}
+    rss_after_setup = _rss_mb()
+    
+    requests = [
+        MatchRequest(
+            seeking_skills=seeker["seeking_skills"],
+            experience_level=seeker.get("experience_level"),
+            availability_type=seeker.get("availability_needed"),
+            industries=seeker.get("industries"),
+            remote_ok=seeker.get("remote_ok"),
+            max_results=10
+        )
+        for seeker in _load(SEEKERS_PATH)
+    ]
+    operations = [
+        lambda request=requests[i % len(requests)]: CapabilityMatcher.find_matches(request, request.max_results)
+        for i in range(options["queries"])
+    ]
+    return {"corpus": corpus, "rss_after_setup_mb": rss_after_setup, **_timed(operations, options["warmup"])}
+
+
+_BENCHMARK_FUNCTIONS = {
+    "generate_matches": bench_generate_matches,
+    "predict_longevity": bench_predict_longevity,
+    "find_matches": bench_find_matches,
+}
+
+
+def run_case(benchmark: str, scale: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one benchmark at one scale (in the current process)."""
+    logging.getLogger().setLevel(logging.WARNING)
+    started = time.perf_counter()
+    result = _BENCHMARK_FUNCTIONS[benchmark](scale, options)
+    return {
+        "benchmark": benchmark,
+        "scale": scale,
+        **result,
+        "peak_rss_mb": _rss_mb(),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'benchmark':<18} {'scale':>5} {'ops':>7} {'ops/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+    for result in results:
+        print(
+            f"{result['benchmark']:<18} {result['scale']:>4}x {result['operations']:>7} "
+            f"{result['throughput_per_second'] or 0:>11.1f} {result['p50_ms'] or 0:>9.3f} "
+            f"{result['p99_ms'] or 0:>9.3f} {result['peak_rss_mb'] or 0:>12.1f}"
+        )
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regressions against a previous report, as messages."""
+    previous = {(r["benchmark"], r["scale"]): r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\nAgainst baseline {baseline.get('git_commit') or ''} ({baseline.get('created_at', 'unknown date')}):")
+    for result in results:
+        before = previous.get((result["benchmark"], result["scale"]))
+        if not before or not before.get("throughput_per_second") or not before.get("p99_ms"):
+            continue
+        throughput_change = result["throughput_per_second"] / before["throughput_per_second"] - 1
+        p99_change = result["p99_ms"] / before["p99_ms"] - 1
+        print(f"  {result['benchmark']} {result['scale']}x: throughput {throughput_change:+.1%}, p99 {p99_change:+.1%}")
+        if throughput_change < -max_regression:
+            regressions.append(f"{result['benchmark']} {result['scale']}x throughput {throughput_change:+.1%}")
+        if p99_change > max_regression:
+            regressions.append(f"{result['benchmark']} {result['scale']}x p99 {p99_change:+.1%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the matching hot paths on the simulated corpus")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100], help="Corpus expansion factors")
+    parser.add_argument("--samples", type=int, default=50, help="generate_matches calls (distinct users)")
+    parser.add_argument("--pairs", type=int, default=20000, help="predict_longevity calls")
+    parser.add_argument("--queries", type=int, default=200, help="find_matches calls")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls before measuring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="Default: a temporary SQLite file")
+    parser.add_argument("--reset-database", action="store_true", help="Allow dropping tables in --database-url")
+    parser.add_argument("--no-isolate", action="store_true", help="Run every case in this process (peak RSS is then cumulative)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Allowed slowdown vs. --baseline (fraction)")
+    args = parser.parse_args(argv)
+    
+    if args.database_url and not args.database_url.startswith("sqlite") and not args.reset_database:
+        parser.error("--database-url drops and recreates the benchmark tables; pass --reset-database to confirm")
+    
+    options = {
+        "samples": args.samples,
+        "pairs": args.pairs,
+        "queries": args.queries,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "database_url": args.database_url,
+    }
+    
+    results = []
+    for benchmark in args.benchmarks:
+        for scale in args.scales:
+            print(f"Running {benchmark} at {scale}x...", file=sys.stderr)
+            if args.no_isolate:
+                results.append(run_case(benchmark, scale, options))
+            else:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    results.append(pool.submit(run_case, benchmark, scale, options).result())
+    
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+        "results": results,
+    }
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions beyond {:.0%}:\n  ".format(args.max_regression) + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
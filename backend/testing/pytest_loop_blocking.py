@@ -0,0 +1,121 @@
+"""
+Pytest plugin: fail tests that block the event loop.
+
+Every test runs under a LoopBlockingDetector; if any event loop callback
+started by the test (an async test body, a TestClient request, a task)
+runs longer than the threshold, the test fails with the blocking stack
+and, for requests, the route.
+
+Enable it from the backend directory with
+
+    pytest -p testing.pytest_loop_blocking
+
+or `pytest_plugins = ["testing.pytest_loop_blocking"]` in a conftest.
+
+Options (command line or ini):
+    --loop-blocking-threshold / loop_blocking_threshold_ms   default 100
+    --loop-blocking-mode / loop_blocking_mode               fail | warn | off
+
+Markers:
+    @pytest.mark.allow_loop_blocking                 never fail this test
+    @pytest.mark.loop_blocking_threshold(250)        per-test threshold (ms)
+
+Fixture:
+    loop_blocking_events   the events recorded so far in the current test
+
+The plugin turns on LOOP_BLOCKING_DEBUG (unless set) so an app imported
+by the tests names the route in its reports.
+"""
+import os
+import warnings
+from typing import List
+
+import pytest
+
+from monitoring.loop_blocking import BlockingEvent, LoopBlockingDetector
+
+_EVENTS_KEY = pytest.StashKey[List[BlockingEvent]]()
+
+
+class LoopBlockingWarning(UserWarning):
+    """A test blocked the event loop (mode "warn")."""
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("loop-blocking", "event loop blocking detection")
+    group.addoption(
+        "--loop-blocking-threshold",
+        type=float,
+        default=None,
+        help="Fail tests whose event loop callbacks run longer than this many ms (default 100)"
+    )
+    group.addoption(
+        "--loop-blocking-mode",
+        choices=("fail", "warn", "off"),
+        default=None,
+        help="What to do with tests that block the loop (default fail)"
+    )
+    parser.addini("loop_blocking_threshold_ms", "Loop blocking threshold in ms", default="100")
+    parser.addini("loop_blocking_mode", "fail, warn or off", default="fail")
+
+
+def pytest_configure(config):
+    os.environ.setdefault("LOOP_BLOCKING_DEBUG", "true")
+    config.addinivalue_line("markers", "allow_loop_blocking: do not fail this test for blocking the event loop")
+    config.addinivalue_line("markers", "loop_blocking_threshold(ms): loop blocking threshold for this test")
+
+
+def _settings(item):
+    config = item.config
+    mode = config.getoption("--loop-blocking-mode") or config.getini("loop_blocking_mode")
+    threshold = config.getoption("--loop-blocking-threshold")
+    if threshold is None:
+        threshold = float(config.getini("loop_blocking_threshold_ms"))
+    marker = item.get_closest_marker("loop_blocking_threshold")
+    if marker is not None and marker.args:
+        threshold = float(marker.args[0])
+    if item.get_closest_marker("allow_loop_blocking") is not None:
+        mode = "off"
+    return mode, threshold
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    mode, threshold = _settings(item)
+    if mode == "off":
+        yield
+        return
+    
+    detector = LoopBlockingDetector(threshold)
+    item.stash[_EVENTS_KEY] = detector.events
+    with detector:
+        yield
+    events = list(detector.events)
+    if events and mode == "warn":
+        for event in events:
+            warnings.warn(LoopBlockingWarning(event.describe()))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when != "call" or not report.passed:
+        return
+    mode, threshold = _settings(item)
+    events = list(item.stash.get(_EVENTS_KEY, ()))
+    if mode != "fail" or not events:
+        return
+    
+    details = "\n\n".join(event.describe() for event in events)
+    report.outcome = "failed"
+    report.longrepr = (
+        f"{len(events)} event loop callback(s) ran longer than {threshold:g}ms. Move blocking calls off "
+        f"the loop (run_in_executor / a sync route) or mark the test allow_loop_blocking.\n\n{details}"
+    )
+
+
+@pytest.fixture
+def loop_blocking_events(request):
+    """Blocking events recorded so far in this test (empty when the plugin is off for it)."""
+    return request.node.stash.get(_EVENTS_KEY, [])
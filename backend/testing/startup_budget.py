@@ -0,0 +1,191 @@
+"""
+Startup Import Report and Budget.
+Measures what `import main` costs in a fresh interpreter (the bulk of a
+cold start on Cloud Run), broken down per module and per package, and
+fails when it exceeds a budget or pulls in an SDK that must load lazily.
+
+Usage (from backend/):
+    python -m testing.startup_budget                      # report + checks
+    python -m testing.startup_budget --budget-ms 1200 --runs 5
+    python -m testing.startup_budget --module loadtest.app --allow stripe
+
+Checks (exit status 1 on failure):
+    budget     median cumulative import time of --module <= --budget-ms
+    deferred   none of DEFERRED_MODULES is imported by --module; these
+               SDKs are imported on first use by the code that needs them
+
+The import time is taken from `python -X importtime`, so it excludes
+interpreter startup and includes the tracing overhead (a few percent).
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported lazily by the backend (on first use); importing main must not load them
+DEFERRED_MODULES = (
+    "openai",
+    "elasticsearch",
+    "twilio",
+    "stripe",
+    "boto3",
+    "botocore",
+    "google.oauth2",
+    "googleapiclient.discovery",
+    "aiohttp",
+    "httpx",
+)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(module: str = "main", env: Optional[Dict[str, str]] = None) -> List[ImportRecord]:
+    """Import module in a fresh interpreter under -X importtime and parse the trace."""
+    run_env = dict(os.environ)
+    run_env.setdefault("ENVIRONMENT", "development")
+    run_env.update(env or {})
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=run_env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    
+    records = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            records.append(ImportRecord(match[4], int(match[1]), int(match[2]), len(match[3]) // 2))
+    return records
+
+
+def _first_party() -> set:
+    names = {"main", "config"}
+    for entry in os.listdir(BACKEND_DIR):
+        if os.path.isfile(os.path.join(BACKEND_DIR, entry, "__init__.py")):
+            names.add(entry)
+    return names
+
+
+def summarize(records: List[ImportRecord], module: str, top: int = 15) -> Dict[str, object]:
+    """Total, slowest first-party modules (cumulative) and heaviest packages (self time)."""
+    first_party = _first_party()
+    target = next((r for r in records if r.module == module), None)
+    
+    packages: Dict[str, int] = defaultdict(int)
+    for record in records:
+        packages[record.module.split(".")[0]] += record.self_us
+    
+    own = [r for r in records if r.module.split(".")[0] in first_party and r.module != module]
+    imported = {r.module for r in records}
+    return {
+        "module": module,
+        "import_ms": round(target.cumulative_us / 1000, 1) if target else None,
+        "modules_imported": len(records),
+        "slowest_backend_modules": [
+            {"module": r.module, "cumulative_ms": round(r.cumulative_us / 1000, 1)}
+            for r in sorted(own, key=lambda r: r.cumulative_us, reverse=True)[:top]
+        ],
+        "heaviest_packages": [
+            {"package": name, "self_ms": round(us / 1000, 1), "first_party": name in first_party}
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "deferred_imported": [name for name in DEFERRED_MODULES if name in imported],
+    }
+
+
+def _import_chain(records: List[ImportRecord], name: str) -> List[str]:
+    """Modules that were importing when `name` was first imported, outermost first.
+    
+    importtime prints a module after its children, so the importer of a
+    record is the next record at a shallower depth.
+    """
+    index = next(i for i, r in enumerate(records) if r.module == name)
+    chain = [name]
+    depth = records[index].depth
+    for record in records[index + 1:]:
+        if record.depth < depth:
+            chain.append(record.module)
+            depth = record.depth
+    return list(reversed(chain))
+
+
+def print_report(summary: Dict[str, object], runs_ms: List[float]) -> None:
+    print(f"import {summary['module']}: median {statistics.median(runs_ms):.1f}ms over {len(runs_ms)} run(s) "
+          f"({', '.join(f'{ms:.0f}' for ms in runs_ms)}), {summary['modules_imported']} modules")
+    print("\nSlowest backend modules (cumulative):")
+    for row in summary["slowest_backend_modules"]:
+        print(f"  {row['cumulative_ms']:>8.1f}ms  {row['module']}")
+    print("\nHeaviest packages (self time of all their modules):")
+    for row in summary["heaviest_packages"]:
+        print(f"  {row['self_ms']:>8.1f}ms  {row['package']}{'' if not row['first_party'] else '  (backend)'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report import time at startup and enforce a budget")
+    parser.add_argument("--module", default="main", help="Module to import (default main)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure; the median is checked")
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Maximum median import time")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    parser.add_argument("--allow", nargs="+", default=[], help="Deferred modules this --module may import")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+    
+    runs = [measure_imports(args.module) for _ in range(max(1, args.runs))]
+    runs_ms = [
+        next(r.cumulative_us for r in records if r.module == args.module) / 1000
+        for records in runs
+    ]
+    # Report the median run, so the breakdown matches the checked number
+    median_run = sorted(zip(runs_ms, runs), key=lambda pair: pair[0])[len(runs) // 2][1]
+    summary = summarize(median_run, args.module, args.top)
+    print_report(summary, runs_ms)
+    
+    failures = []
+    median_ms = statistics.median(runs_ms)
+    if median_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {median_ms:.0f}ms, budget {args.budget_ms:.0f}ms")
+    unexpected = [name for name in summary["deferred_imported"] if name not in args.allow]
+    for name in unexpected:
+        chain = _import_chain(median_run, name)
+        failures.append(f"{name} is imported at startup (via {' -> '.join(chain)}); import it on first use")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                **summary,
+                "runs_ms": [round(ms, 1) for ms in runs_ms],
+                "budget_ms": args.budget_ms,
+                "failures": failures,
+                "records": [asdict(r) for r in median_run],
+            }, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    
+    if failures:
+        print("\nStartup checks failed:\n  " + "\n  ".join(failures))
+        return 1
+    print(f"\nStartup checks passed (budget {args.budget_ms:.0f}ms, no deferred SDKs imported)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
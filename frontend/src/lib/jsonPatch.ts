@@ -0,0 +1,37 @@
+// Minimal RFC 6902 JSON Patch applier for agent state streams.
+// Supports the add/replace/remove ops the backend emits; returns a new
+// object and leaves the input untouched (safe for React state).
+
+export interface PatchOperation {
+  op: 'add' | 'replace' | 'remove'
+  path: string
+  value?: unknown
+}
+
+const unescapeToken = (token: string) => token.replace(/~1/g, '/').replace(/~0/g, '~')
+
+export function applyPatch<T extends Record<string, any>>(doc: T, ops: PatchOperation[]): T {
+  let result: any = doc
+  for (const { op, path, value } of ops) {
+    if (path === '') {
+      result = op === 'remove' ? {} : value
+      continue
+    }
+    const tokens = path.split('/').slice(1).map(unescapeToken)
+    const root = Array.isArray(result) ? [...result] : { ...result }
+    let parent: any = root
+    for (const token of tokens.slice(0, -1)) {
+      const child = parent[token]
+      parent[token] = Array.isArray(child) ? [...child] : { ...(child ?? {}) }
+      parent = parent[token]
+    }
+    const last = tokens[tokens.length - 1]
+    if (op === 'remove') {
+      delete parent[last]
+    } else {
+      parent[last] = value
+    }
+    result = root
+  }
+  return result
+}
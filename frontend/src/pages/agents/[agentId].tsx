@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react'
 import { useParams } from 'react-router-dom'
 import { AgentUIRenderer } from '@/components/agent/AgentUIRenderer'
 import { AgentUISchema } from '@/schemas/ui-schema'
+import { applyPatch } from '@/lib/jsonPatch'
 
 export default function AgentPage() {
   const { agentId } = useParams<{ agentId: string }>()
@@ -47,22 +48,21 @@ export default function AgentPage() {
         const update = JSON.parse(event.data)
         setSchema(prev => {
           if (!prev) return null
-          return {
-            ...prev,
-            state: {
-              ...prev.state,
-              ...update.state
-            }
-          }
+          // First frame (and any resync) is a full snapshot, then JSON Patches
+          const state = update.type === 'patch'
+            ? applyPatch(prev.state ?? {}, update.patch)
+            : update.state
+          return { ...prev, state }
         })
       } catch (err) {
         console.error('Error parsing SSE message:', err)
       }
     }
 
+    // Let EventSource reconnect on its own; it resends Last-Event-ID so
+    // the server replays only the patches we missed
     eventSource.onerror = () => {
       setConnected(false)
-      eventSource.close()
     }
 
     return () => {
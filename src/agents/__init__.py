@@ -34,6 +34,7 @@ from src.agents.candidate_profile_analyzer import CandidateProfileAnalyzerAgent
 from src.agents.bias_detection_agent import BiasDetectionAgent
 from src.agents.matching_agent import MatchingAgent
 from src.agents.data_ingestion_agent import DataIngestionAgent
+from src.agents.analysis_store import AnalysisStore, get_analysis_store
 
 __all__ = [
     "Agent",
@@ -43,5 +44,7 @@ __all__ = [
     "BiasDetectionAgent",
     "MatchingAgent",
     "DataIngestionAgent",
+    "AnalysisStore",
+    "get_analysis_store",
 ]
 
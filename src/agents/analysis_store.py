@@ -0,0 +1,192 @@
+"""
+Analysis Store
+
+Memoizes analyzer outputs by normalized-content hash plus a version
+derived from the prompt and model, so unchanged documents are never sent
+to the LLM twice. Entries live in a local SQLite table behind an
+in-memory LRU.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "analysis_store.sqlite3")
+DEFAULT_MEMORY_ENTRIES = 1024
+
+
+def normalize_content(content: str) -> str:
+    """Normalize text so cosmetic differences (whitespace, case, Unicode forms) hash alike."""
+    return " ".join(unicodedata.normalize("NFKC", content).split()).casefold()
+
+
+def analysis_key(kind: str, content: str, version: str) -> str:
+    """Store key for a document of a given kind analyzed under a prompt/model version."""
+    payload = f"{kind}\n{version}\n{normalize_content(content)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisStore:
+    """
+    SQLite-backed analysis cache with an LRU in-memory front.
+    
+    Thread-safe; a single connection is shared behind a lock. A path of
+    None keeps entries in memory only. Callers get their own copies of
+    stored analyses.
+    """
+    
+    def __init__(self, path: Optional[str] = DEFAULT_STORE_PATH, memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0}
+        
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " key TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " analysis TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._db.commit()
+    
+    def get(self, kind: str, content: str, version: str) -> Optional[Dict[str, Any]]:
+        """Return the stored analysis for this content, or None."""
+        key = analysis_key(kind, content, version)
+        with self._lock:
+            analysis = self._memory.get(key)
+            if analysis is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(analysis)
+            
+            row = self._db.execute("SELECT analysis FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            
+            self._stats["db_hits"] += 1
+            analysis = json.loads(row[0])
+            self._remember(key, analysis)
+            return copy.deepcopy(analysis)
+    
+    def put(self, kind: str, content: str, version: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis for this content."""
+        key = analysis_key(kind, content, version)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (key, kind, version, analysis, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, version, json.dumps(analysis, default=str), time.time())
+            )
+            self._db.commit()
+            self._stats["writes"] += 1
+            self._remember(key, copy.deepcopy(analysis))
+    
+    def _remember(self, key: str, analysis: Dict[str, Any]) -> None:
+        self._memory[key] = analysis
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since start-up plus entry counts."""
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["db_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["db_hits"]
+            entries = self._db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            return {
+                **self._stats,
+                "lookups": lookups,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "stored_entries": entries
+            }
+    
+    def clear(self) -> None:
+        """Drop every stored analysis (e.g. after changing normalization)."""
+        with self._lock:
+            self._db.execute("DELETE FROM analyses")
+            self._db.commit()
+            self._memory.clear()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class AnalysisCacheMixin:
+    """
+    Mixin that lets an analyzer agent reuse stored analyses.
+    
+    Subclasses set analysis_kind, and self.llm, self.system_prompt and
+    self.analysis_store; the version changes whenever the prompt or the
+    model does, which invalidates older entries.
+    """
+    
+    analysis_kind: str = ""
+    # Bump when the user prompt template or post-processing changes
+    analysis_prompt_revision: str = "3"
+    
+    @property
+    def analysis_version(self) -> str:
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or type(self.llm).__name__
+        payload = f"{self.analysis_prompt_revision}\n{model}\n{self.system_prompt}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def lookup_analysis(self, content: str) -> Optional[Dict[str, Any]]:
+        """Stored analysis of this content under the current prompt/model, if any."""
+        if self.analysis_store is None or not content:
+            return None
+        return self.analysis_store.get(self.analysis_kind, content, self.analysis_version)
+    
+    def store_analysis(self, content: str, analysis: Dict[str, Any]) -> None:
+        if self.analysis_store is None:
+            return
+        try:
+            self.analysis_store.put(self.analysis_kind, content, self.analysis_version, analysis)
+        except sqlite3.Error as e:
+            # A cache write failure must not fail the analysis
+            logger.warning(f"Could not store {self.analysis_kind} analysis: {e}")
+
+
+# Global analysis store instance
+_analysis_store: Optional[AnalysisStore] = None
+_analysis_store_lock = threading.Lock()
+
+
+def create_analysis_store(path: Optional[str] = None, memory_entries: Optional[int] = None) -> AnalysisStore:
+    """
+    Create an analysis store.
+    
+    The path defaults to ANALYSIS_STORE_PATH (or .cache/analysis_store.sqlite3);
+    set ANALYSIS_STORE_PATH to an empty string to keep entries in memory only.
+    """
+    if path is None:
+        path = os.getenv("ANALYSIS_STORE_PATH", DEFAULT_STORE_PATH) or None
+    if memory_entries is None:
+        memory_entries = int(os.getenv("ANALYSIS_STORE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES))
+    return AnalysisStore(path=path, memory_entries=memory_entries)
+
+
+def get_analysis_store() -> AnalysisStore:
+    """Get or create the global analysis store."""
+    global _analysis_store
+    with _analysis_store_lock:
+        if _analysis_store is None:
+            _analysis_store = create_analysis_store()
+        return _analysis_store
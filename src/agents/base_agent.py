@@ -5,14 +5,21 @@ Provides a foundation for creating custom agents with standard lifecycle methods
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Callable, ContextManager, Dict, Any, List, Optional
 from datetime import datetime
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 class BaseAgent(ABC):
     """Base class for all agents in the system."""
     
+    # Optional instrumentation: called as phase_hook(agent, phase) and
+    # entered around run and each of its perceive/decide/act phases
+    phase_hook: Optional[Callable[["BaseAgent", str], ContextManager[Any]]] = None
+    
     def __init__(
         self,
         agent_id: Optional[str] = None,
@@ -26,6 +33,7 @@ class BaseAgent(ABC):
         self.capabilities = capabilities or []
         self.created_at = datetime.utcnow()
         self.state: Dict[str, Any] = {}
+        self._state_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
     
     @abstractmethod
     def perceive(self, environment: Dict[str, Any]) -> Dict[str, Any]:
@@ -44,9 +52,20 @@ class BaseAgent(ABC):
     
     def run(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the full agent lifecycle: perceive -> decide -> act."""
-        perception = self.perceive(environment)
-        decision = self.decide(perception)
-        result = self.act(decision)
+        hook = self.phase_hook
+        if hook is None:
+            perception = self.perceive(environment)
+            decision = self.decide(perception)
+            result = self.act(decision)
+            return result
+        
+        with hook(self, "run"):
+            with hook(self, "perceive"):
+                perception = self.perceive(environment)
+            with hook(self, "decide"):
+                decision = self.decide(perception)
+            with hook(self, "act"):
+                result = self.act(decision)
         return result
     
     def get_state(self) -> Dict[str, Any]:
@@ -54,8 +73,23 @@ class BaseAgent(ABC):
         return self.state.copy()
     
     def update_state(self, updates: Dict[str, Any]) -> None:
-        """Update the agent state."""
+        """Update the agent state and notify listeners of the changed keys."""
         self.state.update(updates)
+        for listener in list(self._state_listeners):
+            # A failing listener (SSE broadcast, bus publish) must not break the agent
+            try:
+                listener(self.agent_id, updates)
+            except Exception as e:
+                logger.error(f"State listener {listener!r} failed for agent {self.agent_id}: {e}", exc_info=True)
+    
+    def add_state_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call listener(agent_id, updates) after every update_state."""
+        self._state_listeners.append(listener)
+    
+    def remove_state_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Stop notifying a listener."""
+        if listener in self._state_listeners:
+            self._state_listeners.remove(listener)
     
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}(id={self.agent_id}, name={self.name})>"
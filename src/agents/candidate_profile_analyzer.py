@@ -7,10 +7,19 @@ experience, and education for accurate matching.
 
 from typing import Dict, Any, List, Optional
 from src.agents.base_agent import BaseAgent
+from src.agents.analysis_store import AnalysisCacheMixin, AnalysisStore, get_analysis_store
+from src.agents.chunking import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_CONCURRENCY,
+    chunk_document,
+    first_non_empty,
+    map_chunks,
+    merge_unique
+)
 from src.models import LanguageModel
 
 
-class CandidateProfileAnalyzerAgent(BaseAgent):
+class CandidateProfileAnalyzerAgent(BaseAgent, AnalysisCacheMixin):
     """
     Analyzes candidate profiles/resumes to extract structured information.
     
@@ -23,13 +32,21 @@ class CandidateProfileAnalyzerAgent(BaseAgent):
         'keywords': List[str],
         'ambiguities': List[str]  # Flags any ambiguous content
     }
+    
+    Analyses are memoized in an AnalysisStore keyed by content hash and
+    prompt/model version (the global store unless one is passed in).
     """
     
+    analysis_kind = "candidate_profile"
+    
     def __init__(
         self,
         llm: LanguageModel,
         agent_id: Optional[str] = None,
-        name: Optional[str] = None
+        name: Optional[str] = None,
+        analysis_store: Optional[AnalysisStore] = None,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY
     ):
         super().__init__(
             agent_id=agent_id,
@@ -38,6 +55,9 @@ class CandidateProfileAnalyzerAgent(BaseAgent):
             capabilities=["nlp", "extraction", "analysis"]
         )
         self.llm = llm
+        self.analysis_store = analysis_store if analysis_store is not None else get_analysis_store()
+        self.chunk_chars = chunk_chars
+        self.chunk_concurrency = chunk_concurrency
         self.system_prompt = """You are an expert in analyzing candidate resumes and profiles to extract 
 relevant skills, experience, and education. Your goal is to create a structured representation of a 
 candidate's profile that can be used for accurate matching.
@@ -51,7 +71,7 @@ Output should be a JSON object with the following keys:
 - 'ambiguities': A list of any ambiguous or unclear aspects of the profile
 
 Be extremely thorough and consider edge cases. If the profile is ambiguous, flag it and explain the ambiguity."""
-    
+
     def perceive(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """Extract candidate profile from environment."""
         candidate_profile = environment.get("candidate_profile", "")
@@ -88,14 +108,51 @@ Be extremely thorough and consider edge cases. If the profile is ambiguous, flag
         """Execute candidate profile analysis using LLM."""
         candidate_profile = decision["candidate_profile"]
         
+        cached = self.lookup_analysis(candidate_profile)
+        if cached is not None:
+            self.update_state({
+                "last_analysis": cached,
+                "cache_hits": self.state.get("cache_hits", 0) + 1
+            })
+            return {
+                "status": "success",
+                "analysis": cached,
+                "cached": True,
+                "agent_id": self.agent_id
+            }
+        
+        if decision["analysis_strategy"].get("chunking_needed"):
+            # Map-reduce: analyze sections concurrently, then merge
+            chunks = chunk_document(candidate_profile, self.chunk_chars)
+            analysis_result = self._merge_analyses(map_chunks(self._analyze_text, chunks, self.chunk_concurrency))
+        else:
+            analysis_result = self._analyze_text(candidate_profile)
+        
+        self.store_analysis(candidate_profile, analysis_result)
+        
+        # Update agent state
+        self.update_state({
+            "last_analysis": analysis_result,
+            "analysis_count": self.state.get("analysis_count", 0) + 1
+        })
+        
+        return {
+            "status": "success",
+            "analysis": analysis_result,
+            "agent_id": self.agent_id
+        }
+    
+    def _analyze_text(self, text: str, index: int = 0, total: int = 1) -> Dict[str, Any]:
+        """Run one LLM extraction over text (the whole document or one chunk of it)."""
         # Construct the prompt
-        user_prompt = f"""Analyze the following candidate profile/resume and extract structured information:
+        part_note = f" (part {index + 1} of {total} of a longer document; report only what this part contains)" if total > 1 else ""
+        user_prompt = f"""Analyze the following candidate profile/resume{part_note} and extract structured information:
 
-{candidate_profile}
+{text}
 
 Provide your analysis as a JSON object with the keys: skills, experience_years, education, 
 summary, keywords, and ambiguities."""
-        
+
         # Call LLM
         response = self.llm.generate(
             prompt=user_prompt,
@@ -135,15 +192,30 @@ summary, keywords, and ambiguities."""
         if isinstance(analysis_result.get('education'), str):
             analysis_result['education'] = []
         
-        # Update agent state
-        self.update_state({
-            "last_analysis": analysis_result,
-            "analysis_count": self.state.get("analysis_count", 0) + 1
-        })
+        return analysis_result
+    
+    def _merge_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reduce per-chunk analyses into one.
+        
+        Lists are concatenated in chunk order without repeats, the summary
+        comes from the first chunk that has one, and experience_years is
+        the largest any chunk reports (chunks each see part of the history).
+        """
+        years = []
+        for analysis in analyses:
+            try:
+                years.append(float(analysis.get("experience_years") or 0))
+            except (TypeError, ValueError):
+                continue
+        experience_years = max(years) if years else 0
         
         return {
-            "status": "success",
-            "analysis": analysis_result,
-            "agent_id": self.agent_id
+            "skills": merge_unique(a.get("skills") for a in analyses),
+            "experience_years": int(experience_years) if float(experience_years).is_integer() else experience_years,
+            "education": merge_unique(a.get("education") for a in analyses),
+            "summary": first_non_empty(a.get("summary") for a in analyses),
+            "keywords": merge_unique(a.get("keywords") for a in analyses),
+            "ambiguities": merge_unique(a.get("ambiguities") for a in analyses),
+            "chunks_analyzed": len(analyses)
         }
-
@@ -0,0 +1,152 @@
+"""
+Long Document Chunking
+
+Helpers for the analyzers' map-reduce mode: split a long document along
+its section structure, analyze the chunks concurrently, and merge the
+partial analyses deterministically (chunk order decides ties).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Iterable, List
+import json
+
+DEFAULT_CHUNK_CHARS = 4000
+DEFAULT_CHUNK_CONCURRENCY = 4
+_MIN_CHUNK_FRACTION = 8  # Leftovers under max_chars / 8 join the next chunk instead of standing alone
+
+_SECTION_WORDS = (
+    "about", "summary", "overview", "objective", "profile", "responsibilities", "duties",
+    "requirements", "qualifications", "skills", "experience", "education", "benefits",
+    "certifications", "projects", "what you", "who you", "nice to have", "preferred"
+)
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 80:
+        return False
+    if stripped.startswith("#"):
+        return True
+    if len(stripped.split()) > 6:
+        return False
+    letters = [c for c in stripped if c.isalpha()]
+    if stripped.endswith(":") or (len(letters) >= 3 and all(c.isupper() for c in letters)):
+        return True
+    # Headings are often unpunctuated ("Requirements", "What you'll do")
+    lowered = stripped.lower().strip("*_ ")
+    return any(lowered.startswith(word) for word in _SECTION_WORDS)
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text at heading-like lines; each section keeps its heading."""
+    sections: List[List[str]] = [[]]
+    for line in text.splitlines():
+        if _is_heading(line) and any(l.strip() for l in sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(lines).strip() for lines in sections if any(l.strip() for l in lines)]
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """
+    Break a section that alone exceeds max_chars at paragraph, then line,
+    then hard boundaries. A leading heading stays with the first part
+    rather than becoming a chunk of its own.
+    """
+    heading, _, body = section.partition("\n")
+    if body.strip() and _is_heading(heading) and len(heading) < max_chars // 2:
+        chunks = _split_body(body, max_chars - len(heading) - 1)
+        chunks[0] = f"{heading}\n{chunks[0]}"
+        return chunks
+    return _split_body(section, max_chars)
+
+
+def _split_body(section: str, max_chars: int) -> List[str]:
+    for separator in ("\n\n", "\n"):
+        parts = [part for part in section.split(separator) if part.strip()]
+        if len(parts) > 1:
+            return _pack(parts, max_chars, separator)
+    return [section[i:i + max_chars] for i in range(0, len(section), max_chars)]
+
+
+def _pack(parts: List[str], max_chars: int, separator: str) -> List[str]:
+    """
+    Greedily join parts into chunks of at most max_chars. A short leftover
+    (a title line, say) that does not fit with the next part is carried
+    into that part's first piece rather than becoming a chunk of its own.
+    """
+    chunks: List[str] = []
+    current = ""
+    for part in parts:
+        candidate = f"{current}{separator}{part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current and len(current) < max_chars // _MIN_CHUNK_FRACTION:
+            pieces = _split_oversized(part, max_chars - len(current) - len(separator))
+            pieces[0] = f"{current}{separator}{pieces[0]}"
+        else:
+            if current:
+                chunks.append(current)
+            pieces = _split_oversized(part, max_chars) if len(part) > max_chars else [part]
+        current = pieces.pop()  # The last piece can still take the parts that follow
+        chunks.extend(pieces)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_document(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[str]:
+    """Pack whole sections into chunks of at most max_chars."""
+    return _pack(split_sections(text), max_chars, "\n\n")
+
+
+def map_chunks(
+    analyze: Callable[[str, int, int], Dict[str, Any]],
+    chunks: List[str],
+    max_workers: int = DEFAULT_CHUNK_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Run analyze(chunk, index, total) over the chunks concurrently; results
+    keep chunk order. Each call runs in a copy of the caller's context
+    (so tracing spans nest under the caller's).
+    """
+    total = len(chunks)
+    if total == 1:
+        return [analyze(chunks[0], 0, 1)]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)), thread_name_prefix="analyze-chunk") as pool:
+        futures = [pool.submit(copy_context().run, analyze, chunk, index, total) for index, chunk in enumerate(chunks)]
+        return [future.result() for future in futures]
+
+
+def merge_unique(lists: Iterable[Any]) -> List[Any]:
+    """
+    Concatenate lists, dropping repeats.
+
+    Strings compare case- and whitespace-insensitively (first spelling
+    wins); other values compare by their JSON form.
+    """
+    seen = set()
+    merged = []
+    for values in lists:
+        if not isinstance(values, list):
+            continue
+        for value in values:
+            if isinstance(value, str):
+                key = " ".join(value.split()).casefold()
+                if not key:
+                    continue
+            else:
+                key = json.dumps(value, sort_keys=True, default=str)
+            if key not in seen:
+                seen.add(key)
+                merged.append(value)
+    return merged
+
+
+def first_non_empty(values: Iterable[Any], default: Any = "") -> Any:
+    for value in values:
+        if value:
+            return value
+    return default
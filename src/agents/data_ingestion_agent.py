@@ -125,10 +125,15 @@ class DataIngestionAgent(BaseAgent):
                 "agent_id": self.agent_id
             }
         
-        # Step 2: Analyze content using appropriate analyzer
+        # Step 2: Analyze content using appropriate analyzer, unless it
+        # already has a stored analysis of this exact content
+        analyzer = self.job_analyzer if decision["use_job_analyzer"] else self.candidate_analyzer
         analysis_result = None
+        cached = analyzer.lookup_analysis(content) if hasattr(analyzer, "lookup_analysis") else None
         try:
-            if decision["use_job_analyzer"]:
+            if cached is not None:
+                analysis_result = {"status": "success", "analysis": cached, "cached": True}
+            elif decision["use_job_analyzer"]:
                 analysis_result = self.job_analyzer.run({
                     "job_description": content,
                     "source": source
@@ -163,6 +168,7 @@ class DataIngestionAgent(BaseAgent):
         # Update agent state
         self.update_state({
             "ingestion_count": self.state.get("ingestion_count", 0) + 1,
+            "analysis_cache_hits": self.state.get("analysis_cache_hits", 0) + (1 if cached is not None else 0),
             "last_ingestion": {
                 "content_type": content_type,
                 "source": source,
@@ -175,6 +181,7 @@ class DataIngestionAgent(BaseAgent):
             "content_type": content_type,
             "source": source,
             "analysis": analysis_result.get("analysis") if analysis_result else None,
+            "analysis_cached": cached is not None,
             "storage_result": storage_result,
             "errors": errors,
             "agent_id": self.agent_id
@@ -7,10 +7,22 @@ key skills, experience levels, and responsibilities for accurate matching.
 
 from typing import Dict, Any, List, Optional
 from src.agents.base_agent import BaseAgent
+from src.agents.analysis_store import AnalysisCacheMixin, AnalysisStore, get_analysis_store
+from src.agents.chunking import (
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CHUNK_CONCURRENCY,
+    chunk_document,
+    first_non_empty,
+    map_chunks,
+    merge_unique
+)
 from src.models import LanguageModel
 
+# Ordered from least to most senior; used when merging chunk analyses
+EXPERIENCE_LEVELS = ["entry", "junior", "mid", "senior", "lead", "principal", "executive"]
 
-class JobDescriptionAnalyzerAgent(BaseAgent):
+
+class JobDescriptionAnalyzerAgent(BaseAgent, AnalysisCacheMixin):
     """
     Analyzes job descriptions to extract structured information.
     
@@ -23,13 +35,21 @@ class JobDescriptionAnalyzerAgent(BaseAgent):
         'keywords': List[str],
         'ambiguities': List[str]  # Flags any ambiguous content
     }
+    
+    Analyses are memoized in an AnalysisStore keyed by content hash and
+    prompt/model version (the global store unless one is passed in).
     """
     
+    analysis_kind = "job_description"
+    
     def __init__(
         self,
         llm: LanguageModel,
         agent_id: Optional[str] = None,
-        name: Optional[str] = None
+        name: Optional[str] = None,
+        analysis_store: Optional[AnalysisStore] = None,
+        chunk_chars: int = DEFAULT_CHUNK_CHARS,
+        chunk_concurrency: int = DEFAULT_CHUNK_CONCURRENCY
     ):
         super().__init__(
             agent_id=agent_id,
@@ -38,6 +58,9 @@ class JobDescriptionAnalyzerAgent(BaseAgent):
             capabilities=["nlp", "extraction", "analysis"]
         )
         self.llm = llm
+        self.analysis_store = analysis_store if analysis_store is not None else get_analysis_store()
+        self.chunk_chars = chunk_chars
+        self.chunk_concurrency = chunk_concurrency
         self.system_prompt = """You are a highly skilled natural language processing (NLP) expert 
 specializing in analyzing job descriptions to extract key skills, experience levels, and responsibilities. 
 Your goal is to create a structured representation of a job description that can be used for accurate matching.
@@ -52,7 +75,7 @@ Output should be a JSON object with the following keys:
 
 Be extremely thorough and consider edge cases. Prioritize accuracy over brevity. 
 If the description is ambiguous, flag it and explain the ambiguity."""
-    
+
     def perceive(self, environment: Dict[str, Any]) -> Dict[str, Any]:
         """Extract job description from environment."""
         job_description = environment.get("job_description", "")
@@ -88,14 +111,51 @@ If the description is ambiguous, flag it and explain the ambiguity."""
         """Execute job description analysis using LLM."""
         job_description = decision["job_description"]
         
+        cached = self.lookup_analysis(job_description)
+        if cached is not None:
+            self.update_state({
+                "last_analysis": cached,
+                "cache_hits": self.state.get("cache_hits", 0) + 1
+            })
+            return {
+                "status": "success",
+                "analysis": cached,
+                "cached": True,
+                "agent_id": self.agent_id
+            }
+        
+        if decision["analysis_strategy"].get("chunking_needed"):
+            # Map-reduce: analyze sections concurrently, then merge
+            chunks = chunk_document(job_description, self.chunk_chars)
+            analysis_result = self._merge_analyses(map_chunks(self._analyze_text, chunks, self.chunk_concurrency))
+        else:
+            analysis_result = self._analyze_text(job_description)
+        
+        self.store_analysis(job_description, analysis_result)
+        
+        # Update agent state
+        self.update_state({
+            "last_analysis": analysis_result,
+            "analysis_count": self.state.get("analysis_count", 0) + 1
+        })
+        
+        return {
+            "status": "success",
+            "analysis": analysis_result,
+            "agent_id": self.agent_id
+        }
+    
+    def _analyze_text(self, text: str, index: int = 0, total: int = 1) -> Dict[str, Any]:
+        """Run one LLM extraction over text (the whole document or one chunk of it)."""
         # Construct the prompt
-        user_prompt = f"""Analyze the following job description and extract structured information:
+        part_note = f" (part {index + 1} of {total} of a longer document; report only what this part contains)" if total > 1 else ""
+        user_prompt = f"""Analyze the following job description{part_note} and extract structured information:
 
-{job_description}
+{text}
 
 Provide your analysis as a JSON object with the keys: title, required_skills, experience_level, 
 responsibilities, keywords, and ambiguities."""
-        
+
         # Call LLM
         response = self.llm.generate(
             prompt=user_prompt,
@@ -126,15 +186,26 @@ responsibilities, keywords, and ambiguities."""
         if 'ambiguities' not in analysis_result:
             analysis_result['ambiguities'] = []
         
-        # Update agent state
-        self.update_state({
-            "last_analysis": analysis_result,
-            "analysis_count": self.state.get("analysis_count", 0) + 1
-        })
+        return analysis_result
+    
+    def _merge_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reduce per-chunk analyses into one.
+        
+        Lists are concatenated in chunk order without repeats, the title
+        comes from the first chunk that has one, and the experience level
+        is the most senior one any chunk reports.
+        """
+        levels = [a.get("experience_level") for a in analyses if a.get("experience_level")]
+        ranked = [level for level in levels if str(level).lower() in EXPERIENCE_LEVELS]
+        experience_level = max(ranked, key=lambda level: EXPERIENCE_LEVELS.index(str(level).lower())) if ranked else first_non_empty(levels)
         
         return {
-            "status": "success",
-            "analysis": analysis_result,
-            "agent_id": self.agent_id
+            "title": first_non_empty(a.get("title") for a in analyses),
+            "required_skills": merge_unique(a.get("required_skills") for a in analyses),
+            "experience_level": experience_level,
+            "responsibilities": merge_unique(a.get("responsibilities") for a in analyses),
+            "keywords": merge_unique(a.get("keywords") for a in analyses),
+            "ambiguities": merge_unique(a.get("ambiguities") for a in analyses),
+            "chunks_analyzed": len(analyses)
         }
-
@@ -0,0 +1,12 @@
+"""
+Utilities Module
+
+Shared helpers for the agent modules:
+- Exception types raised across agents and workflows
+"""
+
+from src.utils.exceptions import WorkflowError
+
+__all__ = [
+    "WorkflowError",
+]
@@ -0,0 +1,9 @@
+"""
+Exceptions
+
+Errors shared by agents and workflows.
+"""
+
+
+class WorkflowError(Exception):
+    """A workflow was given invalid input or steps, or one of its agents failed."""
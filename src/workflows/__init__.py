@@ -23,10 +23,12 @@ class Workflow(Protocol):
 # Export all workflows
 from src.workflows.base_workflow import BaseWorkflow
 from src.workflows.job_matching_workflow import JobMatchingWorkflow
+from src.workflows.batch_matching_workflow import BatchMatchingWorkflow
 
 __all__ = [
     "Workflow",
     "BaseWorkflow",
     "JobMatchingWorkflow",
+    "BatchMatchingWorkflow",
 ]
 
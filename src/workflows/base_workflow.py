@@ -2,13 +2,32 @@
 Base Workflow Implementation
 
 Provides a foundation for creating custom workflows that orchestrate agents.
+
+Steps may declare a "depends_on" list and a "run" callable; run_steps()
+executes them as a DAG, starting every step as soon as its dependencies
+have finished so independent branches run concurrently.
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from typing import Any, Dict, List, Optional
 from datetime import datetime
+import time
 import uuid
 
+from src.utils.exceptions import WorkflowError
+
+
+class StepExecutionError(WorkflowError):
+    """A workflow step raised; carries the timings gathered up to that point."""
+    
+    def __init__(self, step: str, error: BaseException, timings: Dict[str, Dict[str, Any]]):
+        super().__init__(str(error))
+        self.step = step
+        self.error = error
+        self.timings = timings
+
 
 class BaseWorkflow(ABC):
     """Base class for all workflows in the system."""
@@ -40,6 +59,121 @@ class BaseWorkflow(ABC):
         """Get all workflow steps."""
         return self.steps.copy()
     
+    def get_step_layers(self) -> List[List[str]]:
+        """
+        Validate the step graph and group steps into layers.
+        
+        Every step in a layer depends only on steps in earlier layers, so a
+        layer's steps can all run at once.
+        
+        Raises:
+            WorkflowError: on duplicate names, unknown dependencies or cycles
+        """
+        names = [step["name"] for step in self.steps]
+        if len(names) != len(set(names)):
+            raise WorkflowError(f"Duplicate step names in workflow {self.name}")
+        
+        remaining = {step["name"]: set(step.get("depends_on", [])) for step in self.steps}
+        for name, deps in remaining.items():
+            unknown = deps - remaining.keys()
+            if unknown:
+                raise WorkflowError(f"Step {name} depends on unknown steps: {sorted(unknown)}")
+        
+        layers: List[List[str]] = []
+        done: set = set()
+        while remaining:
+            layer = [name for name, deps in remaining.items() if deps <= done]
+            if not layer:
+                raise WorkflowError(f"Cycle among workflow steps: {sorted(remaining)}")
+            layers.append(layer)
+            done.update(layer)
+            for name in layer:
+                del remaining[name]
+        return layers
+    
+    def run_steps(
+        self,
+        context: Dict[str, Any],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run all steps with a "run" callable, honouring "depends_on".
+        
+        A step's run(context, results) receives the outputs of every step
+        finished so far (always including its dependencies), keyed by name.
+        
+        Steps execute on a thread pool (agents make blocking LLM calls) and
+        each starts as soon as its dependencies finish. On the first
+        failure no further steps are started; steps already running are
+        allowed to finish.
+        
+        Returns:
+            {"results": {step: output}, "timings": {step: {...}}, "wall_time_ms": float}
+        
+        Raises:
+            StepExecutionError: if a step raises (timings are attached)
+        """
+        layers = self.get_step_layers()
+        steps = {step["name"]: step for step in self.steps if step.get("run")}
+        waiting = {
+            name: set(step.get("depends_on", [])) & steps.keys()
+            for name, step in steps.items()
+        }
+        workers = max_workers or max(1, max(len(layer) for layer in layers))
+        
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        running: Dict[Future, str] = {}
+        failure: Optional[StepExecutionError] = None
+        started = time.perf_counter()
+        
+        def timed(step: Dict[str, Any], finished: Dict[str, Any]) -> Any:
+            step_started = time.perf_counter()
+            timings[step["name"]] = {
+                "status": "running",
+                "started_at": datetime.utcnow().isoformat(),
+                "offset_ms": round((step_started - started) * 1000, 2)
+            }
+            try:
+                return step["run"](context, finished)
+            finally:
+                timings[step["name"]]["duration_ms"] = round((time.perf_counter() - step_started) * 1000, 2)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"workflow-{self.workflow_id[:8]}") as pool:
+            while True:
+                if failure is None:
+                    for name in [name for name, deps in waiting.items() if not deps]:
+                        del waiting[name]
+                        # Each step runs in a copy of the caller's context, so its
+                        # spans nest under the caller's trace
+                        running[pool.submit(copy_context().run, timed, steps[name], dict(results))] = name
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        timings[name]["status"] = "completed"
+                    except Exception as e:
+                        timings[name]["status"] = "failed"
+                        timings[name]["error"] = str(e)
+                        if failure is None:
+                            failure = StepExecutionError(name, e, timings)
+                    for deps in waiting.values():
+                        deps.discard(name)
+        
+        for name in waiting:
+            timings[name] = {"status": "skipped"}
+        if failure is not None:
+            raise failure
+        
+        return {
+            "results": results,
+            "timings": timings,
+            "wall_time_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}(id={self.workflow_id}, name={self.name})>"
-
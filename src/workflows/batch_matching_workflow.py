@@ -0,0 +1,406 @@
+"""
+Batch Matching Workflow
+
+Matches N job descriptions against M candidate profiles. Every distinct
+document is ingested and analyzed once (memoized by content hash), bias
+detection runs once per job, and the N x M matching steps are scheduled
+on a bounded worker pool. Results stream out as they complete and can be
+checkpointed to a JSON Lines file so an interrupted batch resumes where
+it stopped.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import os
+import time
+
+from src.agents.base_agent import BaseAgent
+from src.utils.exceptions import WorkflowError
+from src.workflows.job_matching_workflow import JobMatchingWorkflow
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def content_key(content_type: str, source: Optional[str], content: Optional[str]) -> str:
+    """Hash identifying a document: its text when given, otherwise its source."""
+    payload = content if content else f"source:{source}"
+    return hashlib.sha256(f"{content_type}\n{payload}".encode("utf-8")).hexdigest()
+
+
+class BatchMatchingWorkflow(JobMatchingWorkflow):
+    """
+    Orchestrates many-jobs x many-candidates matching:
+    1. Ingest and analyze each distinct job and candidate once
+    2. Bias detection once per job
+    3. Match every job/candidate pair (bounded concurrency)
+    
+    Analyses, bias results and matches are memoized on the instance, so
+    executing again with overlapping inputs only does the new work.
+    """
+    
+    def __init__(
+        self,
+        data_ingestion_agent: BaseAgent,
+        job_analyzer: BaseAgent,
+        candidate_analyzer: BaseAgent,
+        bias_detection_agent: BaseAgent,
+        matching_agent: BaseAgent,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        workflow_id: Optional[str] = None,
+        name: Optional[str] = None
+    ):
+        super().__init__(
+            data_ingestion_agent=data_ingestion_agent,
+            job_analyzer=job_analyzer,
+            candidate_analyzer=candidate_analyzer,
+            bias_detection_agent=bias_detection_agent,
+            matching_agent=matching_agent,
+            workflow_id=workflow_id,
+            name=name or "Batch Matching Workflow"
+        )
+        self.description = "Matches many jobs against many candidates, analyzing each document once"
+        self.max_concurrency = max(1, max_concurrency)
+        
+        self.steps = [
+            {"name": "analyze_documents", "agent": "data_ingestion_agent"},
+            {"name": "detect_bias", "agent": "bias_detection_agent", "depends_on": ["analyze_documents"]},
+            {"name": "match_pairs", "agent": "matching_agent", "depends_on": ["detect_bias"]}
+        ]
+        
+        # Memoized by content hash: key -> analysis / bias analysis
+        self._analyses: Dict[str, Dict[str, Any]] = {}
+        self._bias: Dict[str, Optional[Dict[str, Any]]] = {}
+        # (job key, candidate key) -> final recommendation
+        self._matches: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.last_stats: Dict[str, Any] = {}
+    
+    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Match every job against every candidate and collect the results.
+        
+        Expected context:
+        - jobs: list of job descriptions, each a text or a dict with
+          "content" and/or "source" and an optional "id"
+        - candidates: list of candidate profiles, same shape as jobs
+        - checkpoint_path: (optional) JSON Lines file used to resume
+        
+        Returns:
+            Batch result with one entry per pair and run statistics
+        """
+        workflow_results = {
+            "workflow_id": self.workflow_id,
+            "status": "in_progress",
+            "errors": [],
+            "results": []
+        }
+        
+        try:
+            for result in self.iter_results(context):
+                workflow_results["results"].append(result)
+                if result["status"] != "completed":
+                    workflow_results["errors"].append(
+                        f"{result['job_id']} x {result['candidate_id']}: {result['error_message']}"
+                    )
+            workflow_results["status"] = "completed"
+            workflow_results["stats"] = self.last_stats
+        except Exception as e:
+            workflow_results["status"] = "error"
+            workflow_results["errors"].append(str(e))
+            workflow_results["error_message"] = str(e)
+        
+        return workflow_results
+    
+    def iter_results(self, context: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one result per job/candidate pair as soon as it is ready.
+        
+        Pairs already matched (in memory or in the checkpoint) are yielded
+        first with "resumed": True. Failed pairs are yielded with status
+        "error" and are retried on the next run.
+        """
+        started = time.perf_counter()
+        jobs = self._documents(context.get("jobs"), "job_description", "job")
+        candidates = self._documents(context.get("candidates"), "candidate_profile", "candidate")
+        job_keys = {key for _, key, _ in jobs}
+        checkpoint_path = context.get("checkpoint_path")
+        if checkpoint_path:
+            self._load_checkpoint(checkpoint_path)
+        
+        stats = {
+            "jobs": len(jobs),
+            "candidates": len(candidates),
+            "pairs": len(jobs) * len(candidates),
+            "analyses_run": 0,
+            "analyses_cached": 0,
+            "matches_run": 0,
+            "matches_resumed": 0,
+            "errors": 0
+        }
+        self.last_stats = stats
+        
+        # Pairs still to emit, grouped by document key so each finished
+        # document can find the pairs it unblocks
+        open_pairs: Dict[str, Set[Tuple[int, int]]] = {}
+        for j, (job_id, job_key, _) in enumerate(jobs):
+            for c, (candidate_id, candidate_key, _) in enumerate(candidates):
+                if (job_key, candidate_key) in self._matches:
+                    stats["matches_resumed"] += 1
+                    yield self._pair_result(job_id, candidate_id, self._matches[(job_key, candidate_key)], resumed=True)
+                    continue
+                open_pairs.setdefault(job_key, set()).add((j, c))
+                open_pairs.setdefault(candidate_key, set()).add((j, c))
+        if not open_pairs:
+            stats["wall_time_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return
+        
+        # A job is resolved once its bias detection ran (or its analysis
+        # failed); a candidate once its analysis finished
+        failures: Dict[str, str] = {}
+        resolved: Set[str] = set()
+        queued: Set[Any] = set()
+        bias_tasks: Deque[Tuple[Any, Callable[[], Any]]] = deque()
+        match_tasks: Deque[Tuple[Any, Callable[[], Any]]] = deque()
+        analysis_tasks: Deque[Tuple[Any, Callable[[], Any]]] = deque()
+        
+        def queue_bias(job_key: str) -> None:
+            if job_key in self._bias:
+                resolved.add(job_key)
+            elif ("bias", job_key) not in queued:
+                queued.add(("bias", job_key))
+                analysis = self._analyses[job_key]
+                bias_tasks.append((("bias", job_key), lambda: self._detect_job_bias(analysis)))
+        
+        for documents, is_job in ((jobs, True), (candidates, False)):
+            for _, key, doc in documents:
+                if key not in open_pairs or ("analysis", key) in queued:
+                    continue
+                queued.add(("analysis", key))
+                if key in self._analyses:
+                    stats["analyses_cached"] += 1
+                    if is_job:
+                        queue_bias(key)
+                    else:
+                        resolved.add(key)
+                    continue
+                content_type = "job_description" if is_job else "candidate_profile"
+                analysis_tasks.append((
+                    ("analysis", key),
+                    lambda doc=doc, content_type=content_type: self._analyze_document(doc, content_type)
+                ))
+        
+        def unblocked(key: str) -> Iterator[Dict[str, Any]]:
+            """Queue (or fail) every open pair that the resolved key completes."""
+            for j, c in sorted(open_pairs.get(key, ())):
+                job_id, job_key, _ = jobs[j]
+                candidate_id, candidate_key, _ = candidates[c]
+                if job_key not in resolved or candidate_key not in resolved:
+                    continue
+                open_pairs[job_key].discard((j, c))
+                open_pairs[candidate_key].discard((j, c))
+                failure = failures.get(job_key) or failures.get(candidate_key)
+                if failure:
+                    stats["errors"] += 1
+                    yield self._pair_error(job_id, candidate_id, failure)
+                    continue
+                pair = (job_key, candidate_key)
+                if ("match", pair) in queued:
+                    continue
+                queued.add(("match", pair))
+                match_tasks.append((("match", pair), lambda pair=pair: self._match_pair(*pair)))
+        
+        # Duplicate documents share a key; remember which pairs wait on a
+        # match so every one of them is emitted
+        def pairs_for(pair: Tuple[str, str]) -> List[Tuple[int, int]]:
+            return [
+                (j, c) for j, (_, job_key, _) in enumerate(jobs) if job_key == pair[0]
+                for c, (_, candidate_key, _) in enumerate(candidates) if candidate_key == pair[1]
+            ]
+        
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix=f"batch-{self.workflow_id[:8]}")
+        running: Dict[Future, Any] = {}
+        try:
+            for key in list(resolved):
+                yield from unblocked(key)
+            
+            while True:
+                # Keep at most max_concurrency tasks in flight; bias first
+                # (it unblocks a whole row), then matches so results
+                # stream early, then the remaining analyses
+                while len(running) < self.max_concurrency:
+                    source = bias_tasks or match_tasks or analysis_tasks
+                    if not source:
+                        break
+                    task_id, fn = source.popleft()
+                    running[pool.submit(copy_context().run, fn)] = task_id  # Keeps the caller's trace
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, key = running.pop(future)
+                    try:
+                        value = future.result()
+                        error = None
+                    except Exception as e:
+                        value, error = None, str(e)
+                    
+                    if kind == "analysis":
+                        stats["analyses_run"] += 1
+                        if error is not None:
+                            logger.warning(f"Analysis failed for document {key[:12]}: {error}")
+                            failures[key] = error
+                            resolved.add(key)
+                        else:
+                            self._analyses[key] = value
+                            self._write_checkpoint(checkpoint, {"type": "analysis", "key": key, "analysis": value})
+                            if key in job_keys:
+                                queue_bias(key)
+                            else:
+                                resolved.add(key)
+                        if key in resolved:
+                            yield from unblocked(key)
+                    
+                    elif kind == "bias":
+                        # Same policy as a single match: bias trouble is a warning and
+                        # this run matches without it; only a successful result is
+                        # kept, so a later run or resume tries the detection again
+                        if error is not None:
+                            logger.warning(f"Bias detection failed for job {key[:12]}: {error}")
+                        else:
+                            self._bias[key] = value
+                            self._write_checkpoint(checkpoint, {"type": "bias", "key": key, "bias_analysis": value})
+                        resolved.add(key)
+                        yield from unblocked(key)
+                    
+                    else:
+                        job_key, candidate_key = key
+                        for j, c in pairs_for(key):
+                            job_id, candidate_id = jobs[j][0], candidates[c][0]
+                            if error is not None:
+                                stats["errors"] += 1
+                                yield self._pair_error(job_id, candidate_id, error)
+                            else:
+                                stats["matches_run"] += 1
+                                yield self._pair_result(job_id, candidate_id, value, resumed=False)
+                        if error is None:
+                            self._matches[key] = value
+                            self._write_checkpoint(checkpoint, {
+                                "type": "match",
+                                "job_key": job_key,
+                                "candidate_key": candidate_key,
+                                "final_recommendation": value
+                            })
+        finally:
+            # The consumer may abandon the stream; only the in-flight
+            # tasks (at most max_concurrency) are waited for
+            pool.shutdown(wait=True)
+            if checkpoint is not None:
+                checkpoint.close()
+            stats["wall_time_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    
+    def _documents(self, items: Optional[List[Any]], content_type: str, prefix: str) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Normalize inputs to (id, content key, {"source", "content"})."""
+        if not items:
+            raise WorkflowError(f"At least one {prefix} must be provided")
+        
+        documents = []
+        for index, item in enumerate(items):
+            doc = {"content": item} if isinstance(item, str) else dict(item)
+            if not doc.get("source") and not doc.get("content"):
+                raise WorkflowError(f"{prefix.capitalize()} {index} needs a source or content")
+            doc_id = str(doc.get("id") or f"{prefix}-{index}")
+            documents.append((doc_id, content_key(content_type, doc.get("source"), doc.get("content")), doc))
+        return documents
+    
+    def _analyze_document(self, doc: Dict[str, Any], content_type: str) -> Dict[str, Any]:
+        label = "Job" if content_type == "job_description" else "Candidate"
+        analyzer = self.job_analyzer if content_type == "job_description" else self.candidate_analyzer
+        cached = self._stored_analysis(analyzer, doc.get("content"))
+        if cached is not None:
+            return cached
+        
+        ingestion = self._ingest(doc.get("source"), doc.get("content"), content_type, label)
+        if ingestion.get("analysis"):
+            return ingestion["analysis"]
+        
+        text = doc.get("content") or ingestion.get("raw_content", "")
+        if content_type == "job_description":
+            result = self.job_analyzer.run({"job_description": text, "source": doc.get("source")})
+        else:
+            result = self.candidate_analyzer.run({"candidate_profile": text, "source": doc.get("source")})
+        
+        analysis = result.get("analysis")
+        if not analysis:
+            raise WorkflowError(f"{label} analysis failed: {result.get('errors', [])}")
+        return analysis
+    
+    def _detect_job_bias(self, job_analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        result = self.bias_detection_agent.run({"job_analysis": job_analysis})
+        if result.get("status") != "success":
+            raise WorkflowError(f"Bias detection warning: {result.get('errors', [])}")
+        return result.get("bias_analysis")
+    
+    def _match_pair(self, job_key: str, candidate_key: str) -> Dict[str, Any]:
+        bias_analysis = self._bias.get(job_key)
+        result = self.matching_agent.run({
+            "job_analysis": self._analyses[job_key],
+            "candidate_analysis": self._analyses[candidate_key],
+            "bias_analysis": bias_analysis
+        })
+        
+        if result.get("status") != "success":
+            raise WorkflowError(f"Matching failed: {result.get('errors', [])}")
+        return self._final_recommendation(result.get("match_result") or {}, bias_analysis)
+    
+    def _pair_result(self, job_id: str, candidate_id: str, recommendation: Dict[str, Any], resumed: bool) -> Dict[str, Any]:
+        return {
+            "job_id": job_id,
+            "candidate_id": candidate_id,
+            "status": "completed",
+            "resumed": resumed,
+            "final_recommendation": recommendation,
+            "summary": self._generate_summary({"final_recommendation": recommendation})
+        }
+    
+    def _pair_error(self, job_id: str, candidate_id: str, error: str) -> Dict[str, Any]:
+        return {
+            "job_id": job_id,
+            "candidate_id": candidate_id,
+            "status": "error",
+            "resumed": False,
+            "error_message": error
+        }
+    
+    def _load_checkpoint(self, path: str) -> None:
+        """Restore memoized work from a checkpoint written by a previous run."""
+        if not os.path.exists(path):
+            return
+        
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write leaves a truncated last line
+                    continue
+                kind = record.get("type")
+                if kind == "analysis":
+                    self._analyses[record["key"]] = record["analysis"]
+                elif kind == "bias":
+                    self._bias[record["key"]] = record["bias_analysis"]
+                elif kind == "match":
+                    self._matches[(record["job_key"], record["candidate_key"])] = record["final_recommendation"]
+    
+    def _write_checkpoint(self, checkpoint: Any, record: Dict[str, Any]) -> None:
+        if checkpoint is None:
+            return
+        checkpoint.write(json.dumps(record, default=str) + "\n")
+        checkpoint.flush()
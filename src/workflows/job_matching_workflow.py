@@ -5,7 +5,7 @@ Orchestrates the entire job matching process from ingestion to final recommendat
 """
 
 from typing import Dict, Any, Optional, List
-from src.workflows.base_workflow import BaseWorkflow
+from src.workflows.base_workflow import BaseWorkflow, StepExecutionError
 from src.agents.base_agent import BaseAgent
 from src.utils.exceptions import WorkflowError
 
@@ -42,21 +42,110 @@ class JobMatchingWorkflow(BaseWorkflow):
         self.bias_detection_agent = bias_detection_agent
         self.matching_agent = matching_agent
         
-        # Define workflow steps
+        # Define workflow steps; the job and candidate branches are independent
         self.steps = [
-            {"name": "ingest_job", "agent": "data_ingestion_agent", "type": "job_description"},
-            {"name": "ingest_candidate", "agent": "data_ingestion_agent", "type": "candidate_profile"},
-            {"name": "analyze_job", "agent": "job_analyzer"},
-            {"name": "analyze_candidate", "agent": "candidate_analyzer"},
-            {"name": "detect_bias", "agent": "bias_detection_agent"},
-            {"name": "match", "agent": "matching_agent"},
-            {"name": "finalize", "agent": None}  # Final step handled by workflow
+            {"name": "ingest_job", "agent": "data_ingestion_agent", "type": "job_description",
+             "depends_on": [], "run": self._ingest_job},
+            {"name": "ingest_candidate", "agent": "data_ingestion_agent", "type": "candidate_profile",
+             "depends_on": [], "run": self._ingest_candidate},
+            {"name": "analyze_job", "agent": "job_analyzer",
+             "depends_on": ["ingest_job"], "run": self._analyze_job},
+            {"name": "analyze_candidate", "agent": "candidate_analyzer",
+             "depends_on": ["ingest_candidate"], "run": self._analyze_candidate},
+            {"name": "detect_bias", "agent": "bias_detection_agent",
+             "depends_on": ["analyze_job", "analyze_candidate"], "run": self._detect_bias},
+            {"name": "match", "agent": "matching_agent",
+             "depends_on": ["detect_bias"], "run": self._match},
+            {"name": "finalize", "agent": None, "depends_on": ["match"]}  # Final step handled by workflow
         ]
     
+    def _ingest(self, source: Optional[str], content: Optional[str], content_type: str, label: str) -> Dict[str, Any]:
+        if not source and not content:
+            key = content_type.split("_")[0]
+            raise WorkflowError(f"Either {key}_source or {key}_content must be provided")
+        
+        result = self.data_ingestion_agent.run({
+            "source": source,
+            "content": content,
+            "content_type": content_type
+        })
+        
+        if result.get("status") != "success":
+            raise WorkflowError(f"{label} ingestion failed: {result.get('errors', [])}")
+        return result
+    
+    def _ingest_job(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        return self._ingest(context.get("job_source"), context.get("job_content"), "job_description", "Job")
+    
+    def _ingest_candidate(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        return self._ingest(
+            context.get("candidate_source"), context.get("candidate_content"), "candidate_profile", "Candidate"
+        )
+    
+    def _stored_analysis(self, analyzer: BaseAgent, content: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Analysis memoized by the analyzer's AnalysisStore, if it has one for this content."""
+        if not content or not hasattr(analyzer, "lookup_analysis"):
+            return None
+        return analyzer.lookup_analysis(content)
+    
+    def _analyze_job(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns {"analysis", "result"}; result is None when ingestion already analyzed the job."""
+        ingestion = results["ingest_job"]
+        if ingestion.get("analysis"):
+            return {"analysis": ingestion["analysis"], "result": None}
+        
+        text = context.get("job_content") or ingestion.get("raw_content", "")
+        cached = self._stored_analysis(self.job_analyzer, text)
+        if cached is not None:
+            return {"analysis": cached, "result": None}
+        
+        result = self.job_analyzer.run({
+            "job_description": text,
+            "source": context.get("job_source")
+        })
+        return {"analysis": result.get("analysis"), "result": result}
+    
+    def _analyze_candidate(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns {"analysis", "result"}; result is None when ingestion already analyzed the candidate."""
+        ingestion = results["ingest_candidate"]
+        if ingestion.get("analysis"):
+            return {"analysis": ingestion["analysis"], "result": None}
+        
+        text = context.get("candidate_content") or ingestion.get("raw_content", "")
+        cached = self._stored_analysis(self.candidate_analyzer, text)
+        if cached is not None:
+            return {"analysis": cached, "result": None}
+        
+        result = self.candidate_analyzer.run({
+            "candidate_profile": text,
+            "source": context.get("candidate_source")
+        })
+        return {"analysis": result.get("analysis"), "result": result}
+    
+    def _detect_bias(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        return self.bias_detection_agent.run({
+            "job_analysis": results["analyze_job"]["analysis"],
+            "candidate_analysis": results["analyze_candidate"]["analysis"]
+        })
+    
+    def _match(self, context: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.matching_agent.run({
+            "job_analysis": results["analyze_job"]["analysis"],
+            "candidate_analysis": results["analyze_candidate"]["analysis"],
+            "bias_analysis": results["detect_bias"].get("bias_analysis")
+        })
+        
+        if result.get("status") != "success":
+            raise WorkflowError(f"Matching failed: {result.get('errors', [])}")
+        return result
+    
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the complete job matching workflow.
         
+        The job and candidate branches (ingestion, then analysis) run
+        concurrently; bias detection and matching wait for both.
+        
         Expected context:
         - job_source: URL or file path for job description
         - candidate_source: URL or file path for candidate profile
@@ -64,7 +153,8 @@ class JobMatchingWorkflow(BaseWorkflow):
         - candidate_content: (optional) Direct candidate profile text
         
         Returns:
-            Complete workflow result with all analyses and final recommendation
+            Complete workflow result with all analyses, per-step timings
+            and final recommendation
         """
         workflow_results = {
             "workflow_id": self.workflow_id,
@@ -74,102 +164,40 @@ class JobMatchingWorkflow(BaseWorkflow):
         }
         
         try:
-            # Step 1: Ingest job description
-            job_source = context.get("job_source")
-            job_content = context.get("job_content")
-            
-            if not job_source and not job_content:
-                raise WorkflowError("Either job_source or job_content must be provided")
-            
-            job_ingestion_result = self.data_ingestion_agent.run({
-                "source": job_source,
-                "content": job_content,
-                "content_type": "job_description"
-            })
-            
-            if job_ingestion_result.get("status") != "success":
-                raise WorkflowError(f"Job ingestion failed: {job_ingestion_result.get('errors', [])}")
-            
-            workflow_results["steps"]["job_ingestion"] = job_ingestion_result
-            job_analysis = job_ingestion_result.get("analysis")
-            
-            # Step 2: Ingest candidate profile
-            candidate_source = context.get("candidate_source")
-            candidate_content = context.get("candidate_content")
-            
-            if not candidate_source and not candidate_content:
-                raise WorkflowError("Either candidate_source or candidate_content must be provided")
-            
-            candidate_ingestion_result = self.data_ingestion_agent.run({
-                "source": candidate_source,
-                "content": candidate_content,
-                "content_type": "candidate_profile"
-            })
-            
-            if candidate_ingestion_result.get("status") != "success":
-                raise WorkflowError(f"Candidate ingestion failed: {candidate_ingestion_result.get('errors', [])}")
-            
-            workflow_results["steps"]["candidate_ingestion"] = candidate_ingestion_result
-            candidate_analysis = candidate_ingestion_result.get("analysis")
-            
-            # Step 3: Analyze job description (if not already done)
-            if not job_analysis:
-                job_analysis_result = self.job_analyzer.run({
-                    "job_description": job_content or job_ingestion_result.get("raw_content", ""),
-                    "source": job_source
-                })
-                job_analysis = job_analysis_result.get("analysis")
-                workflow_results["steps"]["job_analysis"] = job_analysis_result
-            
-            # Step 4: Analyze candidate profile (if not already done)
-            if not candidate_analysis:
-                candidate_analysis_result = self.candidate_analyzer.run({
-                    "candidate_profile": candidate_content or candidate_ingestion_result.get("raw_content", ""),
-                    "source": candidate_source
-                })
-                candidate_analysis = candidate_analysis_result.get("analysis")
-                workflow_results["steps"]["candidate_analysis"] = candidate_analysis_result
-            
-            # Step 5: Detect bias
-            bias_detection_result = self.bias_detection_agent.run({
-                "job_analysis": job_analysis,
-                "candidate_analysis": candidate_analysis
-            })
-            
+            run = self.run_steps(context)
+            results = run["results"]
+            workflow_results["timings"] = run["timings"]
+            workflow_results["wall_time_ms"] = run["wall_time_ms"]
+            
+            workflow_results["steps"]["job_ingestion"] = results["ingest_job"]
+            workflow_results["steps"]["candidate_ingestion"] = results["ingest_candidate"]
+            if results["analyze_job"]["result"] is not None:
+                workflow_results["steps"]["job_analysis"] = results["analyze_job"]["result"]
+            if results["analyze_candidate"]["result"] is not None:
+                workflow_results["steps"]["candidate_analysis"] = results["analyze_candidate"]["result"]
+            
+            bias_detection_result = results["detect_bias"]
             if bias_detection_result.get("status") != "success":
                 workflow_results["errors"].append(f"Bias detection warning: {bias_detection_result.get('errors', [])}")
             
             workflow_results["steps"]["bias_detection"] = bias_detection_result
             bias_analysis = bias_detection_result.get("bias_analysis")
             
-            # Step 6: Match
-            matching_result = self.matching_agent.run({
-                "job_analysis": job_analysis,
-                "candidate_analysis": candidate_analysis,
-                "bias_analysis": bias_analysis
-            })
+            workflow_results["steps"]["matching"] = results["match"]
+            match_result = results["match"].get("match_result")
             
-            if matching_result.get("status") != "success":
-                raise WorkflowError(f"Matching failed: {matching_result.get('errors', [])}")
-            
-            workflow_results["steps"]["matching"] = matching_result
-            match_result = matching_result.get("match_result")
-            
-            # Step 7: Finalize
+            # Finalize
             workflow_results["status"] = "completed"
-            workflow_results["final_recommendation"] = {
-                "match_score": match_result.get("match_score", 0.0),
-                "recommendation": match_result.get("recommendation", "review"),
-                "reasoning": match_result.get("reasoning", ""),
-                "strengths": match_result.get("strengths", []),
-                "gaps": match_result.get("gaps", []),
-                "bias_considerations": match_result.get("bias_considerations", ""),
-                "bias_severity": bias_analysis.get("severity_level", "low") if bias_analysis else "low"
-            }
+            workflow_results["final_recommendation"] = self._final_recommendation(match_result, bias_analysis)
             
             # Add summary
             workflow_results["summary"] = self._generate_summary(workflow_results)
-            
+        
+        except StepExecutionError as e:
+            workflow_results["status"] = "error"
+            workflow_results["timings"] = e.timings
+            workflow_results["errors"].append(str(e))
+            workflow_results["error_message"] = str(e)
         except Exception as e:
             workflow_results["status"] = "error"
             workflow_results["errors"].append(str(e))
@@ -177,6 +205,22 @@ class JobMatchingWorkflow(BaseWorkflow):
         
         return workflow_results
     
+    def _final_recommendation(
+        self,
+        match_result: Dict[str, Any],
+        bias_analysis: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Shape a matching agent result into the final recommendation."""
+        return {
+            "match_score": match_result.get("match_score", 0.0),
+            "recommendation": match_result.get("recommendation", "review"),
+            "reasoning": match_result.get("reasoning", ""),
+            "strengths": match_result.get("strengths", []),
+            "gaps": match_result.get("gaps", []),
+            "bias_considerations": match_result.get("bias_considerations", ""),
+            "bias_severity": bias_analysis.get("severity_level", "low") if bias_analysis else "low"
+        }
+    
     def _generate_summary(self, results: Dict[str, Any]) -> str:
         """Generate a human-readable summary of the workflow results."""
         final_rec = results.get("final_recommendation", {})